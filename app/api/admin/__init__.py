@@ -3,6 +3,7 @@
 from fastapi import APIRouter
 
 from .auth import router as auth_router
+from .diagnostics import router as diagnostics_router
 from .project import router as project_router
 from .website import router as website_router
 
@@ -10,3 +11,4 @@ router = APIRouter(prefix="/admin")
 router.include_router(auth_router)
 router.include_router(website_router)
 router.include_router(project_router)
+router.include_router(diagnostics_router)
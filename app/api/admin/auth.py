@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
-from app.dependencies import get_current_admin_user
+from app.dependencies import get_current_admin_user, get_db
 
 from .schemas.auth import LoginPayload, LoginResponse, ProfileResponse
 from app.utils._jwt import create_access_token, create_refresh_token
@@ -11,12 +11,12 @@ router = APIRouter(prefix="/auth-app")
 
 
 @router.post("/login", response_model=LoginResponse, status_code=200)
-def login(user_info: LoginPayload):
+async def login(user_info: LoginPayload):
 
-    user = get_user_by_email(user_info.email, check_admin=True)
+    user = await get_user_by_email(user_info.email, check_admin=True)
 
     if user:
-        if not verify_password(user["id"], user_info.password):
+        if not await verify_password(user["id"], user_info.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password"
             )
@@ -39,10 +39,12 @@ def login(user_info: LoginPayload):
 
 @router.get("/profile", response_model=ProfileResponse)
 async def profile(
-    request: Request, current_user: dict = Depends(get_current_admin_user)
+    request: Request,
+    current_user: dict = Depends(get_current_admin_user),
+    conn=Depends(get_db),
 ):
 
-    user_data = get_user_data_by_id(current_user["id"])
+    user_data = await get_user_data_by_id(current_user["id"], conn)
 
     if not user_data:
         raise HTTPException(
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from typing import List
+
+from app.database import get_pool
+from app.dependencies import get_current_admin_user
+from app.utils.mailer import mailer
+from .schemas.diagnostics import DBPoolHolder, DBPoolStats, EmailOutboxStats
+
+router = APIRouter(prefix="/diagnostics-app")
+
+
+@router.get("/db-pool", response_model=DBPoolStats)
+async def get_db_pool_stats(current_user: dict = Depends(get_current_admin_user)):
+    return DBPoolStats(**get_pool().stats())
+
+
+@router.get("/db-pool/holders", response_model=List[DBPoolHolder])
+async def list_db_pool_holders(current_user: dict = Depends(get_current_admin_user)):
+    """Connections currently checked out, oldest first, with their call sites."""
+    return [DBPoolHolder(**holder) for holder in get_pool().holders()]
+
+
+@router.get("/email-outbox", response_model=EmailOutboxStats)
+async def get_email_outbox_stats(current_user: dict = Depends(get_current_admin_user)):
+    return EmailOutboxStats(**mailer.stats())
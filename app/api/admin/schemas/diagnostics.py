@@ -0,0 +1,44 @@
+from typing import List, Optional
+
+from app.utils.casing import CamelBaseModel
+
+
+class DBPoolStats(CamelBaseModel):
+    max_size: int
+    size: int
+    in_use: int
+    idle: int
+    waiting: int
+    requests: int
+    requests_queued: int
+    requests_timed_out: int
+    wait_time_avg_ms: float
+    wait_time_max_ms: float
+    connections_opened: int
+    connections_recycled: int
+    connections_broken: int
+    connections_leaked: int
+    connections_reclaimed: int
+
+
+class DBPoolHolder(CamelBaseModel):
+    backend_pid: Optional[int]
+    held_for_ms: float
+    call_site: str
+    task: Optional[str]
+    executing: bool
+    leaked: bool
+    stack: Optional[List[str]] = None
+
+
+class EmailOutboxStats(CamelBaseModel):
+    queue_depth: int
+    retry_pending: int
+    queued: int
+    sent: int
+    retried: int
+    failed: int
+    sessions_opened: int
+    send_time_avg_ms: float
+    send_time_max_ms: float
+    delivery_delay_max_ms: float
@@ -41,7 +41,9 @@ class ProjectResponse(CamelBaseModel):
 
 
 class ProjectList(CamelBaseModel):
-    count: int
+    count: Optional[int] = None
+    next: Optional[str] = None
+    prev: Optional[str] = None
     results: List[ProjectResponse]
 
 
@@ -1,5 +1,5 @@
 from app.utils.casing import CamelBaseModel
-from typing import List
+from typing import List, Optional
 
 
 class ContactResponse(CamelBaseModel):
@@ -13,7 +13,9 @@ class ContactResponse(CamelBaseModel):
 
 
 class ContactList(CamelBaseModel):
-    count: int
+    count: Optional[int] = None
+    next: Optional[str] = None
+    prev: Optional[str] = None
     results: List[ContactResponse]
 
 
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends
-from typing import Optional, List
+from typing import Optional
 from fastapi import Query
 
 from app.database import perform_query
-from app.dependencies import get_current_admin_user
+from app.dependencies import get_current_admin_user, get_db
+from app.utils.pagination import Keyset
+from app.utils.serialization import RowSerializer
+from app.utils.stats import get_dashboard_counts
 from .schemas.website import (
     ContactList,
-    ContactResponse,
     ContactSummary,
     DashboardSummaryResponse,
     ProjectSummary,
@@ -14,44 +16,55 @@ from .schemas.website import (
 
 router = APIRouter(prefix="/website-app")
 
+contact_page = RowSerializer(ContactList)
+
 
 @router.get("/contacts", response_model=ContactList)
 async def list_contact_requests(
     search: Optional[str] = Query(None, description="Search contact name ILIKE"),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque `next`/`prev` token"),
+    with_count: Optional[bool] = Query(
+        None, description="Include the total count (default: only without cursor)"
+    ),
     current_user: dict = Depends(get_current_admin_user),
+    conn=Depends(get_db),
 ):
-    sql = """
-        SELECT
-        cm.*,
-        c.total_count
-        FROM (
+    keyset = Keyset("-created_at", {"created_at": "created_at"}, cursor)
+    with_count = keyset.with_count(with_count)
+    if cursor:
+        offset = 0
+
+    filters = "(%s IS NULL OR full_name ILIKE '%%' || %s || '%%')"
+    sql = f"""
         SELECT *
         FROM contact_message
-        WHERE (%s IS NULL OR full_name ILIKE '%%' || %s || '%%')
-        ORDER BY created_at DESC
-        LIMIT %s OFFSET %s
-        ) cm
-        CROSS JOIN (
-        SELECT COUNT(*) AS total_count
-        FROM contact_message
-        WHERE (%s IS NULL OR full_name ILIKE '%%' || %s || '%%')
-        ) c;
+        WHERE {filters} AND {keyset.where}
+        ORDER BY {keyset.order_by}
+        LIMIT %s OFFSET %s;
     """
 
-    params = (search, search, limit, offset, search, search)
-    rows = perform_query(sql, params)
+    params = (search, search) + keyset.params + (limit + 1, offset)
+    rows = await perform_query(sql, params, conn)
+    rows, next_cursor, prev_cursor = keyset.paginate(rows, limit, offset)
 
-    results: List[ContactResponse] = []
-    total_count = 0
-    for r in rows:
-        data = dict(r)
-        data["created_at"] = r["created_at"].isoformat()
-        total_count = r["total_count"]
-        results.append(ContactResponse(**data))
+    total_count = None
+    if with_count:
+        count_sql = f"SELECT COUNT(*) AS total FROM contact_message WHERE {filters};"
+        total_count = (await perform_query(count_sql, (search, search), conn))[0][
+            "total"
+        ]
 
-    return {"count": total_count, "results": results}
+    results = [{**r, "created_at": r["created_at"].isoformat()} for r in rows]
+
+    page = {
+        "count": total_count,
+        "next": next_cursor,
+        "prev": prev_cursor,
+        "results": results,
+    }
+    return contact_page.response(page)
 
 
 @router.get(
@@ -61,49 +74,25 @@ async def list_contact_requests(
 )
 async def get_dashboard_summary(
     current_user: dict = Depends(get_current_admin_user),
+    conn=Depends(get_db),
 ):
-    def extract_count(result):
-        if isinstance(result, list) and len(result) > 0:
-            row = result[0]
-            if isinstance(row, dict):
-                return list(row.values())[0]
-        return 0
-
-    # Queries
-    query_contact_total = "SELECT COUNT(*) AS count FROM contact_message;"
-    query_contact_new = """
-        SELECT COUNT(*) AS count
-        FROM contact_message
-        WHERE created_at >= date_trunc('week', now());
-    """
-
-    query_total_projects = "SELECT COUNT(*) AS count FROM project;"
-    query_pending = "SELECT COUNT(*) AS count FROM project WHERE status = 'PENDING';"
-    query_accepted = "SELECT COUNT(*) AS count FROM project WHERE status = 'APPROVED';"
-    query_rejected = "SELECT COUNT(*) AS count FROM project WHERE status = 'REJECTED';"
-
-    total_contacts = extract_count(perform_query(query_contact_total))
-    new_contacts = extract_count(perform_query(query_contact_new))
-
-    total_projects = extract_count(perform_query(query_total_projects))
-    pending = extract_count(perform_query(query_pending))
-    accepted = extract_count(perform_query(query_accepted))
-    rejected = extract_count(perform_query(query_rejected))
+    counts = await get_dashboard_counts(conn)
+    total_projects = counts["total_projects"]
 
     success_rate = (
-        round((accepted / total_projects) * 100, 2) if total_projects else 0.0
+        round((counts["accepted"] / total_projects) * 100, 2) if total_projects else 0.0
     )
 
     return DashboardSummaryResponse(
         contact_requests=ContactSummary(
-            total=total_contacts,
-            new=new_contacts,
+            total=counts["total_contacts"],
+            new=counts["new_contacts"],
         ),
         projects=ProjectSummary(
             total=total_projects,
-            pending=pending,
-            accepted=accepted,
-            rejected=rejected,
+            pending=counts["pending"],
+            accepted=counts["accepted"],
+            rejected=counts["rejected"],
             success_rate=success_rate,
         ),
     )
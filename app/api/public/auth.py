@@ -5,9 +5,9 @@ from fastapi import Form, File
 from typing import Annotated
 
 # Project Imports
-from app.database import get_connection, perform_query
+from app.database import perform_query
 from .oauth.auth_validator import AuthTokenValidator
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_db
 from app.utils._jwt import create_access_token, create_refresh_token, decode_token
 from app.utils.generators import generate_username
 from app.utils.user import (
@@ -18,12 +18,12 @@ from app.utils.user import (
     verify_otp,
 )
 from app.utils.send_otp import send_otp_email
+from app.utils.serialization import RowSerializer
 from .schemas.auth import (
     EmailLoginResponse,
     LoginPayload,
     LoginResponse,
     MyProjectList,
-    MyProjectOut,
     OAuthRequest,
     OTPPayload,
     ProfileResponse,
@@ -33,6 +33,8 @@ from .schemas.auth import (
 
 router = APIRouter(prefix="/auth-app")
 
+my_project_page = RowSerializer(MyProjectList)
+
 
 @router.post(
     "/oauth",
@@ -46,17 +48,17 @@ async def oauth(request: Request, payload: OAuthRequest):
         token=payload.auth_token,
     )
 
-    user = get_user_by_email(user_info["email"])
+    user = await get_user_by_email(user_info["email"])
 
     if not user:
         username = generate_username(user_info["email"])
-        create_user(
+        await create_user(
             user_info["email"],
             username,
             user_info["first_name"],
             user_info["last_name"],
         )
-        user = get_user_by_email(user_info["email"])
+        user = await get_user_by_email(user_info["email"])
 
     # JWT
     access = create_access_token(str(user["id"]))
@@ -76,17 +78,15 @@ async def oauth(request: Request, payload: OAuthRequest):
     "/login", status_code=status.HTTP_200_OK, response_model=EmailLoginResponse
 )
 async def login(payload: LoginPayload):
-    conn = get_connection()
-
-    user = get_user_by_email(payload.email)
+    user = await get_user_by_email(payload.email)
     if user:
         user_id = user["id"]
     else:
         username = generate_username(payload.email)
-        user_id = create_user(payload.email, username, conn=conn)
+        user_id = (await create_user(payload.email, username))["id"]
 
     try:
-        send_otp_email(payload.email, user_id, conn=conn)
+        await send_otp_email(payload.email, user_id)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to send OTP: {e}"
@@ -97,14 +97,14 @@ async def login(payload: LoginPayload):
 
 @router.post("/verify-otp", response_model=LoginResponse, status_code=200)
 async def verify(request: Request, payload: OTPPayload):
-    user = get_user_by_email(payload.email)
+    user = await get_user_by_email(payload.email)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    if not verify_otp(user["id"], payload.otp):
+    if not await verify_otp(user["id"], payload.otp):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired OTP"
         )
@@ -148,8 +148,12 @@ async def refresh(request: Request, refresh: str):
 
 
 @router.get("/profile", response_model=ProfileResponse)
-async def profile(request: Request, current_user: dict = Depends(get_current_user)):
-    user_data = get_user_data_by_id(current_user["id"])
+async def profile(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
+    user_data = await get_user_data_by_id(current_user["id"], conn)
 
     if not user_data:
         raise HTTPException(
@@ -170,6 +174,7 @@ async def update_profile(
     phoneNo: Annotated[str | None, Form()] = None,
     photo: Annotated[str | None, File()] = None,
     current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
 ):
 
     data = {
@@ -192,14 +197,15 @@ async def update_profile(
     set_clauses = [f"{field} = %s" for field in data]
     params = list(data.values()) + [current_user["id"]]
 
-    update_user_profile(set_clauses, params)
+    await update_user_profile(set_clauses, params, conn)
 
     return JSONResponse({"message": "Profile updated successfully"})
 
 
 @router.get("/my-projects", response_model=MyProjectList)
-def get_user_projects(
+async def get_user_projects(
     current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
 ):
     sql = """
         WITH filtered AS (
@@ -219,14 +225,8 @@ def get_user_projects(
         ORDER BY submitted_at DESC;
     """
 
-    rows = perform_query(sql, {"submitted_by": current_user["id"]})
-    results: MyProjectList = []
-
-    for r in rows:
-        data = dict(r)
-        data["id"] = int(data["id"])
-        data["submitted_at"] = data["submitted_at"].isoformat()
-
-        results.append(MyProjectOut(**data))
+    rows = await perform_query(sql, {"submitted_by": current_user["id"]}, conn)
+    results = [{**r, "submitted_at": r["submitted_at"].isoformat()} for r in rows]
 
-    return {"count": rows[0]["total_count"] if rows else 0, "results": results}
+    page = {"count": rows[0]["total_count"] if rows else 0, "results": results}
+    return my_project_page.response(page)
@@ -1,6 +1,9 @@
+import asyncio
+
 import httpx
 
 from app.api.public.oauth.constants import AuthProviders
+from app.utils.http import get_http_client
 from .base import OAuthProvider
 
 
@@ -16,76 +19,72 @@ class GitHubOAuth(OAuthProvider):
         client_id = provider_settings["client_id"]
         client_secret = provider_settings["client_secret"]
 
-        async with httpx.AsyncClient() as client:
-            try:
-                # Step 1: Exchange code for access token
-                token_response = await client.post(
-                    "https://github.com/login/oauth/access_token",
-                    headers={"Accept": "application/json"},
-                    data={
-                        "client_id": client_id,
-                        "client_secret": client_secret,
-                        "code": token,
-                    },
-                )
-                token_response.raise_for_status()
-                token_data = token_response.json()
+        client = get_http_client()
+        try:
+            # Step 1: Exchange code for access token
+            token_response = await client.post(
+                "https://github.com/login/oauth/access_token",
+                headers={"Accept": "application/json"},
+                data={
+                    "client_id": client_id,
+                    "client_secret": client_secret,
+                    "code": token,
+                },
+            )
+            token_response.raise_for_status()
+            token_data = token_response.json()
 
-                access_token = token_data.get("access_token")
-                if not access_token:
-                    return {"type": "error", "message": "No access token in response"}
+            access_token = token_data.get("access_token")
+            if not access_token:
+                return {"type": "error", "message": "No access token in response"}
 
-                # Step 2: Fetch user profile
-                user_response = await client.get(
-                    "https://api.github.com/user",
-                    headers={"Authorization": f"Bearer {access_token}"},
-                )
-                user_response.raise_for_status()
-                user_data = user_response.json()
+            # Step 2: Fetch user profile and emails, they don't depend on each other
+            headers = {"Authorization": f"Bearer {access_token}"}
+            user_response, emails_response = await asyncio.gather(
+                client.get("https://api.github.com/user", headers=headers),
+                client.get("https://api.github.com/user/emails", headers=headers),
+            )
+            user_response.raise_for_status()
+            user_data = user_response.json()
 
-                # Step 3: Fetch user emails
-                emails_response = await client.get(
-                    "https://api.github.com/user/emails",
-                    headers={"Authorization": f"Bearer {access_token}"},
-                )
-                emails_response.raise_for_status()
-                emails = emails_response.json()
+            emails_response.raise_for_status()
+            emails = emails_response.json()
 
-                primary_email = next(
-                    (
-                        email["email"]
-                        for email in emails
-                        if email.get("primary") and email.get("verified")
-                    ),
-                    None,
-                )
-                if not primary_email and emails:
-                    primary_email = emails[0]["email"]
+            primary_email = next(
+                (
+                    email["email"]
+                    for email in emails
+                    if email.get("primary") and email.get("verified")
+                ),
+                None,
+            )
+            if not primary_email and emails:
+                primary_email = emails[0]["email"]
 
-                if not primary_email:
-                    return {"type": "error", "message": "Email not found"}
+            if not primary_email:
+                return {"type": "error", "message": "Email not found"}
 
-                # Prepare user info dictionary
-                user_info = {
-                    "type": "success",
-                    "provider": AuthProviders.GITHUB.value,
-                    "email": primary_email,
-                    "first_name": (
-                        user_data.get("name", "").split(" ")[0]
-                        if user_data.get("name")
-                        else ""
-                    ),
-                    "last_name": (
-                        " ".join(user_data.get("name", "").split(" ")[1:])
-                        if user_data.get("name")
-                        else ""
-                    ),
-                    "photo": "",
-                }
+            # Prepare user info dictionary
+            user_info = {
+                "type": "success",
+                "provider": AuthProviders.GITHUB.value,
+                "email": primary_email,
+                "first_name": (
+                    user_data.get("name", "").split(" ")[0]
+                    if user_data.get("name")
+                    else ""
+                ),
+                "last_name": (
+                    " ".join(user_data.get("name", "").split(" ")[1:])
+                    if user_data.get("name")
+                    else ""
+                ),
+                "photo": "",
+            }
 
-                return user_info
+            return user_info
 
-            except httpx.HTTPStatusError as e:
-                return {"type": "error", "message": f"HTTP error: {str(e)}"}
-            except Exception as e:
-                return {"type": "error", "message": f"Unexpected error: {str(e)}"}
+        except httpx.HTTPStatusError as e:
+            return {"type": "error", "message": f"HTTP error: {str(e)}"}
+        except Exception as e:
+            return {"type": "error", "message": f"Unexpected error: {str(e)}"}
@@ -1,15 +1,39 @@
 import httpx
 from fastapi import HTTPException
+from jose import JWTError, jwt
 
 from app.api.public.oauth.base import OAuthProvider
+from app.config import settings
+from app.utils.http import get_http_client
 from .constants import AuthProviders, UserInfo
+from .jwks import JWKSCache
 from .loggers import auth_logger as logger
 from .messages import ERROR_MESSAGES
 
+google_signing_keys = JWKSCache("https://www.googleapis.com/oauth2/v3/certs")
+
 
 class GoogleOAuth(OAuthProvider):
     INFO_API = "https://oauth2.googleapis.com/tokeninfo"
     USER_INFO_API = "https://www.googleapis.com/oauth2/v3/userinfo"
+    ID_TOKEN_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+    @staticmethod
+    def _client_ids(google_settings: dict) -> list[str]:
+        # GOOGLE_CLIENT_ID may list several (web, Android, iOS), comma-separated
+        return [
+            client_id.strip()
+            for client_id in google_settings["client_id"].split(",")
+            if client_id.strip()
+        ]
+
+    @staticmethod
+    def _is_id_token(auth_token: str) -> bool:
+        # A signed JWT names its key; anything else is left to the token API
+        try:
+            return "kid" in jwt.get_unverified_header(auth_token)
+        except JWTError:
+            return False
 
     @classmethod
     async def validate(cls, auth_token: str) -> UserInfo | dict:
@@ -18,45 +42,95 @@ class GoogleOAuth(OAuthProvider):
 
         google_settings = cls._get_provider_settings("google")
 
-        async with httpx.AsyncClient() as client:
-            try:
-                # Validate the token with the provider's token API
-                token_response = await client.get(
-                    cls.INFO_API,
-                    params={"access_token": auth_token},
-                    timeout=10,
+        # ID tokens are JWTs and can be checked against Google's public keys
+        # without calling Google; access tokens are opaque and need the APIs
+        if settings.google_verify_id_tokens and cls._is_id_token(auth_token):
+            return await cls._validate_id_token(auth_token, google_settings)
+
+        client = get_http_client()
+        try:
+            # Validate the token with the provider's token API
+            token_response = await client.get(
+                cls.INFO_API,
+                params={"access_token": auth_token},
+            )
+            token_response.raise_for_status()
+            token_info = token_response.json()
+
+            # Check audience matches client_id(s)
+            if token_info.get("aud") not in cls._client_ids(google_settings):
+                raise HTTPException(
+                    400, "Invalid token: Audience does not match client_id."
                 )
-                token_response.raise_for_status()
-                token_info = token_response.json()
-
-                # Check audience matches client_id(s)
-                if token_info.get("aud") not in google_settings["client_id"]:
-                    raise HTTPException(
-                        400, "Invalid token: Audience does not match client_id."
-                    )
-
-                # Retrieve user information
-                user_response = await client.get(
-                    cls.USER_INFO_API,
-                    params={"access_token": auth_token},
-                    timeout=10,
+
+            # Retrieve user information
+            user_response = await client.get(
+                cls.USER_INFO_API,
+                params={"access_token": auth_token},
+            )
+            user_response.raise_for_status()
+            user_info = user_response.json()
+
+            return {
+                "type": "success",
+                "provider": AuthProviders.GOOGLE.value,
+                "first_name": user_info.get("given_name", ""),
+                "last_name": user_info.get("family_name", ""),
+                "full_name": user_info.get("name", ""),
+                "photo": None,  # FIXME: Add photo handling if needed
+                "email": user_info.get("email", "").strip().lower(),
+            }
+
+        except HTTPException:
+            raise
+        except httpx.HTTPStatusError as err:
+            logger.error(f"Failed to fetch user information from Google API: {err}")
+            raise HTTPException(400, ERROR_MESSAGES["request_failed"]) from err
+        except Exception as err:
+            logger.error(f"Unexpected error occurred: {err}")
+            raise HTTPException(400, ERROR_MESSAGES["signin_failed"]) from err
+
+    @classmethod
+    async def _validate_id_token(cls, id_token: str, google_settings: dict) -> dict:
+        try:
+            header = jwt.get_unverified_header(id_token)
+            key = await google_signing_keys.get_key(header.get("kid"))
+            if key is None:
+                raise HTTPException(400, "Invalid token: Unknown signing key.")
+
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=["RS256"],
+                issuer=cls.ID_TOKEN_ISSUERS,
+                # Google audiences may be any of several client ids, checked below;
+                # at_hash binds an access token we weren't given
+                options={"verify_aud": False, "verify_at_hash": False},
+            )
+
+            if claims.get("aud") not in cls._client_ids(google_settings):
+                raise HTTPException(
+                    400, "Invalid token: Audience does not match client_id."
                 )
-                user_response.raise_for_status()
-                user_info = user_response.json()
-
-                return {
-                    "type": "success",
-                    "provider": AuthProviders.GOOGLE.value,
-                    "first_name": user_info.get("given_name", ""),
-                    "last_name": user_info.get("family_name", ""),
-                    "full_name": user_info.get("name", ""),
-                    "photo": None,  # FIXME: Add photo handling if needed
-                    "email": user_info.get("email", "").strip().lower(),
-                }
-
-            except httpx.HTTPStatusError as err:
-                logger.error(f"Failed to fetch user information from Google API: {err}")
-                raise HTTPException(400, ERROR_MESSAGES["request_failed"]) from err
-            except Exception as err:
-                logger.error(f"Unexpected error occurred: {err}")
-                raise HTTPException(400, ERROR_MESSAGES["signin_failed"]) from err
+
+            if not claims.get("email_verified"):
+                raise HTTPException(400, "Invalid token: Email is not verified.")
+
+            return {
+                "type": "success",
+                "provider": AuthProviders.GOOGLE.value,
+                "first_name": claims.get("given_name", ""),
+                "last_name": claims.get("family_name", ""),
+                "full_name": claims.get("name", ""),
+                "photo": None,  # FIXME: Add photo handling if needed
+                "email": claims.get("email", "").strip().lower(),
+            }
+
+        except HTTPException:
+            raise
+        except httpx.HTTPError as err:
+            logger.error(f"Failed to fetch Google signing keys: {err}")
+            raise HTTPException(400, ERROR_MESSAGES["request_failed"]) from err
+        except Exception as err:
+            logger.error(f"Google ID token rejected: {err}")
+            raise HTTPException(400, ERROR_MESSAGES["signin_failed"]) from err
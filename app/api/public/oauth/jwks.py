@@ -0,0 +1,85 @@
+import asyncio
+import re
+import time
+from typing import Dict, Optional
+
+from app.utils.http import get_http_client
+from .loggers import auth_logger as logger
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class JWKSCache:
+    """
+    In-memory copy of a provider's public signing keys (a JWKS document).
+
+    Keys are kept for as long as the response's `Cache-Control: max-age`
+    allows and refetched after that. An unknown key id also triggers a
+    refetch, at most once per `min_refresh_interval` seconds, to pick up
+    rotated keys without letting bogus tokens hammer the provider.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        default_max_age: float = 3600,
+        min_refresh_interval: float = 60,
+    ):
+        self.url = url
+        self.default_max_age = default_max_age
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, dict] = {}
+        self._expires_at = 0.0
+        self._fetched_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def load(self, jwks: dict, max_age: Optional[float] = None) -> None:
+        """Replace the cached keys, e.g. with locally generated keys in tests."""
+        now = time.monotonic()
+        self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+        self._fetched_at = now
+        self._expires_at = now + (
+            max_age if max_age is not None else self.default_max_age
+        )
+
+    def _should_refresh(self, kid: str) -> bool:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            return True
+        return kid not in self._keys and (
+            self._fetched_at is None
+            or now - self._fetched_at >= self.min_refresh_interval
+        )
+
+    async def _refresh(self) -> None:
+        response = await get_http_client().get(self.url)
+        response.raise_for_status()
+
+        max_age = None
+        match = MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+        if match:
+            age = int(response.headers.get("age", "0") or 0)
+            max_age = max(int(match.group(1)) - age, 0)
+        self.load(response.json(), max_age)
+
+    async def get_key(self, kid: str) -> Optional[dict]:
+        if self._should_refresh(kid):
+            async with self._lock:
+                # Another request may have refreshed while we waited
+                if self._should_refresh(kid):
+                    try:
+                        await self._refresh()
+                    except Exception as err:
+                        logger.error(
+                            f"Failed to refresh signing keys from {self.url}: {err}"
+                        )
+                        if not self._keys:
+                            raise
+                        # Keep the keys we have and try again a bit later
+                        self._fetched_at = time.monotonic()
+                        self._expires_at = max(
+                            self._expires_at,
+                            self._fetched_at + self.min_refresh_interval,
+                        )
+
+        return self._keys.get(kid)
@@ -1,15 +1,38 @@
-from typing import List, Optional
+from typing import Optional
 import uuid
-from fastapi import APIRouter, Depends, Query, HTTPException, status, Path
+from fastapi import (
+    APIRouter,
+    Depends,
+    Query,
+    HTTPException,
+    Request,
+    Response,
+    status,
+    Path,
+)
 from psycopg2 import IntegrityError, DataError
-from psycopg2.extras import RealDictCursor, execute_batch
-import urllib.parse
 
 # Project Imports
 from .utils import slugify
-from app.dependencies import get_current_user
-from app.utils.db import parse_ordering
-from app.database import execute_query, get_connection, perform_query, put_connection
+from app.dependencies import get_current_user, get_db
+from app.utils.casing import to_camel
+from app.utils.db import values_placeholders
+from app.utils.conditional import conditional_get, if_none_match, revalidate_etag
+from app.utils.lookups import lookups, lookups_version, name_contains
+from app.utils.pagination import Keyset
+from app.utils.response_cache import cache_key, response_cache
+from app.utils.serialization import RowSerializer, dumps
+from app.utils.stats import invalidate_dashboard_summary
+from app.utils.views import view_counter
+from app.utils.project import (
+    ProjectQuery,
+    get_versioned_project_detail,
+    invalidate_project_listings,
+    parse_project_fields,
+    project_keyset,
+    project_list_item,
+)
+from app.database import execute_query, perform_query, transaction
 from .schemas.project import (
     BatchYearList,
     BatchYearResponse,
@@ -18,8 +41,8 @@ from .schemas.project import (
     DepartmentList,
     DepartmentResponse,
     DiscussionIn,
+    LookupsResponse,
     ProjectList,
-    ProjectResponse,
     ProjectRetrieveResponse,
     RateProjectPayload,
     ResponseOut,
@@ -29,374 +52,301 @@ from .schemas.project import (
 
 router = APIRouter(prefix="/project-app")
 
+category_page = RowSerializer(CategoryList)
+department_page = RowSerializer(DepartmentList)
+batch_year_page = RowSerializer(BatchYearList)
+project_page = RowSerializer(ProjectList)
+
+# Endpoints served from the lookup snapshot answer If-None-Match with a 304
+# until the tables change
+lookups_conditional = Depends(conditional_get(lookups_version))
+
+
+@router.get("/lookups", response_model=LookupsResponse)
+async def list_lookups(validators: dict = lookups_conditional):
+    """
+    Categories, active departments and active batch years in one payload.
+    """
+    return Response(
+        content=lookups.payload, media_type="application/json", headers=validators
+    )
+
 
 @router.get("/categories", response_model=CategoryList)
 async def list_categories(
+    validators: dict = lookups_conditional,
     search: Optional[str] = Query(None, description="Filter by name icontains"),
     ordering: str = Query("id", description="e.g. id, -name"),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque `next`/`prev` token"),
+    with_count: Optional[bool] = Query(
+        None, description="Include the total count (default: only without cursor)"
+    ),
 ):
-    order_sql = parse_ordering(ordering, {"id", "name", "project_count"})
-
-    data_sql = f"""
-        WITH c AS (
-            SELECT
-                cat.id,
-                cat.name,
-                COUNT(*) FILTER (WHERE proj.is_active) AS project_count
-            FROM category AS cat
-            LEFT JOIN project AS proj
-                   ON proj.category_id = cat.id
-            GROUP BY cat.id
-        )
-        SELECT *,
-               COUNT(*) OVER() AS total
-        FROM c
-        WHERE (%s IS NULL OR name ILIKE '%%' || %s || '%%')            
-        ORDER BY {order_sql}
-        LIMIT %s OFFSET %s;
-    """
-    rows = perform_query(data_sql, (search, search, limit, offset))
-
-    results: List[CategoryResponse] = [CategoryResponse(**row) for row in rows]
-
-    return {"count": rows[0]["total"] if rows else 0, "results": results}
+    keyset = Keyset(
+        ordering, {"id": "id", "name": "name", "project_count": "project_count"}, cursor
+    )
+    with_count = keyset.with_count(with_count)
+    if cursor:
+        offset = 0
+
+    snapshot = await lookups.refresh()
+    matches = name_contains(snapshot.categories, search)
+    rows = keyset.select(matches, limit, offset)
+    rows, next_cursor, prev_cursor = keyset.paginate(rows, limit, offset)
+
+    page = {
+        "count": len(matches) if with_count else None,
+        "next": next_cursor,
+        "prev": prev_cursor,
+        "results": rows,
+    }
+    return category_page.response(page, validators)
 
 
-@router.get("/categories/{cat_id}", response_model=CategoryResponse)
+@router.get(
+    "/categories/{cat_id}",
+    response_model=CategoryResponse,
+    dependencies=[lookups_conditional],
+)
 async def get_category(
     cat_id: int = Path(..., gt=0, description="Numeric primary key of category"),
 ):
-    rows = perform_query("SELECT id, name FROM category WHERE id = %s;", (cat_id,))
+    category = (await lookups.refresh()).get("categories", cat_id)
 
-    if not rows:
+    if category is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
         )
 
-    return rows[0]
+    return category
 
 
 @router.get("/departments", response_model=DepartmentList)
 async def list_departments(
+    validators: dict = lookups_conditional,
     search: Optional[str] = Query(None, description="Filter by name icontains"),
     ordering: str = Query("id", description="e.g. id, -name"),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque `next`/`prev` token"),
+    with_count: Optional[bool] = Query(
+        None, description="Include the total count (default: only without cursor)"
+    ),
 ):
-    order_sql = parse_ordering(ordering, {"id", "name"})
-
-    data_sql = f"""
-        SELECT id, name, COUNT(*) OVER() AS total
-        FROM department
-        WHERE (%s IS NULL OR name ILIKE '%%' || %s || '%%') AND is_active
-        ORDER BY {order_sql}
-        LIMIT %s OFFSET %s;
-    """
-    rows = perform_query(data_sql, (search, search, limit, offset))
-
-    results: List[DepartmentResponse] = [DepartmentResponse(**row) for row in rows]
-
-    return {"count": rows[0]["total"] if rows else 0, "results": results}
+    keyset = Keyset(ordering, {"id": "id", "name": "name"}, cursor)
+    with_count = keyset.with_count(with_count)
+    if cursor:
+        offset = 0
+
+    snapshot = await lookups.refresh()
+    matches = name_contains(snapshot.active_departments(), search)
+    rows = keyset.select(matches, limit, offset)
+    rows, next_cursor, prev_cursor = keyset.paginate(rows, limit, offset)
+
+    page = {
+        "count": len(matches) if with_count else None,
+        "next": next_cursor,
+        "prev": prev_cursor,
+        "results": rows,
+    }
+    return department_page.response(page, validators)
 
 
-@router.get("/departments/{dept_id}", response_model=DepartmentResponse)
+@router.get(
+    "/departments/{dept_id}",
+    response_model=DepartmentResponse,
+    dependencies=[lookups_conditional],
+)
 async def get_department(
     dept_id: int = Path(..., gt=0, description="Numeric primary key of department"),
 ):
-    rows = perform_query("SELECT id, name FROM department WHERE id = %s;", (dept_id,))
+    department = (await lookups.refresh()).get("departments", dept_id)
 
-    if not rows:
+    if department is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Department not found"
         )
 
-    return rows[0]
+    return department
 
 
 @router.get("/batch-years", response_model=BatchYearList)
 async def list_batch_years(
+    validators: dict = lookups_conditional,
     ordering: str = Query("id", description="e.g. id, -year"),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
 ):
-    order_sql = parse_ordering(ordering, {"id", "year"})
-
-    data_sql = f"""
-        SELECT id, year, COUNT(*) OVER() AS total
-        FROM batch_year
-        WHERE is_active
-        ORDER BY {order_sql}
-        LIMIT %s OFFSET %s;
-    """
-    rows = perform_query(data_sql, (limit, offset))
+    keyset = Keyset(ordering, {"id": "id", "year": "year"})
 
-    results: List[BatchYearResponse] = [BatchYearResponse(**row) for row in rows]
+    batch_years = (await lookups.refresh()).active_batch_years()
+    rows = keyset.select(batch_years, limit, offset)[:limit]
 
-    return {"count": rows[0]["total"] if rows else 0, "results": results}
+    page = {"count": len(batch_years), "results": rows}
+    return batch_year_page.response(page, validators)
 
 
-@router.get("/batch-years/{batch_id}", response_model=BatchYearResponse)
+@router.get(
+    "/batch-years/{batch_id}",
+    response_model=BatchYearResponse,
+    dependencies=[lookups_conditional],
+)
 async def get_batch_year(
     batch_id: int = Path(..., gt=0, description="Numeric primary key of batch year id"),
 ):
-    rows = perform_query("SELECT id, year FROM batch_year WHERE id = %s;", (batch_id,))
+    batch_year = (await lookups.refresh()).get("batch_years", batch_id)
 
-    if not rows:
+    if batch_year is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Batch Year not found"
         )
 
-    return rows[0]
+    return batch_year
 
 
 @router.get("/projects", response_model=ProjectList)
 async def list_projects(
-    search: Optional[str] = Query(None, description="Search project title ILIKE"),
+    request: Request,
+    search: Optional[str] = Query(
+        None,
+        description="Full-text search over title, abstract, supervisor and "
+        'technologies, e.g. `neural -vision`, `"deep learning"`. The last word '
+        "also matches as a prefix; a search of only stop words matches titles "
+        "containing it",
+    ),
     category_id: Optional[int] = Query(None, gt=0),
     department_id: Optional[int] = Query(None, gt=0),
     batch_year_id: Optional[int] = Query(None, gt=0),
     level: Optional[str] = Query(None),
     ordering: str = Query(
-        "id", description="Prefix with '-' for DESC. e.g. -submitted_at, rating"
+        "id",
+        description="Prefix with '-' for DESC. e.g. -submitted_at, avg_rating, "
+        "relevance (with search, best match first)",
     ),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque `next`/`prev` token"),
+    with_count: Optional[bool] = Query(
+        None, description="Include the total count (default: only without cursor)"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated result fields to return, e.g. "
+        "id,title,slug,category (default: all)",
+    ),
 ):
-    order_sql = parse_ordering(
-        ordering,
+    search = " ".join(search.split()) if search else None
+    fields = parse_project_fields(fields)
+    keyset = project_keyset(ordering, cursor, search)
+    with_count = keyset.with_count(with_count)
+    if cursor:
+        offset = 0
+
+    async def render() -> str:
+        query = ProjectQuery("p.is_active AND p.status = 'APPROVED'", search=search)
+        query.filter("p.category_id", category_id).filter("p.level", level)
+        query.filter("p.department_id", department_id)
+        query.filter("p.batch_year_id", batch_year_id)
+
+        rows = await perform_query(
+            *query.page(keyset, limit, offset, with_count, fields)
+        )
+        count = rows[0]["total_count"] if rows else 0
+        rows, next_cursor, prev_cursor = keyset.paginate(rows, limit, offset)
+
+        if with_count and cursor:
+            count = (await perform_query(*query.count()))[0]["total"]
+
+        page = {
+            "count": count if with_count else None,
+            "next": next_cursor,
+            "prev": prev_cursor,
+            "results": [project_list_item(r, fields) for r in rows],
+        }
+        if fields:
+            # Partial results don't fit ProjectResponse; camelCase them as is
+            page["results"] = [
+                {to_camel(name): value for name, value in item.items()}
+                for item in page["results"]
+            ]
+            return dumps(page).decode()
+
+        return project_page.dump(page).decode()
+
+    # Same filters, page and ordering share one cached body. Listings for one
+    # category are tagged with it, others with "projects"; see
+    # invalidate_project_listings
+    key = cache_key(
+        "projects",
         {
-            "id": "p.id",
-            "title": "p.title",
-            "submitted_at": "p.submitted_at",
-            "avg_rating": "avg_rating",
+            "search": search,
+            "category_id": category_id,
+            "department_id": department_id,
+            "batch_year_id": batch_year_id,
+            "level": level,
+            "ordering": ordering,
+            "limit": limit,
+            "offset": offset,
+            "cursor": cursor,
+            "with_count": with_count,
+            "fields": ",".join(fields) if fields else None,
         },
     )
+    tags = [f"category:{category_id}"] if category_id else ["projects"]
+    # The ETag is the body's hash, stored with the cache entry, so a client
+    # holding a cached body is answered without the listing being queried
+    digest, body = await response_cache.get_or_set_entry(key, tags, render)
+    headers = revalidate_etag(request, f'"{digest}"')
 
-    sql = f"""
-        WITH filtered AS (
-            SELECT
-                p.*,
-                c.id AS category_id,
-                c.name AS category_name,
-                d.id AS department_id,
-                d.name AS department_name,
-                b.id AS batch_year_id,
-                b.year AS batch_year_year,
-                u.first_name || ' ' || u.last_name AS submitted_by_full_name,
-                COALESCE(AVG(pr.rating)::numeric(3,2), 5.0) AS avg_rating,
-                COUNT(*) OVER() AS total_count
-            FROM project AS p
-            LEFT JOIN project_rating AS pr ON pr.project_id = p.id
-            JOIN category AS c ON p.category_id = c.id
-            JOIN department AS d ON p.department_id = d.id
-            JOIN batch_year AS b ON p.batch_year_id = b.id
-            JOIN "user" AS u ON p.submitted_by = u.id
-            WHERE p.is_active AND p.status = 'APPROVED'
-            AND (%s IS NULL OR p.title ILIKE '%%' || %s || '%%')
-            AND (%s IS NULL OR p.category_id   = %s)
-            AND (%s IS NULL OR p.level   = %s)
-            AND (%s IS NULL OR p.department_id = %s)
-            AND (%s IS NULL OR p.batch_year_id = %s)
-            GROUP BY p.id, c.id, d.id, b.id, u.id
-        )
-        SELECT * FROM filtered
-        ORDER BY {order_sql}
-        LIMIT %s OFFSET %s;
-    """
-
-    params = (
-        search,
-        search,
-        category_id,
-        category_id,
-        level,
-        level,
-        department_id,
-        department_id,
-        batch_year_id,
-        batch_year_id,
-        limit,
-        offset,
-    )
-
-    rows = perform_query(sql, params)
-
-    results: List[ProjectResponse] = []
-    for r in rows:
-        data = dict(r)
-        data["submitted_at"] = r["submitted_at"].isoformat()
-        data["rating_average"] = float(r["avg_rating"])
+    return Response(content=body, media_type="application/json", headers=headers)
 
-        data["category"] = {"id": r["category_id"], "name": r["category_name"]}
-        data["department"] = {"id": r["department_id"], "name": r["department_name"]}
-        data["batch_year"] = {"id": r["batch_year_id"], "year": r["batch_year_year"]}
 
-        # Remove individual FK fields
-        for fk in [
-            "category_id",
-            "category_name",
-            "department_id",
-            "department_name",
-            "batch_year_id",
-            "batch_year_year",
-            "avg_rating",
-        ]:
-            data.pop(fk, None)
-
-        results.append(ProjectResponse(**data))
-
-    return {"count": rows[0]["total_count"] if rows else 0, "results": results}
+PUBLIC_PROJECT_WHERE = "p.is_active AND p.status = 'APPROVED' AND p.slug = %s"
 
 
 @router.get("/projects/{project_slug}", response_model=ProjectRetrieveResponse)
 async def get_project(
+    request: Request,
+    response: Response,
     project_slug: str = Path(..., description="project slug unique"),
 ):
-    sql = """
-    WITH rating_stats AS (
-        SELECT
-            project_id,
-            COUNT(*) AS total_ratings,
-            COALESCE(AVG(rating)::numeric(3,2), 5.0) AS avg_rating
-        FROM project_rating
-        GROUP BY project_id
-    ), filtered AS (
-        SELECT
-            p.id,
-            p.title,
-            p.abstract,
-            p.level,
-            p.views,
-            p.slug,
-            p.supervisor,
-            p.technologies_used,
-            p.github_link,
-            p.documentation_link,
-            p.project_details,
-            p.status,
-            p.submitted_at,
-            u.first_name || ' ' || u.last_name AS submitted_by_full_name,
-            c.id AS category_id,
-            c.name AS category_name,
-            d.id AS department_id,
-            d.name AS department_name,
-            b.id AS batch_year_id,
-            b.year AS batch_year_year,
-            COALESCE(rs.total_ratings, 0) AS total_ratings,
-            COALESCE(rs.avg_rating, 5.0) AS avg_rating
-        FROM project AS p
-        LEFT JOIN rating_stats AS rs ON rs.project_id = p.id
-        JOIN category AS c ON p.category_id = c.id
-        JOIN department AS d ON p.department_id = d.id
-        JOIN batch_year AS b ON p.batch_year_id = b.id
-        JOIN "user" AS u ON p.submitted_by = u.id
-        WHERE p.is_active AND p.status = 'APPROVED' AND p.slug = %s
+    # The client's ETags are checked in the detail query itself, which skips
+    # building the body when one of them is current
+    found = await get_versioned_project_detail(
+        PUBLIC_PROJECT_WHERE, (project_slug,), if_none_match(request)
     )
-    SELECT * FROM filtered;
-
-    """
-
-    project_rows = perform_query(sql, (project_slug,))
-    if not project_rows:
+    if not found:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    project_row = project_rows[0]
-
-    team_sql = "SELECT id, full_name, roll_no, photo FROM project_team_member WHERE project_id = %s;"
-    files_sql = "SELECT id, file_type, file FROM project_files WHERE project_id = %s;"
-
-    team_members = perform_query(team_sql, (project_row["id"],))
-    files = perform_query(files_sql, (project_row["id"],))
-
-    # Convert comma-separated strings into arrays
-    technologies = (
-        [tech.strip() for tech in project_row["technologies_used"].split(",")]
-        if project_row["technologies_used"]
-        else []
-    )
-    github_links = (
-        [
-            urllib.parse.unquote(link.strip())
-            for link in project_row["github_link"].split(",")
-        ]
-        if project_row["github_link"]
-        else []
-    )
-
-    data = {
-        "id": project_row["id"],
-        "slug": project_row["slug"],
-        "title": project_row["title"],
-        "abstract": project_row["abstract"],
-        "level": project_row["level"],
-        "supervisor": project_row["supervisor"],
-        "technologies_used": technologies,
-        "github_links": github_links,
-        "documentation_link": project_row["documentation_link"],
-        "project_details": project_row["project_details"],
-        "status": project_row["status"],
-        "submitted_at": (
-            project_row["submitted_at"].isoformat()
-            if hasattr(project_row["submitted_at"], "isoformat")
-            else project_row["submitted_at"]
-        ),
-        "submitted_by_full_name": project_row["submitted_by_full_name"],
-        "category": {
-            "id": project_row["category_id"],
-            "name": project_row["category_name"],
-        },
-        "department": {
-            "id": project_row["department_id"],
-            "name": project_row["department_name"],
-        },
-        "batch_year": {
-            "id": project_row["batch_year_id"],
-            "year": project_row["batch_year_year"],
-        },
-        "rating_average": float(project_row["avg_rating"]),
-        "views": project_row["views"],
-        "total_ratings": project_row["total_ratings"],
-        "team_members": [
-            {
-                "id": t["id"],
-                "full_name": t["full_name"],
-                "roll_no": t["roll_no"],
-                "photo": t["photo"],
-            }
-            for t in team_members
-        ],
-        "files": [
-            {"id": f["id"], "file_type": f["file_type"], "file": f["file"]}
-            for f in files
-        ],
-    }
-
-    return data
+    version, project = found
+    response.headers.update(revalidate_etag(request, f'"{version}"'))
+    return project
 
 
 @router.post("/submit-project", response_model=ResponseOut, status_code=201)
-async def submit_project(payload: SubmitProjectPayload, user=Depends(get_current_user)):
+async def submit_project(
+    payload: SubmitProjectPayload,
+    user=Depends(get_current_user),
+    conn=Depends(get_db),
+):
     def _s(v):
         return str(v) if v is not None else None
 
-    conn = get_connection()
-
     try:
-        # Start a transaction
-        conn.autocommit = False
-
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        async with transaction(conn):
             slug = slugify(payload.title)
 
             # Ensure uniqueness by querying project table before insert
-            cur.execute("SELECT COUNT(*) FROM project WHERE slug = %s", (slug,))
-            if cur.fetchone()["count"] > 0:
+            rows = await perform_query(
+                "SELECT COUNT(*) FROM project WHERE slug = %s", (slug,), conn
+            )
+            if rows[0]["count"] > 0:
                 slug = f"{slug}-{uuid.uuid4().hex[:8]}"
 
             # Insert project and return id
-            cur.execute(
+            project_row = await execute_query(
                 """
                 INSERT INTO project (
                     title, slug, abstract, batch_year_id, category_id, 
@@ -423,46 +373,49 @@ async def submit_project(payload: SubmitProjectPayload, user=Depends(get_current
                     user["id"],
                     user["id"],
                 ),
+                conn,
             )
-            project_row = cur.fetchone()
             project_id = project_row["id"]
 
-            # Insert team members (batch insert is faster, too)
+            # Insert team members in a single multi-row statement
             if payload.team_members:
-                execute_batch(
-                    cur,
-                    """
-                    INSERT INTO project_team_member (project_id, full_name, roll_no, photo)
-                    VALUES (%s, %s, %s, %s)
-                    """,
-                    [
-                        (
+                await execute_query(
+                    "INSERT INTO project_team_member (project_id, full_name, roll_no, photo) "
+                    f"VALUES {values_placeholders(len(payload.team_members), 4)}",
+                    tuple(
+                        value
+                        for tm in payload.team_members
+                        for value in (
                             project_id,
                             tm.full_name.strip().title(),
                             tm.roll_no.strip().upper(),
                             _s(tm.photo),
                         )
-                        for tm in payload.team_members
-                    ],
+                    ),
+                    conn,
                 )
 
             # Insert files
             if payload.files:
-                execute_batch(
-                    cur,
-                    """
-                    INSERT INTO project_files (project_id, file_type, file)
-                    VALUES (%s, %s, %s)
-                    """,
-                    [(project_id, f.file_type, _s(f.file)) for f in payload.files],
+                await execute_query(
+                    "INSERT INTO project_files (project_id, file_type, file) "
+                    f"VALUES {values_placeholders(len(payload.files), 3)}",
+                    tuple(
+                        value
+                        for f in payload.files
+                        for value in (project_id, f.file_type, _s(f.file))
+                    ),
+                    conn,
                 )
 
-        # If we get here, everything is fine
-        conn.commit()
+        # The category's project count just changed
+        lookups.invalidate()
+        invalidate_dashboard_summary()
+        # New projects are pending review and not listed publicly until
+        # review_project approves them, which drops the cached listings
         return ResponseOut(message="Project submitted successfully")
 
     except IntegrityError as e:
-        conn.rollback()
         # Log exact constraint for diagnosis
         constraint = getattr(getattr(e, "diag", None), "constraint_name", None)
         raise HTTPException(
@@ -470,40 +423,30 @@ async def submit_project(payload: SubmitProjectPayload, user=Depends(get_current
             detail=f"Integrity error ({constraint}): Please check your foreign keys or unique constraints.",
         )
     except DataError as e:
-        conn.rollback()
         raise HTTPException(
             status_code=400, detail=f"Invalid data: {getattr(e, 'pgerror', str(e))}"
         )
     except Exception as e:
-        conn.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"An unexpected error occurred while submitting the project. {str(e)}",
         )
-    finally:
-        put_connection(conn)
 
 
 @router.post(
     "/projects/{project_id}/increase-view", response_model=dict, status_code=200
 )
-def increase_view_count(project_id: int):
+async def increase_view_count(project_id: int, request: Request):
     try:
-        row = execute_query(
-            """
-            UPDATE project
-            SET views = views + 1,
-                updated_at = NOW()
-            WHERE id = %s
-            RETURNING views;
-            """,
-            (project_id,),
+        # Buffered and written in batches; the count returned is approximate
+        views = await view_counter.record(
+            project_id, visitor=request.client.host if request.client else None
         )
 
-        if not row:
+        if views is None:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        return {"views": row["views"] if isinstance(row, dict) else row}
+        return {"views": views}
 
     except HTTPException:
         raise
@@ -517,24 +460,32 @@ def increase_view_count(project_id: int):
 @router.patch(
     "/projects/{project_id}/rate", response_model=ResponseOut, status_code=200
 )
-def rate_project(
+async def rate_project(
     project_id: int,
     payload: RateProjectPayload,
     user=Depends(get_current_user),
+    conn=Depends(get_db),
 ):
     try:
-        execute_query(
+        rows = await perform_query(
             """
-            INSERT INTO project_rating (project_id, user_id, rating)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (project_id, user_id)
-            DO UPDATE SET rating = EXCLUDED.rating, updated_at = now();
+            WITH rated AS (
+                INSERT INTO project_rating (project_id, user_id, rating)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (project_id, user_id)
+                DO UPDATE SET rating = EXCLUDED.rating, updated_at = now()
+                RETURNING project_id
+            )
+            SELECT p.category_id FROM rated JOIN project AS p ON p.id = rated.project_id;
             """,
             (project_id, user["id"], payload.rating),
+            conn,
         )
+        # Listings show and sort by the average rating
+        await invalidate_project_listings(rows[0]["category_id"] if rows else None)
 
         return {"message": "Thank you for your feedback."}
-    except Exception as e:
+    except Exception:
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while submitting the project.",
@@ -542,19 +493,21 @@ def rate_project(
 
 
 @router.post("/{project_id}/comments", response_model=ResponseOut, status_code=201)
-def add_comment(
+async def add_comment(
     project_id: int,
     payload: DiscussionIn,
     user=Depends(get_current_user),
+    conn=Depends(get_db),
 ):
     """
     Add a root comment or reply (`parent_id` optional).
     """
     # Validate parent belongs to same project (if provided)
     if payload.parent_id is not None:
-        parent = perform_query(
+        parent = await perform_query(
             "SELECT project_id FROM project_discussion WHERE id = %s;",
             (payload.parent_id,),
+            conn,
         )
         if not parent:
             raise HTTPException(404, "Parent comment not found")
@@ -13,7 +13,9 @@ class CategoryResponse(CamelBaseModel):
 
 
 class CategoryList(CamelBaseModel):
-    count: int
+    count: Optional[int] = None
+    next: Optional[str] = None
+    prev: Optional[str] = None
     results: List[CategoryResponse]
 
 
@@ -23,7 +25,9 @@ class DepartmentResponse(CamelBaseModel):
 
 
 class DepartmentList(CamelBaseModel):
-    count: int
+    count: Optional[int] = None
+    next: Optional[str] = None
+    prev: Optional[str] = None
     results: List[DepartmentResponse]
 
 
@@ -37,6 +41,12 @@ class BatchYearList(CamelBaseModel):
     results: List[BatchYearResponse]
 
 
+class LookupsResponse(CamelBaseModel):
+    categories: List[CategoryResponse]
+    departments: List[DepartmentResponse]
+    batch_years: List[BatchYearResponse]
+
+
 class CategoryOut(CamelBaseModel):
     id: int
     name: str
@@ -73,7 +83,9 @@ class ProjectResponse(CamelBaseModel):
 
 
 class ProjectList(CamelBaseModel):
-    count: int
+    count: Optional[int] = None
+    next: Optional[str] = None
+    prev: Optional[str] = None
     results: List[ProjectResponse]
 
 
@@ -1,16 +1,22 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Request, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from app.api.public.schemas.project import CategoryList, CategoryResponse
-from app.utils.db import parse_ordering
+from app.api.public.schemas.project import CategoryList
+from app.utils.conditional import conditional_get
+from app.utils.lookups import lookups, lookups_version, name_contains
+from app.utils.pagination import Keyset
+from app.utils.serialization import RowSerializer
+from app.utils.stats import invalidate_dashboard_summary
 
 from .schemas.website import ContactPayload, NewsletterSubscribePayload, StatsOut
-from app.database import execute_query, perform_query
+from app.database import execute_query
 from app.utils.throttling import limiter
 
 
 router = APIRouter(prefix="/website-app")
 
+category_page = RowSerializer(CategoryList)
+
 CONTACT_LIMIT = "5/minute"  # allow 5 messages per IP per minute
 
 
@@ -23,7 +29,7 @@ async def subscribe_newsletter(request: Request, payload: NewsletterSubscribePay
             VALUES (%s)
             ON CONFLICT (email) DO NOTHING;
         """
-        execute_query(sql, (payload.email,))
+        await execute_query(sql, (payload.email,))
     except Exception:
         raise HTTPException("Failed to subscribe newsletter")
 
@@ -47,62 +53,52 @@ async def send_contact_request(request: Request, payload: ContactPayload):
             payload.subject,
             payload.message,
         )
-        execute_query(sql, params)
+        await execute_query(sql, params)
     except Exception:
         raise HTTPException("Failed to send request. Try again!")
 
+    invalidate_dashboard_summary()
+
     return {
         "message": "Thank you for your message! We'll get back to you soon.",
     }
 
 
-@router.get("/stats", response_model=StatsOut)
-def get_stats():
+@router.get(
+    "/stats",
+    response_model=StatsOut,
+    dependencies=[Depends(conditional_get(lookups_version))],
+)
+async def get_stats():
     """
     Return simple aggregate counts used for dashboard cards.
     """
-    row = perform_query(
-        """
-        SELECT
-            (SELECT COUNT(*) FROM department WHERE is_active) AS departments,
-            (SELECT COUNT(*) FROM category WHERE is_active) AS categories,
-            (SELECT COUNT(*) FROM batch_year WHERE is_active) AS batches,
-            (SELECT COUNT(*) FROM project WHERE is_active) AS projects;
-        """
-    )[0]
+    snapshot = await lookups.refresh()
 
-    return StatsOut(**row)
+    return StatsOut(
+        departments=len(snapshot.active_departments()),
+        categories=sum(1 for row in snapshot.categories if row["is_active"]),
+        batches=len(snapshot.active_batch_years()),
+        # Every project has a category, so the per-category counts add up
+        projects=sum(row["project_count"] for row in snapshot.categories),
+    )
 
 
 @router.get("/categories", response_model=CategoryList)
 async def list_categories(
+    validators: dict = Depends(conditional_get(lookups_version)),
     search: Optional[str] = Query(None, description="Filter by name icontains"),
     ordering: str = Query("id", description="e.g. id, -name"),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
 ):
-    order_sql = parse_ordering(ordering, {"id", "name", "project_count"})
-
-    data_sql = f"""
-        WITH c AS (
-            SELECT
-                cat.id,
-                cat.name,
-                COUNT(*) FILTER (WHERE proj.is_active) AS project_count
-            FROM category AS cat
-            LEFT JOIN project AS proj
-                   ON proj.category_id = cat.id
-            GROUP BY cat.id
-        )
-        SELECT *,
-               COUNT(*) OVER() AS total
-        FROM c
-        WHERE (%s IS NULL OR name ILIKE '%%' || %s || '%%')            
-        ORDER BY {order_sql}
-        LIMIT %s OFFSET %s;
-    """
-    rows = perform_query(data_sql, (search, search, limit, offset))
+    keyset = Keyset(
+        ordering, {"id": "id", "name": "name", "project_count": "project_count"}
+    )
 
-    results: List[CategoryResponse] = [CategoryResponse(**row) for row in rows]
+    # Served from the lookup snapshot; project counts are kept by a trigger
+    matches = name_contains((await lookups.refresh()).categories, search)
+    rows = keyset.select(matches, limit, offset)[:limit]
 
-    return {"count": rows[0]["total"] if rows else 0, "results": results}
+    page = {"count": len(matches), "results": rows}
+    return category_page.response(page, validators)
@@ -1,6 +1,6 @@
 from pathlib import Path
 from pydantic import EmailStr
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,15 +13,72 @@ class Settings(BaseSettings):
     allowed_cors_origins: List[str] = []
     allowed_hosts: List[str] = []
     otp_lifetime: int = 10
+    seed_on_startup: bool = True  # off when `python seed.py` runs on deploy
+    lookup_cache_ttl: int = 60  # seconds categories/departments/batch years are cached
+    dashboard_cache_ttl: int = 30  # seconds the admin dashboard counts are cached
+    otp_backend: str = "redis"  # or "sql"; redis falls back to user_verification
+    otp_max_attempts: int = 5  # wrong guesses before an OTP is burned (redis only)
+    redis_url: str = "redis://localhost:6379"
+
+    # Database Pool Config
+    web_concurrency: int = 1  # uvicorn/gunicorn worker processes (WEB_CONCURRENCY)
+    db_pool_min_size: int = 1  # connections opened at startup, per worker
+    db_pool_max_size: int = 10  # per worker
+    db_max_connections: int = 0  # total across workers, overrides max size if set
+    db_pool_timeout: float = 30.0  # seconds to wait for a free connection
+    db_pool_max_uses: int = 5000  # recycle a connection after N checkouts
+    db_pool_max_lifetime: int = 1800  # seconds, recycle older connections
+    db_pool_check_idle_after: int = 30  # seconds idle before a SELECT 1 check
+    db_pool_leak_timeout: int = 60  # seconds a checkout may be held, 0 = off
+    db_pool_reclaim_leaks: bool = False  # close leaked connections, not just log
+    db_pool_trace_checkouts: bool = False  # keep the full stack of every checkout
+
+    # Project Views Config
+    view_flush_interval: float = 5.0  # seconds between batched view count writes
+    view_dedupe_window: int = 0  # seconds a repeat view by one visitor is ignored
+
+    # HTTP Caching Config (public GET endpoints with ETags)
+    cache_control: str = "no-cache"  # revalidate before reuse; 304s are cheap
+    cache_control_routes: Dict[str, str] = {}  # by endpoint name, e.g. get_stats
+
+    # Response Compression Config
+    compression_min_size: int = 1024  # bytes; smaller bodies are sent as they are
+    compression_content_types: List[str] = ["application/json", "text/html"]
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5  # 0-11; higher is smaller but slower
+    compression_cache_size: int = 512  # compressed bodies kept, by body hash
+
+    # Response Cache Config (public project listings)
+    response_cache_ttl: int = 30  # seconds a rendered listing is reused, 0 = off
+    response_cache_size: int = 512  # entries kept per worker
+    response_cache_redis: bool = False  # also share entries across workers via Redis
+
+    # Auth Config
+    user_cache_ttl: int = 30  # seconds an authenticated user is cached, 0 = off
+    user_cache_size: int = 10000
 
     # Email Config
     email_host: str
     email_port: int
     email_username: EmailStr
     email_password: str
+    email_use_tls: bool = True  # STARTTLS; off for a local SMTP stand-in
+    email_batch_size: int = 20  # messages sent per SMTP session round
+    email_max_attempts: int = 5
+    email_retry_backoff: float = 2.0  # seconds before the first retry, doubled after
+    email_idle_timeout: int = 60  # seconds an unused SMTP session is kept open
+    email_queue_size: int = 1000
+
+    # Outgoing HTTP Config (OAuth providers)
+    http_timeout: float = 10.0  # seconds, per read/write/pool wait
+    http_connect_timeout: float = 5.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # seconds an idle connection is kept
 
-    google_client_id: str
+    google_client_id: str  # comma-separated if several clients sign in
     google_client_secret: str
+    google_verify_id_tokens: bool = False  # check ID tokens locally, no API calls
 
     github_client_id: str
     github_client_secret: str
@@ -1,51 +1,555 @@
-from psycopg2 import pool
-from psycopg2.extras import RealDictCursor
-from typing import Optional, Any, Tuple
-from psycopg2.extras import RealDictCursor
+import asyncio
+import contextlib
+import logging
+import sys
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg2
+from fastapi import HTTPException, status
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor, wait_select
 
 from .config import settings
 
 DATABASE_URL = settings.database_url
 
-db_pool = pool.SimpleConnectionPool(
-    minconn=1, maxconn=10, dsn=DATABASE_URL, cursor_factory=RealDictCursor
-)
+logger = logging.getLogger(__name__)
+
+# Frames skipped when looking for the code that checked a connection out
+_INTERNAL_FILES = (__file__, contextlib.__file__)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+async def wait(conn) -> None:
+    """
+    Drive an asynchronous psycopg2 connection until its pending operation completes.
+
+    The event loop watches the connection socket, so a request waiting on
+    Postgres never blocks the other requests served by the same worker.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            return
+
+        if state == extensions.POLL_READ:
+            add, remove = loop.add_reader, loop.remove_reader
+        elif state == extensions.POLL_WRITE:
+            add, remove = loop.add_writer, loop.remove_writer
+        else:
+            raise psycopg2.OperationalError(f"Unexpected poll state: {state}")
+
+        fd = conn.fileno()
+        waiter = loop.create_future()
+        try:
+            add(fd, _wake, waiter)
+        except NotImplementedError:
+            # Event loops without socket callbacks (Windows proactor)
+            await asyncio.to_thread(wait_select, conn)
+            return
+
+        try:
+            await waiter
+        finally:
+            remove(fd)
+
+
+class PoolTimeout(HTTPException):
+    """Raised when no connection frees up within the pool timeout."""
+
+    def __init__(self, timeout: float):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly.",
+            headers={"Retry-After": str(max(1, round(timeout)))},
+        )
+
+
+class PoolClosed(HTTPException):
+    """Raised to callers waiting on, or asking, a pool that has been closed."""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is shutting down, please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PooledConnection(extensions.connection):
+    """psycopg2 connection carrying the bookkeeping the pool needs."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.uses = 0
+        self.pool = None
+
+
+@dataclass
+class Checkout:
+    """Who holds a pooled connection and since when."""
+
+    acquired_at: float
+    call_site: str
+    task: Optional[str]
+    stack: Optional[List[str]] = None
+    reported: bool = False
+
+
+def _call_site() -> str:
+    """Return `file:line in function` of the first frame outside this module."""
+    frame = sys._getframe(1)
+    while frame and frame.f_code.co_filename in _INTERNAL_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    return f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+
+class AsyncConnectionPool:
+    """
+    Bounded pool of non-blocking psycopg2 connections shared by every request handler.
+
+    Connections are opened on demand up to `max_size`. Callers beyond that
+    queue up in FIFO order and get a 503 (`PoolTimeout`) only if nothing frees
+    up within `timeout` seconds. Idle connections are checked before they are
+    handed out, and recycled after `max_uses` checkouts or `max_lifetime`
+    seconds so server-side resources don't pile up on long-lived sessions.
+
+    Every checkout records its call site and age. Connections held longer
+    than `leak_timeout` seconds are logged and, with `reclaim_leaks`, closed
+    and their slot returned to the pool. `trace_checkouts` additionally keeps
+    the full stack of each checkout, which is handy in development but costs
+    a stack walk per query.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        max_uses: int = 0,
+        max_lifetime: float = 0,
+        check_idle_after: float = 0,
+        leak_timeout: float = 0,
+        reclaim_leaks: bool = False,
+        trace_checkouts: bool = False,
+    ):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.max_lifetime = max_lifetime
+        self.check_idle_after = check_idle_after
+        self.leak_timeout = leak_timeout
+        self.reclaim_leaks = reclaim_leaks
+        self.trace_checkouts = trace_checkouts
+        self._idle: deque = deque()
+        self._waiters: deque = deque()
+        self._holders: Dict[Any, Checkout] = {}
+        self._size = 0
+        self._closed = False
+        self._monitor: Optional[asyncio.Task] = None
+        self._counters = {
+            "requests": 0,
+            "requests_queued": 0,
+            "requests_timed_out": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "connections_opened": 0,
+            "connections_recycled": 0,
+            "connections_broken": 0,
+            "connections_leaked": 0,
+            "connections_reclaimed": 0,
+        }
+
+    async def _connect(self):
+        conn = psycopg2.connect(
+            self.dsn, async_=True, connection_factory=PooledConnection
+        )
+        try:
+            await wait(conn)
+        except BaseException:
+            conn.close()
+            raise
+        self._counters["connections_opened"] += 1
+        conn.pool = self
+        return conn
+
+    async def open(self) -> None:
+        """Open `min_size` connections up front and start the leak monitor."""
+        self._closed = False
+        if self.leak_timeout and self._monitor is None:
+            self._monitor = asyncio.create_task(self._watch_leaks())
+        while self._size < self.min_size:
+            self._size += 1
+            try:
+                self._idle.append(await self._connect())
+            except BaseException:
+                self._size -= 1
+                raise
+
+    def _expired(self, conn) -> bool:
+        if self.max_uses and conn.uses >= self.max_uses:
+            return True
+        if self.max_lifetime:
+            return time.monotonic() - conn.created_at >= self.max_lifetime
+        return False
+
+    async def _check(self, conn) -> bool:
+        """Return True if an idle connection is still fit to hand out."""
+        if conn.closed or conn.status != extensions.STATUS_READY:
+            return False
+
+        if (
+            self.check_idle_after
+            and time.monotonic() - conn.last_used_at >= self.check_idle_after
+        ):
+            # Idle for a while: the server or a proxy may have dropped it
+            try:
+                conn.cursor().execute("SELECT 1")
+                await wait(conn)
+            except psycopg2.Error:
+                return False
+
+        return True
+
+    async def getconn(self):
+        started = time.monotonic()
+        self._counters["requests"] += 1
+        conn = await self._acquire(started)
+
+        waited = time.monotonic() - started
+        self._counters["wait_time_total"] += waited
+        self._counters["wait_time_max"] = max(self._counters["wait_time_max"], waited)
+
+        conn.uses += 1
+        task = asyncio.current_task()
+        self._holders[conn] = Checkout(
+            acquired_at=time.monotonic(),
+            call_site=_call_site(),
+            task=task.get_name() if task else None,
+            stack=traceback.format_stack()[:-1] if self.trace_checkouts else None,
+        )
+        return conn
+
+    async def _open_slot(self):
+        """Open a connection in a slot the caller has already reserved."""
+        try:
+            return await self._connect()
+        except BaseException:
+            self._free_slot()
+            raise
 
+    async def _acquire(self, started: float):
+        if self._closed:
+            raise PoolClosed()
 
-def get_connection():
-    return db_pool.getconn()
+        # Queued callers come first: idle connections and free slots are only
+        # taken directly while nobody is waiting
+        if self._idle and not self._waiters:
+            conn = self._idle.pop()
+        elif not self._waiters and self._size < self.max_size:
+            self._size += 1
+            conn = None
+        else:
+            # A connection, or None for a slot that was freed for us
+            conn = await self._queue(started)
 
+        if conn is not None:
+            if await self._check(conn):
+                return conn
+            # Replace the broken connection in the slot it held
+            self._counters["connections_broken"] += 1
+            if not conn.closed:
+                conn.close()
 
-def put_connection(conn):
-    db_pool.putconn(conn)
+        return await self._open_slot()
 
+    async def _queue(self, started: float):
+        """Wait in line for a connection; `putconn` serves waiters in FIFO order."""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        timer = loop.call_later(
+            max(0.0, self.timeout - (time.monotonic() - started)),
+            self._expire,
+            waiter,
+        )
+        self._waiters.append(waiter)
+        self._counters["requests_queued"] += 1
+        try:
+            return await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled() and not waiter.exception():
+                # Handed a connection or slot but cancelled before using it
+                conn = waiter.result()
+                if conn is None:
+                    self._free_slot()
+                else:
+                    self._handover(conn)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            timer.cancel()
 
-def perform_query(query: str, params: tuple = (), conn=None):
-    close_after = False
+    def _expire(self, waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            self._counters["requests_timed_out"] += 1
+            waiter.set_exception(PoolTimeout(self.timeout))
+
+    async def putconn(self, conn) -> None:
+        if self._holders.pop(conn, None) is None:
+            # Already reclaimed by the leak monitor, its slot is gone
+            if not conn.closed:
+                conn.close()
+            return
+
+        reusable = False
+        try:
+            if not conn.closed and not conn.isexecuting():
+                tx_status = conn.info.transaction_status
+                if tx_status in (
+                    extensions.TRANSACTION_STATUS_INTRANS,
+                    extensions.TRANSACTION_STATUS_INERROR,
+                ):
+                    # Left inside an explicit transaction: discard its work
+                    conn.cursor().execute("ROLLBACK")
+                    await wait(conn)
+                    tx_status = conn.info.transaction_status
+
+                reusable = tx_status == extensions.TRANSACTION_STATUS_IDLE
+        finally:
+            if reusable and not self._closed and not self._expired(conn):
+                conn.last_used_at = time.monotonic()
+                self._handover(conn)
+            else:
+                if reusable and not self._closed:
+                    self._counters["connections_recycled"] += 1
+                # Recycled, closed, mid-query (e.g. the caller was cancelled) or broken
+                self._discard(conn)
+
+    def _wake_waiter(self, conn) -> bool:
+        """Give `conn` (or a free slot when None) to the oldest waiter, if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(conn)
+                return True
+        return False
+
+    def _handover(self, conn) -> None:
+        if self._closed:
+            self._discard(conn)
+        elif not self._wake_waiter(conn):
+            self._idle.append(conn)
+
+    def _free_slot(self) -> None:
+        # The slot stays counted while it passes to a waiter, so no new
+        # caller can open a connection in it first
+        if self._closed or not self._wake_waiter(None):
+            self._size -= 1
+
+    def _discard(self, conn) -> None:
+        """Close `conn` and pass its slot on to the oldest waiter, if any."""
+        if not conn.closed:
+            conn.close()
+        self._free_slot()
+
+    async def _watch_leaks(self) -> None:
+        interval = max(1.0, self.leak_timeout / 2)
+        while True:
+            await asyncio.sleep(interval)
+            self.check_leaks()
+
+    def check_leaks(self) -> None:
+        """Report (and optionally reclaim) connections held past `leak_timeout`."""
+        now = time.monotonic()
+        for conn, checkout in list(self._holders.items()):
+            held_for = now - checkout.acquired_at
+            if held_for < self.leak_timeout:
+                continue
+
+            if not checkout.reported:
+                checkout.reported = True
+                self._counters["connections_leaked"] += 1
+                logger.warning(
+                    "Connection held for %.1fs, checked out at %s (task %s)%s",
+                    held_for,
+                    checkout.call_site,
+                    checkout.task,
+                    "\n" + "".join(checkout.stack) if checkout.stack else "",
+                )
+
+            # Never pull the socket from under a running query
+            if self.reclaim_leaks and (conn.closed or not conn.isexecuting()):
+                del self._holders[conn]
+                self._counters["connections_reclaimed"] += 1
+                self._discard(conn)
+
+    def holders(self) -> List[dict]:
+        """Describe every checked-out connection, oldest first."""
+        now = time.monotonic()
+        return [
+            {
+                "backend_pid": conn.info.backend_pid if not conn.closed else None,
+                "held_for_ms": round((now - checkout.acquired_at) * 1000, 3),
+                "call_site": checkout.call_site,
+                "task": checkout.task,
+                "executing": not conn.closed and conn.isexecuting(),
+                "leaked": checkout.reported,
+                "stack": checkout.stack,
+            }
+            for conn, checkout in sorted(
+                self._holders.items(), key=lambda item: item[1].acquired_at
+            )
+        ]
+
+    async def close(self) -> None:
+        """
+        Close idle connections and fail every waiting caller with PoolClosed;
+        busy connections are closed as they come back.
+        """
+        self._closed = True
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(PoolClosed())
+        while self._idle:
+            self._discard(self._idle.pop())
+
+    def stats(self) -> dict:
+        counters = self._counters
+        requests = counters["requests"]
+        return {
+            "max_size": self.max_size,
+            "size": self._size,
+            "in_use": self._size - len(self._idle),
+            "idle": len(self._idle),
+            "waiting": len(self._waiters),
+            "requests": requests,
+            "requests_queued": counters["requests_queued"],
+            "requests_timed_out": counters["requests_timed_out"],
+            "wait_time_avg_ms": (
+                round(counters["wait_time_total"] / requests * 1000, 3)
+                if requests
+                else 0.0
+            ),
+            "wait_time_max_ms": round(counters["wait_time_max"] * 1000, 3),
+            "connections_opened": counters["connections_opened"],
+            "connections_recycled": counters["connections_recycled"],
+            "connections_broken": counters["connections_broken"],
+            "connections_leaked": counters["connections_leaked"],
+            "connections_reclaimed": counters["connections_reclaimed"],
+        }
+
+
+_pool: Optional[AsyncConnectionPool] = None
+
+
+def get_pool() -> AsyncConnectionPool:
+    """
+    Return the process-wide pool, creating it on first use.
+
+    Creating it does not touch the network, so importing routers (alembic,
+    tooling) stays offline. Each worker process gets its own pool; set
+    `db_max_connections` to split one connection budget across
+    `web_concurrency` workers instead of sizing each pool by hand.
+    """
+    global _pool
+    if _pool is None:
+        if settings.db_max_connections:
+            max_size = max(
+                1, settings.db_max_connections // max(1, settings.web_concurrency)
+            )
+        else:
+            max_size = settings.db_pool_max_size
+
+        _pool = AsyncConnectionPool(
+            DATABASE_URL,
+            min_size=min(settings.db_pool_min_size, max_size),
+            max_size=max_size,
+            timeout=settings.db_pool_timeout,
+            max_uses=settings.db_pool_max_uses,
+            max_lifetime=settings.db_pool_max_lifetime,
+            check_idle_after=settings.db_pool_check_idle_after,
+            leak_timeout=settings.db_pool_leak_timeout,
+            reclaim_leaks=settings.db_pool_reclaim_leaks,
+            trace_checkouts=settings.db_pool_trace_checkouts,
+        )
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the pool; the next `get_pool()` starts a fresh one."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+async def get_connection():
+    return await get_pool().getconn()
+
+
+async def put_connection(conn):
+    # Return it to the pool it came from, even if that one was closed since
+    await conn.pool.putconn(conn)
+
+
+@asynccontextmanager
+async def connection():
+    conn = await get_connection()
+    try:
+        yield conn
+    finally:
+        await put_connection(conn)
+
+
+async def perform_query(query: str, params: tuple = (), conn=None):
     if conn is None:
-        conn = get_connection()
-        close_after = True
+        async with connection() as conn:
+            return await perform_query(query, params, conn)
 
+    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
         cur.execute(query, params)
+        await wait(conn)
         rows = cur.fetchall()
         return rows
     finally:
         cur.close()
-        if close_after:
-            put_connection(conn)
 
 
-def execute_query(
+async def execute_query(
     query: str, params: Optional[Tuple] = None, conn=None
 ) -> Optional[Any]:
     """
     Execute an INSERT/UPDATE/DELETE query.
 
-    If the query includes a RETURNING clause, returns the first column of the first row.
+    If the query includes a RETURNING clause, returns the first row.
     Otherwise returns None.
 
+    Connections run in autocommit mode, so the statement is committed as soon
+    as it completes unless it runs inside `transaction()`.
+
     Args:
         query (str): SQL query to execute, possibly with placeholders (%s).
         params (tuple, optional): parameters for the query.
@@ -53,22 +557,42 @@ def execute_query(
     Returns:
         Optional[Any]: Returned value from RETURNING clause or None.
     """
-    close_after = False
     if conn is None:
-        conn = get_connection()
-        close_after = True
+        async with connection() as conn:
+            return await execute_query(query, params, conn)
 
+    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
         cur.execute(query, params or ())
+        await wait(conn)
         result = None
         if cur.description:
             row = cur.fetchone()
             if row:
                 result = row
-        conn.commit()
         return result
     finally:
         cur.close()
-        if close_after:
-            put_connection(conn)
+
+
+@asynccontextmanager
+async def transaction(conn=None):
+    """
+    Run the block inside BEGIN/COMMIT on `conn`, or on a freshly checked-out one.
+
+    Any exception rolls the transaction back before it propagates.
+    """
+    if conn is None:
+        async with connection() as conn:
+            async with transaction(conn):
+                yield conn
+        return
+
+    await execute_query("BEGIN", conn=conn)
+    try:
+        yield conn
+    except BaseException:
+        if not conn.closed and not conn.isexecuting():
+            await execute_query("ROLLBACK", conn=conn)
+        raise
+    await execute_query("COMMIT", conn=conn)
@@ -1,18 +1,43 @@
-from fastapi import HTTPException, Security, status
+from fastapi import HTTPException, Request, Security, status
 from jose import JWTError
 from fastapi.security import OAuth2PasswordBearer
 
 # Project Imports
+from app.database import connection
 from app.utils._jwt import decode_token
-from app.utils.user import get_user_by_id
+from app.utils.user import get_cached_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-async def get_current_user(token: str = Security(oauth2_scheme)):
+async def get_db(request: Request):
+    """
+    Check out one connection for the whole request.
+
+    FastAPI caches the dependency per request, so every dependency of the
+    handler shares it; it goes back to the pool once the response is sent.
+    It is also left on `request.state.db` for `get_current_user`.
+    """
+    async with connection() as conn:
+        request.state.db = conn
+        yield conn
+
+
+def request_db(request: Request):
+    """
+    The request's connection if `get_db` already checked one out, else None.
+
+    For lookups that usually hit a cache: they take the request connection
+    when there is one, so a request never holds two, and otherwise check
+    one out only on a miss.
+    """
+    return getattr(request.state, "db", None)
+
+
+async def get_current_user(request: Request, token: str = Security(oauth2_scheme)):
     try:
         payload = decode_token(token)
-        user = get_user_by_id(int(payload["sub"]))
+        user = await get_cached_user(int(payload["sub"]), conn=request_db(request))
 
         if user is None:
             raise HTTPException(
@@ -27,19 +52,21 @@ async def get_current_user(token: str = Security(oauth2_scheme)):
     return user
 
 
-async def get_current_admin_user(token: str = Security(oauth2_scheme)):
+async def get_current_admin_user(
+    request: Request, token: str = Security(oauth2_scheme)
+):
     try:
         payload = decode_token(token)
-        user = get_user_by_id(int(payload["sub"]))
+        user = await get_cached_user(int(payload["sub"]), conn=request_db(request))
 
-        if user["user_role"] not in ["ADMIN", "STAFF"]:
+        if user is None:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
             )
 
-        if user is None:
+        if user["user_role"] not in ["ADMIN", "STAFF"]:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
     except (JWTError, ValueError):
@@ -0,0 +1,154 @@
+import gzip
+import hashlib
+from typing import Callable, Dict, Iterable, Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.cache import TTLCache
+
+# Compressed bytes are kept by a hash of the body they were made from, so they
+# never go stale; the TTL only frees memory held by pages nobody requests
+COMPRESSED_TTL = 3600
+
+
+def choose_encoding(accept_encoding: str, supported: Iterable[str]) -> Optional[str]:
+    """
+    The `supported` coding the client accepts with the highest q-value, or
+    None. Ties go to the earlier coding in `supported`.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip, whichever the client prefers.
+
+    Only bodies of an allowlisted content type and at least `minimum_size`
+    bytes are compressed; images and small JSON go out as they are. Bodies
+    are buffered before compressing, which suits the API's JSON responses
+    (streamed responses of other types pass straight through).
+
+    The compressed bytes of responses with a strong ETag, pages that are
+    served again as they are, are kept by a hash of the body and reused: a
+    hot page served from a cache isn't recompressed on every hit. The ETag
+    of a compressed response is made weak, as it no longer names the
+    identity bytes.
+
+    Every response that could be compressed carries `Vary: Accept-Encoding`,
+    whether or not this one was, so shared caches don't hand one client's
+    encoding to another.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_size: int = 512,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = set(content_types)
+        self.encoders: Dict[str, Callable[[bytes], bytes]] = {
+            "br": lambda body: brotli.compress(body, quality=brotli_quality),
+            "gzip": lambda body: gzip.compress(body, gzip_level, mtime=0),
+        }
+        self.compressed = TTLCache(ttl=COMPRESSED_TTL, maxsize=cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = choose_encoding(accept_encoding, self.encoders)
+        start: Optional[Message] = None
+        chunks = []
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if self._negotiable(message):
+                    MutableHeaders(raw=message["headers"]).add_vary_header(
+                        "Accept-Encoding"
+                    )
+                if encoding is not None and self._compressible(message):
+                    start = message  # held until the whole body is in
+                else:
+                    await send(message)
+            elif message["type"] == "http.response.body" and start is not None:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self._send(send, start, b"".join(chunks), encoding)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    def _negotiable(self, start: Message) -> bool:
+        """Whether the response is one this middleware may compress."""
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        if start["status"] == 304:
+            # Stands in for a body that may be compressed, so varies like one
+            return True
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        return content_type in self.content_types
+
+    def _compressible(self, start: Message) -> bool:
+        if start["status"] in (204, 304) or not self._negotiable(start):
+            return False
+        length = Headers(raw=start["headers"]).get("content-length")
+        return length is None or int(length) >= self.minimum_size
+
+    async def _send(
+        self, send: Send, start: Message, body: bytes, encoding: str
+    ) -> None:
+        headers = MutableHeaders(raw=start["headers"])
+        if len(body) >= self.minimum_size:
+            etag = headers.get("etag")
+            key = None
+            if etag and not etag.startswith("W/"):
+                key = (hashlib.sha1(body).digest(), encoding)
+
+            compressed = self.compressed.get(key) if key else None
+            if compressed is None:
+                compressed = self.encoders[encoding](body)
+                if key:
+                    self.compressed.set(key, compressed)
+
+            if len(compressed) < len(body):
+                body = compressed
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = f"W/{etag}"
+
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
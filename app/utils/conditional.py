@@ -0,0 +1,93 @@
+import hashlib
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.config import settings
+
+
+def make_etag(version: Any) -> str:
+    """Strong ETag for anything that changes whenever the response body does."""
+    if not isinstance(version, (str, bytes)):
+        version = repr(version)
+    if isinstance(version, str):
+        version = version.encode()
+    return f'"{hashlib.sha1(version).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check; uses the weak comparison RFC 9110 asks for."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+
+def if_none_match(request: Request) -> List[str]:
+    """
+    The entity tags a request's If-None-Match lists, unquoted and without
+    W/, for comparing against versions stored elsewhere ("*" is kept).
+    """
+    header = request.headers.get("if-none-match") or ""
+    tags = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    # Same matches as etag_matches: quoted tags or "*", nothing else
+    return [
+        tag if tag == "*" else tag[1:-1]
+        for tag in tags
+        if tag == "*" or len(tag) >= 2 and tag[0] == tag[-1] == '"'
+    ]
+
+
+def cache_control_for(request: Request) -> str:
+    """The Cache-Control policy of the route handling `request`."""
+    route = request.scope.get("route")
+    name = getattr(route, "name", None)
+    return settings.cache_control_routes.get(name, settings.cache_control)
+
+
+def revalidate(request: Request, version: Any) -> Dict[str, str]:
+    """
+    Validator headers for a response at `version`.
+
+    Raises a bodiless 304 (with the same headers) if the client already
+    holds that version, so the caller can stop before doing any real work.
+    """
+    return revalidate_etag(request, make_etag(version))
+
+
+def revalidate_etag(request: Request, etag: str) -> Dict[str, str]:
+    """`revalidate` for an ETag the caller made itself."""
+    headers = {"ETag": etag, "Cache-Control": cache_control_for(request)}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return headers
+
+
+def conditional_get(version: Callable) -> Callable:
+    """
+    Dependency answering conditional GETs before the endpoint runs.
+
+    `version` is itself a dependency (it may take path or query params)
+    returning a cheap stand-in for the response body: a snapshot hash, a
+    row's timestamps and counters, ... It must change whenever the body
+    does. Returning None skips validation, e.g. to let the endpoint 404.
+
+    The ETag and Cache-Control headers are added to the response; endpoints
+    returning a `Response` themselves get them as the dependency's value.
+
+    Usage:
+        @router.get("/stats", dependencies=[Depends(conditional_get(stats_version))])
+    """
+
+    async def dependency(
+        request: Request, response: Response, current=Depends(version)
+    ) -> Dict[str, str]:
+        if current is None:
+            return {}
+        headers = revalidate(request, current)
+        response.headers.update(headers)
+        return headers
+
+    return dependency
@@ -1,5 +1,9 @@
+from typing import Set
+
 from fastapi import HTTPException, status
 
+from app.database import perform_query
+
 
 def parse_ordering(ordering: str, ORDERABLE_COLUMNS: set) -> str:
     """Translate '-name' → 'name DESC', 'id' → 'id ASC'."""
@@ -11,3 +15,26 @@ def parse_ordering(ordering: str, ORDERABLE_COLUMNS: set) -> str:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ordering field")
 
     return f"{col} {'DESC' if desc else 'ASC'}"
+
+
+def values_placeholders(rows: int, columns: int) -> str:
+    """Build the VALUES list for a multi-row insert, e.g. '(%s, %s), (%s, %s)'."""
+
+    row = "(" + ", ".join(["%s"] * columns) + ")"
+    return ", ".join([row] * rows)
+
+
+async def explain(sql: str, params: tuple = (), conn=None) -> dict:
+    """The planner's plan for a query (EXPLAIN, FORMAT JSON), without running it."""
+
+    rows = await perform_query(f"EXPLAIN (FORMAT JSON) {sql}", params, conn)
+    return rows[0]["QUERY PLAN"][0]["Plan"]
+
+
+def plan_indexes(plan: dict) -> Set[str]:
+    """Names of the indexes a plan from `explain` scans."""
+
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= plan_indexes(child)
+    return names
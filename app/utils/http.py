@@ -0,0 +1,43 @@
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    App-wide client for outgoing HTTP calls (OAuth providers).
+
+    Reusing one client keeps connections alive between requests, so a call
+    to a host we've talked to recently skips the TCP and TLS handshakes.
+    Created on first use and closed by `close_http_client` on shutdown.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.http_timeout, connect=settings.http_connect_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+        )
+    return _client
+
+
+def set_http_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Swap in another client, e.g. one on an `httpx.MockTransport` in tests."""
+    global _client
+    _client = client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.database import connection, perform_query
+from app.utils.casing import to_camel
+
+logger = logging.getLogger(__name__)
+
+
+class LookupSnapshot:
+    """
+    In-memory copy of the category, department and batch year tables.
+
+    They are small and change only through seeding and project submissions
+    (category project counts), so requests read them from here instead of
+    the database. The copy is reloaded once it is `ttl` seconds old, or on
+    the next read after `invalidate()`.
+
+    `payload` is the combined `/project-app/lookups` response, serialized
+    once per load, and `version` identifies the content of all three tables.
+    """
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self.categories: List[dict] = []
+        self.departments: List[dict] = []
+        self.batch_years: List[dict] = []
+        self.payload: bytes = b""
+        self.version: str = ""
+        self._by_id: Dict[str, Dict[int, dict]] = {}
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _load(self) -> None:
+        async with connection() as conn:
+            # project_count is kept up to date by a trigger on project
+            categories = await perform_query(
+                "SELECT id, name, is_active, project_count FROM category ORDER BY id;",
+                conn=conn,
+            )
+            departments = await perform_query(
+                "SELECT id, name, is_active FROM department ORDER BY id;", conn=conn
+            )
+            batch_years = await perform_query(
+                "SELECT id, year, is_active FROM batch_year ORDER BY id;", conn=conn
+            )
+
+        self.categories = [dict(row) for row in categories]
+        self.departments = [dict(row) for row in departments]
+        self.batch_years = [dict(row) for row in batch_years]
+        self._by_id = {
+            "categories": {row["id"]: row for row in self.categories},
+            "departments": {row["id"]: row for row in self.departments},
+            "batch_years": {row["id"]: row for row in self.batch_years},
+        }
+        self.payload = json.dumps(
+            {
+                "categories": _public(self.categories, "id", "name", "project_count"),
+                "departments": _public(self.active_departments(), "id", "name"),
+                "batchYears": _public(self.active_batch_years(), "id", "year"),
+            },
+            separators=(",", ":"),
+        ).encode()
+        tables = (self.categories, self.departments, self.batch_years)
+        self.version = hashlib.sha1(repr(tables).encode()).hexdigest()
+        self._expires_at = time.monotonic() + self.ttl
+
+    async def refresh(self, force: bool = False) -> "LookupSnapshot":
+        """Reload if stale (or `force`), then return the snapshot."""
+        if not force and time.monotonic() < self._expires_at:
+            return self
+
+        async with self._lock:
+            # Someone else may have reloaded while we waited
+            if force or time.monotonic() >= self._expires_at:
+                try:
+                    await self._load()
+                except Exception:
+                    if not self.payload:
+                        raise
+                    # Serve the copy we have rather than fail the request
+                    logger.exception("Failed to reload lookup tables")
+                    self._expires_at = time.monotonic() + min(self.ttl, 5)
+        return self
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+    def get(self, table: str, id: int) -> Optional[dict]:
+        return self._by_id.get(table, {}).get(id)
+
+    def active_departments(self) -> List[dict]:
+        return [row for row in self.departments if row["is_active"]]
+
+    def active_batch_years(self) -> List[dict]:
+        return [row for row in self.batch_years if row["is_active"]]
+
+
+def name_contains(rows: List[dict], search: Optional[str]) -> List[dict]:
+    """Case-insensitive substring filter on `name`, like ILIKE '%search%'."""
+    if not search:
+        return rows
+    search = search.casefold()
+    return [row for row in rows if search in row["name"].casefold()]
+
+
+def _public(rows: List[dict], *fields: str) -> List[dict]:
+    """Rows as the API shows them: only `fields`, camelCased."""
+    return [{to_camel(field): row[field] for field in fields} for row in rows]
+
+
+lookups = LookupSnapshot(ttl=settings.lookup_cache_ttl)
+
+
+async def lookups_version() -> str:
+    """`conditional_get` version for responses built from the snapshot."""
+    return (await lookups.refresh()).version
@@ -0,0 +1,290 @@
+import asyncio
+import logging
+import smtplib
+import ssl
+import time
+from dataclasses import dataclass, field
+from email.message import Message
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxFull(Exception):
+    pass
+
+
+@dataclass
+class OutgoingEmail:
+    sender: str
+    recipient: str
+    message: Message
+    attempts: int = 0
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class Mailer:
+    """
+    Email outbox delivered by a background task over one reused SMTP session.
+
+    `enqueue` returns immediately. The worker sends up to `batch_size`
+    queued messages per session round, in the threadpool since smtplib is
+    blocking. The session stays logged in between batches and is closed
+    after `idle_timeout` seconds without mail. Messages that fail with a
+    temporary error are retried after `retry_backoff` seconds, doubling on
+    each attempt, up to `max_attempts` sends.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        use_tls: bool = True,
+        batch_size: int = 20,
+        max_attempts: int = 5,
+        retry_backoff: float = 2.0,
+        idle_timeout: float = 60,
+        max_queue: int = 1000,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        # Messages waiting out their backoff, with the timer that requeues them
+        self._retrying: Dict[int, Tuple[asyncio.TimerHandle, OutgoingEmail]] = {}
+        self._session: Optional[smtplib.SMTP] = None
+        self._task: Optional[asyncio.Task] = None
+        self._busy = False
+        self._closing = False
+        self._counters = {
+            "queued": 0,
+            "sent": 0,
+            "retried": 0,
+            "failed": 0,
+            "sessions_opened": 0,
+            "send_time_total": 0.0,
+            "send_time_max": 0.0,
+            "delivery_delay_max": 0.0,
+        }
+
+    def enqueue(self, sender: str, recipient: str, message: Message) -> None:
+        """Queue a message for delivery; raises OutboxFull if the queue is full."""
+        try:
+            self._queue.put_nowait(OutgoingEmail(sender, recipient, message))
+        except asyncio.QueueFull:
+            raise OutboxFull("Email outbox is full")
+        self._counters["queued"] += 1
+
+    # SMTP session, only ever used from one threadpool call at a time
+
+    def _open_session(self) -> smtplib.SMTP:
+        session = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                session.starttls(context=ssl.create_default_context())
+            if self.password:
+                session.login(self.username, self.password)
+        except BaseException:
+            session.close()
+            raise
+
+        self._counters["sessions_opened"] += 1
+        return session
+
+    def _close_session(self) -> None:
+        session, self._session = self._session, None
+        if session is None:
+            return
+        try:
+            session.quit()
+        except (smtplib.SMTPException, OSError):
+            session.close()
+
+    def _send_one(self, email: OutgoingEmail) -> None:
+        payload = email.message.as_string()
+        if self._session is None:
+            self._session = self._open_session()
+        try:
+            self._session.sendmail(email.sender, email.recipient, payload)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped the idle session; log in again once
+            self._session = self._open_session()
+            self._session.sendmail(email.sender, email.recipient, payload)
+
+    def _send_batch(self, batch: List[OutgoingEmail]) -> List[OutgoingEmail]:
+        """Send a batch over the shared session; returns the messages to retry."""
+        counters = self._counters
+        retry = []
+        for email in batch:
+            email.attempts += 1
+            started = time.monotonic()
+            try:
+                self._send_one(email)
+            except (smtplib.SMTPException, OSError) as e:
+                # A rejected message leaves the session usable, anything else doesn't
+                if not isinstance(
+                    e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+                ):
+                    self._close_session()
+                if _is_permanent(e) or email.attempts >= self.max_attempts:
+                    counters["failed"] += 1
+                    logger.error(
+                        "Giving up on email to %s after %d attempt(s): %s",
+                        email.recipient,
+                        email.attempts,
+                        e,
+                    )
+                else:
+                    retry.append(email)
+                continue
+
+            finished = time.monotonic()
+            elapsed = finished - started
+            counters["sent"] += 1
+            counters["send_time_total"] += elapsed
+            counters["send_time_max"] = max(counters["send_time_max"], elapsed)
+            counters["delivery_delay_max"] = max(
+                counters["delivery_delay_max"], finished - email.queued_at
+            )
+        return retry
+
+    # Worker
+
+    def _requeue(self, email: OutgoingEmail) -> None:
+        self._retrying.pop(id(email), None)
+        try:
+            self._queue.put_nowait(email)
+        except asyncio.QueueFull:
+            self._counters["failed"] += 1
+            logger.error("Email outbox full, dropped retry to %s", email.recipient)
+
+    def _schedule_retry(self, email: OutgoingEmail) -> None:
+        self._counters["retried"] += 1
+        delay = self.retry_backoff * 2 ** (email.attempts - 1)
+        handle = asyncio.get_running_loop().call_later(delay, self._requeue, email)
+        self._retrying[id(email)] = (handle, email)
+
+    def _take_batch(self, first: OutgoingEmail) -> List[OutgoingEmail]:
+        batch = [first]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                first = await asyncio.wait_for(
+                    self._queue.get(), timeout=self.idle_timeout
+                )
+            except asyncio.TimeoutError:
+                if self._session is not None:
+                    self._busy = True
+                    try:
+                        await run_in_threadpool(self._close_session)
+                    finally:
+                        self._busy = False
+                continue
+
+            batch = self._take_batch(first)
+            self._busy = True
+            try:
+                retry = await run_in_threadpool(self._send_batch, batch)
+            except Exception:
+                logger.exception("Email batch failed")
+                retry = [email for email in batch if email.attempts < self.max_attempts]
+            finally:
+                self._busy = False
+
+            for email in retry:
+                self._schedule_retry(email)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker and make one last attempt at everything still queued."""
+        if self._task is not None:
+            self._closing = True
+            # Interrupting a send would leave the session to two threads,
+            # so a busy worker finishes its batch and exits by itself
+            if not self._busy:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for handle, email in list(self._retrying.values()):
+            handle.cancel()
+            self._requeue(email)
+
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+
+        try:
+            if pending:
+                retry = await run_in_threadpool(self._send_batch, pending)
+                if retry:
+                    logger.error("Dropped %d undelivered emails", len(retry))
+        except Exception:
+            logger.exception("Failed to drain the email outbox")
+        finally:
+            await run_in_threadpool(self._close_session)
+
+    def stats(self) -> dict:
+        counters = self._counters
+        sent = counters["sent"]
+        return {
+            "queue_depth": self._queue.qsize(),
+            "retry_pending": len(self._retrying),
+            "queued": counters["queued"],
+            "sent": sent,
+            "retried": counters["retried"],
+            "failed": counters["failed"],
+            "sessions_opened": counters["sessions_opened"],
+            "send_time_avg_ms": (
+                round(counters["send_time_total"] / sent * 1000, 3) if sent else 0.0
+            ),
+            "send_time_max_ms": round(counters["send_time_max"] * 1000, 3),
+            "delivery_delay_max_ms": round(counters["delivery_delay_max"] * 1000, 3),
+        }
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies and refused recipients won't succeed on a retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+mailer = Mailer(
+    host=settings.email_host,
+    port=settings.email_port,
+    username=settings.email_username,
+    password=settings.email_password,
+    use_tls=settings.email_use_tls,
+    batch_size=settings.email_batch_size,
+    max_attempts=settings.email_max_attempts,
+    retry_backoff=settings.email_retry_backoff,
+    idle_timeout=settings.email_idle_timeout,
+    max_queue=settings.email_queue_size,
+)
@@ -0,0 +1,163 @@
+import logging
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.database import execute_query, perform_query
+from app.utils.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+OTP_LIFETIME = timedelta(minutes=settings.otp_lifetime)
+
+
+class OTPStore(ABC):
+    """
+    Where issued login OTPs live until they are verified.
+
+    A user has at most one OTP: issuing a new one replaces the old one, and a
+    successful `verify` consumes it.
+    """
+
+    @abstractmethod
+    async def issue(self, user_id: int, otp: str, conn=None) -> None: ...
+
+    @abstractmethod
+    async def verify(self, user_id: int, otp: str, conn=None) -> bool:
+        """True if `otp` is the user's current OTP, which is then consumed."""
+
+
+class SQLOTPStore(OTPStore):
+    """
+    OTPs in the `user_verification` table.
+
+    Every verify attempt consumes the OTP, right or wrong, since there is no
+    attempt counter to bound guessing.
+    """
+
+    async def issue(self, user_id: int, otp: str, conn=None) -> None:
+        query = """
+            WITH cleared AS (
+                DELETE FROM user_verification WHERE user_id = %s
+            )
+            INSERT INTO user_verification (user_id, otp, created_at)
+            VALUES (%s, %s, now());
+        """
+        await execute_query(query, (user_id, user_id, otp), conn)
+
+    async def verify(self, user_id: int, otp: str, conn=None) -> bool:
+        query = """
+            DELETE FROM user_verification
+            WHERE user_id = %s
+            RETURNING otp, created_at > now() - %s AS is_fresh;
+        """
+        rows = await perform_query(query, (user_id, OTP_LIFETIME), conn)
+        return any(row["otp"] == otp and row["is_fresh"] for row in rows)
+
+
+# Compare-and-consume in one step, so two concurrent verifies can't both
+# succeed. Wrong guesses are counted on the same key and burn the OTP
+# once they reach the limit.
+_VERIFY_SCRIPT = """
+local stored = redis.call('HGET', KEYS[1], 'otp')
+if not stored then
+    return 0
+end
+if stored == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+if redis.call('HINCRBY', KEYS[1], 'attempts', 1) >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisOTPStore(OTPStore):
+    """
+    OTPs in Redis hashes that expire on their own after OTP_LIFETIME.
+
+    `client` is any `redis.asyncio` compatible client, e.g.
+    `fakeredis.FakeAsyncRedis` in tests (the verify script needs Lua,
+    `fakeredis[lua]`). Without one the app-wide `get_redis()` client is looked
+    up on every call, so a store outlives `close_redis()`.
+
+    While Redis is unreachable OTPs are issued to and verified against
+    `fallback`, if given; a wrong or missing OTP in Redis is also checked
+    there, for OTPs issued during an outage.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_attempts: int = 5,
+        prefix: str = "otp:",
+        fallback: Optional[OTPStore] = None,
+    ):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.prefix = prefix
+        self.fallback = fallback
+        self._verify = None
+
+    def _client(self):
+        return self.client if self.client is not None else get_redis()
+
+    def _verify_script(self, client):
+        # A registered script is bound to the client it was registered on
+        if self._verify is None or self._verify.registered_client is not client:
+            self._verify = client.register_script(_VERIFY_SCRIPT)
+        return self._verify
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.prefix}{user_id}"
+
+    async def issue(self, user_id: int, otp: str, conn=None) -> None:
+        key = self._key(user_id)
+        try:
+            async with self._client().pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping={"otp": otp, "attempts": 0})
+                pipe.expire(key, OTP_LIFETIME)
+                await pipe.execute()
+        except RedisError as err:
+            if self.fallback is None:
+                raise
+            logger.warning(
+                f"OTP issued to the fallback store, Redis unavailable: {err}"
+            )
+            await self.fallback.issue(user_id, otp, conn)
+
+    async def verify(self, user_id: int, otp: str, conn=None) -> bool:
+        client = self._client()
+        try:
+            result = await self._verify_script(client)(
+                keys=[self._key(user_id)], args=[otp, self.max_attempts]
+            )
+        except RedisError as err:
+            if self.fallback is None:
+                raise
+            logger.warning(
+                f"OTP verified by the fallback store, Redis unavailable: {err}"
+            )
+            result = 0
+
+        if result:
+            return True
+        if self.fallback is None:
+            return False
+        return await self.fallback.verify(user_id, otp, conn)
+
+
+def create_otp_store() -> OTPStore:
+    if settings.otp_backend == "sql":
+        return SQLOTPStore()
+
+    return RedisOTPStore(max_attempts=settings.otp_max_attempts, fallback=SQLOTPStore())
+
+
+otp_store = create_otp_store()
@@ -0,0 +1,206 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+# Sort key types JSON has no literal for, tagged in cursors so they decode to
+# the same type instead of a string Postgres would have to cast. datetime
+# comes before date, its base class
+CURSOR_TYPES = {
+    "datetime": (datetime, datetime.isoformat, datetime.fromisoformat),
+    "date": (date, date.isoformat, date.fromisoformat),
+    "decimal": (Decimal, str, Decimal),
+}
+
+
+def encode_cursor_value(value: Any) -> Any:
+    for tag, (type_, dump, _) in CURSOR_TYPES.items():
+        if isinstance(value, type_):
+            return {tag: dump(value)}
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    raise TypeError(f"Can't use {type(value).__name__} as a cursor key")
+
+
+def decode_cursor_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        [(tag, dumped)] = value.items()
+        return CURSOR_TYPES[tag][2](dumped)
+    return value
+
+
+class Keyset:
+    """
+    Keyset (cursor) pagination over one sort column plus `id` as tie-breaker.
+
+    A cursor is an opaque token holding the ordering it was issued for, the
+    direction to page in and the (sort key, id) of the row it points at,
+    with datetimes and Decimals decoded back to their own type.
+    Pages are selected with `(sort_key, id) > (%s, %s)` instead of OFFSET,
+    so a deep page costs the same as the first one.
+
+    Usage:
+        keyset = Keyset(ordering, {"id": "p.id", "title": "p.title"}, cursor)
+        rows = await perform_query(
+            f"... WHERE ... AND {keyset.where} ORDER BY {keyset.order_by} LIMIT %s",
+            params + keyset.params + (limit + 1,),
+        )
+        rows, next_cursor, prev_cursor = keyset.paginate(rows, limit, offset)
+    """
+
+    def __init__(
+        self,
+        ordering: str,
+        columns: dict,
+        cursor: Optional[str] = None,
+        tiebreaker: str = "id",
+    ):
+        field = ordering.lstrip("-")
+        if field not in columns:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid ordering field",
+            )
+
+        self.ordering = ordering
+        self.field = field
+        self.column = columns[field]
+        self.descending = ordering.startswith("-")
+        self.tiebreaker = tiebreaker
+        self.tiebreaker_column = columns.get(tiebreaker, tiebreaker)
+        self.cursor = cursor
+        self.backwards = False
+        self.after: Tuple = ()
+
+        if cursor:
+            direction, self.after = self._decode(cursor)
+            self.backwards = direction == "prev"
+
+    def _decode(self, cursor: str):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            ordering, direction, key, tiebreaker = json.loads(
+                base64.urlsafe_b64decode(padded)
+            )
+            key = decode_cursor_value(key)
+            tiebreaker = decode_cursor_value(tiebreaker)
+        except (
+            binascii.Error,
+            UnicodeDecodeError,
+            ArithmeticError,
+            KeyError,
+            ValueError,
+            TypeError,
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+
+        if ordering != self.ordering or direction not in ("next", "prev"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not match the requested ordering",
+            )
+        return direction, (key, tiebreaker)
+
+    def _encode(self, row: dict, direction: str) -> str:
+        token = json.dumps(
+            [
+                self.ordering,
+                direction,
+                encode_cursor_value(row[self.field]),
+                encode_cursor_value(row[self.tiebreaker]),
+            ],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(token.encode()).rstrip(b"=").decode()
+
+    @property
+    def where(self) -> str:
+        """SQL condition selecting the rows after (or before) the cursor."""
+        if not self.cursor:
+            return "TRUE"
+
+        # Paging forward on an ascending order means "greater than", and so on
+        op = ">" if self.descending == self.backwards else "<"
+        if self.field == self.tiebreaker:
+            return f"{self.column} {op} %s"
+        return f"({self.column}, {self.tiebreaker_column}) {op} (%s, %s)"
+
+    @property
+    def params(self) -> tuple:
+        if self.field == self.tiebreaker:
+            return self.after[:1]
+        return self.after
+
+    @property
+    def order_by(self) -> str:
+        # Walking backwards reads the rows in reverse and flips them afterwards
+        desc = self.descending != self.backwards
+        direction = "DESC" if desc else "ASC"
+        if self.field == self.tiebreaker:
+            return f"{self.column} {direction}"
+        return f"{self.column} {direction}, {self.tiebreaker_column} {direction}"
+
+    def select(self, rows: List[dict], limit: int, offset: int = 0) -> List[dict]:
+        """
+        In-memory `WHERE {where} ORDER BY {order_by} LIMIT limit + 1 OFFSET offset`.
+
+        For data already held in the process; pass the result to `paginate`.
+        """
+
+        def key(row: dict) -> Tuple:
+            return (row[self.field], row[self.tiebreaker])
+
+        if self.cursor:
+            after = self.params * 2 if self.field == self.tiebreaker else self.after
+            forward = self.descending == self.backwards
+            rows = [
+                row
+                for row in rows
+                if (key(row) > after if forward else key(row) < after)
+            ]
+
+        rows = sorted(rows, key=key, reverse=self.descending != self.backwards)
+        return rows[offset : offset + limit + 1]
+
+    def with_count(self, requested: Optional[bool]) -> bool:
+        """Totals are opt-in when paging by cursor, on by default otherwise."""
+        return requested if requested is not None else not self.cursor
+
+    def total_column(self, with_count: bool) -> str:
+        """
+        SQL for a `total` column: a window count on offset pages, NULL otherwise.
+
+        A window count on a cursor page would only count the rows after the
+        cursor, so cursor pages run a separate COUNT(*) when asked for a total.
+        """
+        return "COUNT(*) OVER()" if with_count and not self.cursor else "NULL"
+
+    def paginate(
+        self, rows: List[dict], limit: int, offset: int = 0
+    ) -> Tuple[List[dict], Optional[str], Optional[str]]:
+        """
+        Trim the `limit + 1` rows fetched to one page and build its cursors.
+
+        Returns the page rows and the `next`/`prev` cursors, None at either end.
+        """
+        has_more = len(rows) > limit
+        rows = list(rows[:limit])
+
+        if self.backwards:
+            rows.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, bool(self.cursor) or offset > 0
+
+        if not rows:
+            return rows, None, None
+
+        next_cursor = self._encode(rows[-1], "next") if has_next else None
+        prev_cursor = self._encode(rows[0], "prev") if has_prev else None
+        return rows, next_cursor, prev_cursor
@@ -0,0 +1,384 @@
+import re
+import urllib.parse
+from typing import Any, Iterable, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.database import perform_query
+from app.utils.casing import to_camel
+from app.utils.pagination import Keyset
+from app.utils.response_cache import response_cache
+
+
+# What each ProjectResponse field is read from, in response order. Listings
+# never read `project_details` or the search document
+PROJECT_LIST_FIELDS = {
+    "id": "p.id",
+    "title": "p.title",
+    "slug": "p.slug",
+    "abstract": "p.abstract",
+    "level": "p.level",
+    "supervisor": "p.supervisor",
+    "technologies_used": "p.technologies_used",
+    "github_link": "p.github_link",
+    "documentation_link": "p.documentation_link",
+    "status": "p.status",
+    "submitted_at": "p.submitted_at",
+    "submitted_by_full_name": (
+        "u.first_name || ' ' || u.last_name AS submitted_by_full_name"
+    ),
+    "category": "c.id AS category_id, c.name AS category_name",
+    "department": "d.id AS department_id, d.name AS department_name",
+    "batch_year": "b.id AS batch_year_id, b.year AS batch_year_year",
+    "rating_average": "rs.avg_rating",
+    "views": "p.views",
+}
+
+# Tables joined to `project AS p` only when a selected column needs them.
+# Every project has one row in each, so leaving one out never changes a page
+PROJECT_LIST_JOINS = {
+    "rs": "JOIN project_rating_stats AS rs ON rs.project_id = p.id",
+    "c": "JOIN category AS c ON p.category_id = c.id",
+    "d": "JOIN department AS d ON p.department_id = d.id",
+    "b": "JOIN batch_year AS b ON p.batch_year_id = b.id",
+    "u": 'JOIN "user" AS u ON p.submitted_by = u.id',
+}
+
+# Negated so that ascending `ordering=relevance` lists the best matches first
+PROJECT_RELEVANCE_SQL = "-ts_rank_cd(p.search_document, q)::float8"
+
+# A trailing plain word, matched as a prefix: the user may still be typing it.
+# Not after `or`, as the prefix would be and-ed to the other alternative
+SEARCH_LAST_WORD_RE = re.compile(r"(?:^|\s)([^\W_]+)\s*$")
+SEARCH_OR_RE = re.compile(r"(?:^|\s)or\s+$", re.IGNORECASE)
+
+
+def project_search(search: Optional[str]) -> Tuple[str, str, tuple]:
+    """
+    Full-text search over the weighted `project.search_document`.
+
+    The search is read as a web search (quotes, `or`, `-word`), with its
+    last word matched as a prefix so that `mach` finds "Machine learning".
+    A search that leaves nothing to look up, such as only stop words, falls
+    back to a title substring match.
+
+    Returns `(join, condition, params)`: the join exposes the parsed query as
+    `q` (used by PROJECT_RELEVANCE_SQL) and goes right after `FROM project AS p`,
+    its params before any WHERE params. Without a search term both are no-ops.
+    """
+    if not search:
+        return "", "TRUE", ()
+
+    query, params = "websearch_to_tsquery('english', %s)", (search,)
+    last_word = SEARCH_LAST_WORD_RE.search(search)
+    if last_word and not SEARCH_OR_RE.search(search[: last_word.start(1)]):
+        query += " && to_tsquery('english', %s)"
+        params = (search[: last_word.start(1)], last_word.group(1) + ":*")
+
+    # The subquery is folded into constants when planning, so `numnode(q) = 0`
+    # drops out and the GIN index serves `@@ q` unless the query is empty
+    return (
+        f"CROSS JOIN (SELECT {query} AS q, %s::text AS search_text) AS search",
+        "(p.search_document @@ q OR numnode(q) = 0"
+        " AND p.title ILIKE '%%' || search_text || '%%')",
+        params + (search,),
+    )
+
+
+# Listing sort keys; `relevance` is added when searching
+PROJECT_ORDERING = {
+    "id": "p.id",
+    "title": "p.title",
+    "submitted_at": "p.submitted_at",
+    "avg_rating": "rs.avg_rating",
+}
+
+
+def project_keyset(
+    ordering: str, cursor: Optional[str] = None, search: Optional[str] = None
+) -> Keyset:
+    """Keyset over PROJECT_ORDERING; rejects unknown orderings with a 400."""
+    columns = dict(PROJECT_ORDERING)
+    if search:
+        columns["relevance"] = PROJECT_RELEVANCE_SQL
+    return Keyset(ordering, columns, cursor)
+
+
+# Listing filter columns and the index that serves each one; the plan checks
+# (benchmarks/explain_project_filters.py, tests) hold ProjectQuery to them
+PROJECT_FILTER_INDEXES = {
+    "p.category_id": "idx_project_category",
+    "p.department_id": "idx_project_department",
+    "p.batch_year_id": "idx_project_batch_year",
+    "p.level": "idx_project_level",
+}
+
+
+class ProjectQuery:
+    """
+    The project listing query, with only the predicates a request uses.
+
+    Every filter given a value becomes a plain `column = %s` and the others
+    are left out, instead of a catch-all `(%s IS NULL OR column = %s)` per
+    filter, so the statement names exactly the columns it constrains and the
+    planner can pick their indexes (idx_project_category, ...).
+
+    Pages read only the columns and joins of the requested fields (see
+    PROJECT_LIST_FIELDS), plus the sort key the keyset needs.
+
+    Usage:
+        query = ProjectQuery("p.is_active", search=search)
+        query.filter("p.category_id", category_id).filter("p.level", level)
+        sql, params = query.page(keyset, limit, offset, with_count)
+        rows = await perform_query(sql, params)
+    """
+
+    def __init__(
+        self,
+        where: str = "p.is_active",
+        params: tuple = (),
+        search: Optional[str] = None,
+    ):
+        self.search = search
+        self.search_join, search_filter, self.search_params = project_search(search)
+        self.conditions = [where] + ([search_filter] if search else [])
+        self.params = tuple(params)
+
+    def filter(self, column: str, value: Any) -> "ProjectQuery":
+        """Add `column = value`, unless value is None. `column` is SQL, never input."""
+        if value is not None:
+            self.conditions.append(f"{column} = %s")
+            self.params += (value,)
+        return self
+
+    @property
+    def where(self) -> str:
+        return " AND ".join(self.conditions)
+
+    def page(
+        self,
+        keyset: Keyset,
+        limit: int,
+        offset: int = 0,
+        with_count: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Tuple[str, tuple]:
+        """
+        SQL and params for one page: `limit + 1` rows for `keyset.paginate`.
+
+        `fields` are PROJECT_LIST_FIELDS keys, all of them by default.
+        """
+        fields = set(fields or PROJECT_LIST_FIELDS)
+        columns = ["p.id"] + [
+            column
+            for name, column in PROJECT_LIST_FIELDS.items()
+            if name in fields and name != "id"
+        ]
+        if keyset.field != keyset.tiebreaker:
+            # Cursors are built from the sort key
+            columns.append(f"{keyset.column} AS {keyset.field}")
+        select = ", ".join(columns)
+
+        aliases = set(re.findall(r"\b(\w+)\.", select))
+        joins = "\n".join(
+            join for alias, join in PROJECT_LIST_JOINS.items() if alias in aliases
+        )
+
+        sql = f"""
+            SELECT
+                {select},
+                {keyset.total_column(with_count)} AS total_count
+            FROM project AS p
+            {self.search_join}
+            {joins}
+            WHERE {self.where} AND {keyset.where}
+            ORDER BY {keyset.order_by}
+            LIMIT %s OFFSET %s;
+        """
+        params = self.search_params + self.params + keyset.params + (limit + 1, offset)
+        return sql, params
+
+    def count(self) -> Tuple[str, tuple]:
+        """SQL and params for the total number of matching projects."""
+        sql = f"""
+            SELECT COUNT(*) AS total FROM project AS p {self.search_join}
+            WHERE {self.where};
+        """
+        return sql, self.search_params + self.params
+
+
+def parse_project_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    A `fields=id,title,category` parameter (response names) as
+    PROJECT_LIST_FIELDS keys in response order, or None for all of them.
+    """
+    if not fields:
+        return None
+
+    by_alias = {to_camel(name): name for name in PROJECT_LIST_FIELDS}
+    requested = set()
+    for alias in filter(None, (alias.strip() for alias in fields.split(","))):
+        if alias not in by_alias:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid field: {alias}",
+            )
+        requested.add(by_alias[alias])
+    return tuple(name for name in PROJECT_LIST_FIELDS if name in requested) or None
+
+
+def project_list_item(row: dict, fields: Optional[Iterable[str]] = None) -> dict:
+    """A `ProjectQuery.page` row in the ProjectResponse shape, limited to `fields`."""
+    fields = set(fields or PROJECT_LIST_FIELDS)
+    data = {}
+    for name in PROJECT_LIST_FIELDS:
+        if name not in fields:
+            continue
+        if name == "submitted_at":
+            data[name] = row["submitted_at"].isoformat()
+        elif name == "rating_average":
+            data[name] = float(row["avg_rating"])
+        elif name == "category":
+            data[name] = {"id": row["category_id"], "name": row["category_name"]}
+        elif name == "department":
+            data[name] = {"id": row["department_id"], "name": row["department_name"]}
+        elif name == "batch_year":
+            data[name] = {"id": row["batch_year_id"], "year": row["batch_year_year"]}
+        else:
+            data[name] = row[name]
+    return data
+
+
+# Hash of everything a project detail is built from except the team members
+# and files, which are fixed at submission. Changes whenever the detail does
+PROJECT_DETAIL_VERSION = """
+    md5(ROW(
+        p.updated_at, p.views, rs.rating_count, rs.rating_sum, u.updated_at,
+        c.name, d.name, b.year
+    )::text)
+"""
+
+# Builds the whole ProjectRetrieveResponse shape in one statement: team
+# members and files are aggregated server-side, comma-separated columns
+# are split into arrays. The body is left out (NULL) when its version is
+# one of the given ones, or they include "*". `{where}` is filled in by the
+# caller.
+PROJECT_DETAIL_SQL = """
+    SELECT
+        version.version,
+        CASE WHEN ARRAY[version.version, '*'] && %s::text[] THEN NULL
+        ELSE json_build_object(
+            'id', p.id,
+            'slug', p.slug,
+            'title', p.title,
+            'abstract', p.abstract,
+            'level', p.level,
+            'supervisor', p.supervisor,
+            'technologies_used', ARRAY(
+                SELECT btrim(tech, E' \\t\\r\\n')
+                FROM unnest(string_to_array(p.technologies_used, ','))
+                    WITH ORDINALITY AS t(tech, n)
+                ORDER BY n
+            ),
+            'github_links', ARRAY(
+                SELECT btrim(link, E' \\t\\r\\n')
+                FROM unnest(string_to_array(p.github_link, ','))
+                    WITH ORDINALITY AS l(link, n)
+                ORDER BY n
+            ),
+            'documentation_link', p.documentation_link,
+            'project_details', p.project_details,
+            'status', p.status,
+            'submitted_at', p.submitted_at,
+            'submitted_by_full_name', u.first_name || ' ' || u.last_name,
+            'category', json_build_object('id', c.id, 'name', c.name),
+            'department', json_build_object('id', d.id, 'name', d.name),
+            'batch_year', json_build_object('id', b.id, 'year', b.year),
+            'rating_average', rs.avg_rating,
+            'views', p.views,
+            'total_ratings', rs.rating_count,
+            'team_members', COALESCE(
+                (
+                    SELECT json_agg(
+                        json_build_object(
+                            'id', tm.id,
+                            'full_name', tm.full_name,
+                            'roll_no', tm.roll_no,
+                            'photo', tm.photo
+                        )
+                        ORDER BY tm.id
+                    )
+                    FROM project_team_member AS tm
+                    WHERE tm.project_id = p.id
+                ),
+                '[]'::json
+            ),
+            'files', COALESCE(
+                (
+                    SELECT json_agg(
+                        json_build_object('id', f.id, 'file_type', f.file_type, 'file', f.file)
+                        ORDER BY f.id
+                    )
+                    FROM project_files AS f
+                    WHERE f.project_id = p.id
+                ),
+                '[]'::json
+            )
+        ) END AS project
+    FROM project AS p
+    JOIN project_rating_stats AS rs ON rs.project_id = p.id
+    JOIN category AS c ON p.category_id = c.id
+    JOIN department AS d ON p.department_id = d.id
+    JOIN batch_year AS b ON p.batch_year_id = b.id
+    JOIN "user" AS u ON p.submitted_by = u.id
+    CROSS JOIN LATERAL (SELECT {version} AS version) AS version
+    WHERE {where};
+"""
+
+
+async def get_project_detail(where: str, params: tuple, conn=None) -> Optional[dict]:
+    """
+    Fetch one project as a ProjectRetrieveResponse-shaped dict, or None.
+
+    `where` is a fixed SQL condition on the `p` (project) alias with %s
+    placeholders for `params`; never interpolate request data into it.
+    """
+    found = await get_versioned_project_detail(where, params, (), conn)
+    return found[1] if found else None
+
+
+async def get_versioned_project_detail(
+    where: str, params: tuple, known_versions: Iterable[str], conn=None
+) -> Optional[Tuple[str, Optional[dict]]]:
+    """
+    The project detail matching `where` (see get_project_detail) and its
+    version, or None if there is no such project.
+
+    The detail is None when its version is in `known_versions`, so a client
+    that already holds it costs one indexed lookup and no aggregation.
+    """
+    query = PROJECT_DETAIL_SQL.format(where=where, version=PROJECT_DETAIL_VERSION)
+    rows = await perform_query(query, (list(known_versions), *params), conn)
+    if not rows:
+        return None
+
+    project = rows[0]["project"]
+    if project is not None:
+        # Links are stored URL-encoded, which Postgres can't decode
+        project["github_links"] = [
+            urllib.parse.unquote(link) for link in project["github_links"]
+        ]
+    return rows[0]["version"], project
+
+
+async def invalidate_project_listings(category_id: Optional[int] = None) -> None:
+    """
+    Drop cached public project listings after an approved project changed.
+
+    Unfiltered listings (and those filtered by anything but category) are
+    always dropped; category listings only for the project's own category.
+    """
+    tags = ["projects"]
+    if category_id is not None:
+        tags.append(f"category:{category_id}")
+    await response_cache.invalidate(*tags)
@@ -0,0 +1,26 @@
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+_client: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """
+    App-wide Redis client (REDIS_URL), created on first use.
+
+    The client keeps its own connection pool; `close_redis` shuts it down.
+    """
+    global _client
+    if _client is None:
+        _client = Redis.from_url(settings.redis_url, decode_responses=True)
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
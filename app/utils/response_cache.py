@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(namespace: str, params: dict) -> str:
+    """Stable key for a set of query parameters; unset (None) ones are dropped."""
+    items = sorted((k, v) for k, v in params.items() if v is not None)
+    return f"{namespace}?{urlencode(items)}"
+
+
+def body_digest(body: str) -> str:
+    """SHA-1 of a response body, as make_etag would quote it."""
+    return hashlib.sha1(body.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for serialized responses, invalidated by tag.
+
+    Entries live in a per-worker LRU and, if a Redis client is given, in
+    Redis where every worker can reuse them. Each entry is stored under the
+    current version of its tags; `invalidate(tag)` bumps the version so the
+    old entries are simply never read again and age out by TTL. With Redis
+    the tag versions live there too, so an invalidation in one worker is
+    seen by all of them.
+
+    Entries are also versioned by TTL window, so what no invalidation covers
+    (view counts, ...) is refreshed at least every `ttl` seconds. Each entry
+    keeps a hash of its body to serve as the response's validator; the
+    version alone can't, as workers or a recomputation after an eviction
+    may store different bodies under it.
+
+    Concurrent misses on the same entry are computed once per worker: the
+    first request computes it while the others wait and then read it.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 512, redis=None, prefix="resp:"):
+        self.ttl = ttl
+        self.redis = redis
+        self.prefix = prefix
+        self._local = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._versions: Dict[str, int] = {}
+        # Entry being computed -> [lock, requests holding or waiting on it]
+        self._flights: Dict[str, List] = {}
+
+    async def _tag_versions(self, tags: Tuple[str, ...]) -> Optional[Tuple[int, ...]]:
+        if self.redis is None:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+        try:
+            values = await self.redis.mget([f"{self.prefix}tag:{tag}" for tag in tags])
+        except RedisError as err:
+            logger.warning(f"Response cache bypassed, Redis unavailable: {err}")
+            return None
+        return tuple(int(value or 0) for value in values)
+
+    @asynccontextmanager
+    async def _single_flight(self, key: str):
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = [asyncio.Lock(), 0]
+        flight[1] += 1
+        try:
+            async with flight[0]:
+                yield
+        finally:
+            flight[1] -= 1
+            if not flight[1]:
+                del self._flights[key]
+
+    async def _version(self, key: str, tags: Iterable[str]) -> Optional[str]:
+        """
+        What the entry for `key` is stored under right now: the current
+        versions of its tags and the TTL window. None when the cache is off
+        or Redis is unavailable.
+        """
+        tags = tuple(sorted(tags))
+        versions = await self._tag_versions(tags)
+        if versions is None or not self.ttl:
+            return None
+        window = int(time.time() // self.ttl)
+        return f"{key}#{','.join(map(str, versions))}@{window}"
+
+    async def get_or_set(
+        self, key: str, tags: Iterable[str], compute: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return the cached body for `key`, or compute, store and return it."""
+        _, body = await self.get_or_set_entry(key, tags, compute)
+        return body
+
+    async def get_or_set_entry(
+        self, key: str, tags: Iterable[str], compute: Callable[[], Awaitable[str]]
+    ) -> Tuple[str, str]:
+        """
+        `get_or_set` returning `(digest, body)`, where digest is the SHA-1
+        of the body, stored with it so a hit needn't rehash it.
+        """
+        version = await self._version(key, tags)
+        if version is None:
+            body = await compute()
+            return body_digest(body), body
+
+        entry = self._local.get(version)
+        if entry is not None:
+            return entry
+
+        async with self._single_flight(version):
+            # Computed by the request we waited on, unless it failed
+            entry = self._local.get(version)
+            if entry is not None:
+                return entry
+
+            redis_key = f"{self.prefix}body:{version}"
+            if self.redis is not None:
+                try:
+                    stored = await self.redis.get(redis_key)
+                except RedisError as err:
+                    logger.warning(f"Response cache read failed: {err}")
+                    stored = None
+                if stored is not None:
+                    entry = tuple(stored.split(":", 1))
+                    self._local.set(version, entry)
+                    return entry
+
+            # Versions were read before computing, so an invalidation that
+            # lands meanwhile leaves this entry under the old version, unreachable
+            body = await compute()
+            entry = (body_digest(body), body)
+            self._local.set(version, entry)
+            if self.redis is not None:
+                try:
+                    await self.redis.set(redis_key, ":".join(entry), ex=int(self.ttl))
+                except RedisError as err:
+                    logger.warning(f"Response cache write failed: {err}")
+            return entry
+
+    async def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(f"{self.prefix}tag:{tag}")
+                await pipe.execute()
+        except RedisError as err:
+            # Other workers will serve stale entries until they expire
+            logger.warning(f"Response cache invalidation failed: {err}")
+
+
+response_cache = ResponseCache(
+    ttl=settings.response_cache_ttl,
+    maxsize=settings.response_cache_size,
+    redis=get_redis() if settings.response_cache_redis else None,
+)
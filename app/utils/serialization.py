@@ -0,0 +1,91 @@
+import typing
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def dumps(data: Any) -> bytes:
+    """Compact UTF-8 JSON, the same bytes FastAPI's JSONResponse would send."""
+    return orjson.dumps(data)
+
+
+class RowSerializer:
+    """
+    Serializes rows from our own queries in the shape of a response model,
+    without building a model per row.
+
+    Listing endpoints used to validate every row into a model, and FastAPI
+    then validated and serialized the whole page again for `response_model`.
+    The rows are ours, so here they are only reshaped: the model's fields,
+    in its order, under their camelCase aliases, nested models and lists of
+    them included. Extra keys are dropped and missing ones get the field's
+    default, as the model would. The only coercion is Decimal to float, for
+    NUMERIC columns behind `float` fields; anything else must already be of
+    the field's type.
+
+    Usage:
+        project_page = RowSerializer(ProjectList)
+        return project_page.response({"count": count, "results": rows})
+
+    Keep `response_model` on the route for the docs; a returned Response
+    skips its validation.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.fields: List[Tuple[str, str, Any, Optional["RowSerializer"], bool]] = []
+        for name, field in model.model_fields.items():
+            alias = field.serialization_alias or field.alias or name
+            annotation, many = _unwrap(field.annotation)
+            nested = (
+                RowSerializer(annotation)
+                if isinstance(annotation, type) and issubclass(annotation, BaseModel)
+                else None
+            )
+            self.fields.append((name, alias, field, nested, many))
+
+    def to_dict(self, row: dict) -> dict:
+        data = {}
+        for name, alias, field, nested, many in self.fields:
+            if name in row:
+                value = row[name]
+            elif field.is_required():
+                raise KeyError(f"{self.model.__name__}.{name} missing from row")
+            else:
+                value = field.get_default(call_default_factory=True)
+
+            if value is None:
+                pass
+            elif nested is not None:
+                value = (
+                    [nested.to_dict(item) for item in value]
+                    if many
+                    else nested.to_dict(value)
+                )
+            elif isinstance(value, Decimal):
+                value = float(value)
+            data[alias] = value
+        return data
+
+    def dump(self, row: dict) -> bytes:
+        return dumps(self.to_dict(row))
+
+    def response(self, row: dict, headers: Optional[dict] = None) -> Response:
+        return Response(self.dump(row), media_type="application/json", headers=headers)
+
+
+def _unwrap(annotation: Any) -> Tuple[Any, bool]:
+    """`Optional[X]` -> (X, False), `List[X]` -> (X, True)."""
+    many = False
+    while True:
+        origin = typing.get_origin(annotation)
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if origin is typing.Union and len(args) == 1:
+            annotation = args[0]
+        elif origin in (list, List) and args:
+            annotation, many = args[0], True
+        else:
+            return annotation, many
@@ -0,0 +1,44 @@
+from app.config import settings
+from app.database import perform_query
+from app.utils.cache import TTLCache
+
+# Dashboard counts are read far more often than they change; writes that
+# move them call `invalidate_dashboard_summary`
+_dashboard_cache = TTLCache(ttl=settings.dashboard_cache_ttl, maxsize=1)
+
+DASHBOARD_SUMMARY_SQL = """
+    SELECT
+        projects.total AS total_projects,
+        projects.pending,
+        projects.accepted,
+        projects.rejected,
+        contacts.total AS total_contacts,
+        contacts.new AS new_contacts
+    FROM (
+        SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE status = 'PENDING') AS pending,
+            COUNT(*) FILTER (WHERE status = 'APPROVED') AS accepted,
+            COUNT(*) FILTER (WHERE status = 'REJECTED') AS rejected
+        FROM project
+    ) AS projects
+    CROSS JOIN (
+        SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE created_at >= date_trunc('week', now())) AS new
+        FROM contact_message
+    ) AS contacts;
+"""
+
+
+async def get_dashboard_counts(conn=None) -> dict:
+    """Project and contact counts for the admin dashboard, one pass per table."""
+    counts = _dashboard_cache.get("summary")
+    if counts is None:
+        counts = dict((await perform_query(DASHBOARD_SUMMARY_SQL, conn=conn))[0])
+        _dashboard_cache.set("summary", counts)
+    return counts
+
+
+def invalidate_dashboard_summary() -> None:
+    _dashboard_cache.clear()
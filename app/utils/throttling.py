@@ -1,8 +1,10 @@
 from slowapi.util import get_remote_address
 from slowapi import Limiter
 
+from app.config import settings
+
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["200/minute"],
-    storage_uri="redis://localhost:6379",
+    storage_uri=settings.redis_url,
 )
\ No newline at end of file
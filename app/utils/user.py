@@ -1,11 +1,16 @@
 import uuid
 from typing import List
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 from app.config import settings
 from app.database import execute_query, perform_query
+from app.utils.cache import TTLCache
+from app.utils.otp import otp_store
 
+# Principal (id, username, role) resolved for each authenticated request
+user_cache = TTLCache(ttl=settings.user_cache_ttl, maxsize=settings.user_cache_size)
 
-def get_user_by_email(email: str, check_admin=False):
+
+async def get_user_by_email(email: str, check_admin=False, conn=None):
     # Base query
     query = """
     SELECT 
@@ -22,17 +27,40 @@ def get_user_by_email(email: str, check_admin=False):
     if check_admin:
         query += " AND user_role IN ('ADMIN', 'STAFF')"
 
-    rows = perform_query(query, params)
+    rows = await perform_query(query, params, conn)
     return rows[0] if rows else None
 
 
-def get_user_by_id(id: str):
-    query = f"SELECT id, username, user_role FROM \"user\" WHERE id = '{id}' AND NOT is_archived;"
-    rows = perform_query(query)
+async def get_user_by_id(id: int, conn=None):
+    query = (
+        'SELECT id, username, user_role FROM "user" WHERE id = %s AND NOT is_archived;'
+    )
+    rows = await perform_query(query, (id,), conn)
     return rows[0] if rows else None
 
 
-def create_user(
+async def get_cached_user(id: int, conn=None):
+    """
+    `get_user_by_id` behind a short-lived cache, for authorizing requests.
+
+    Unknown or archived users are not cached. Call `invalidate_user` after
+    changing a user's row so the next request reads it again.
+    """
+    user = user_cache.get(id)
+    if user is None:
+        user = await get_user_by_id(id, conn)
+        if user is None:
+            return None
+        user_cache.set(id, dict(user))
+    # Callers get their own copy, so the cached entry can't be mutated
+    return dict(user)
+
+
+def invalidate_user(id: int) -> None:
+    user_cache.invalidate(id)
+
+
+async def create_user(
     email: str,
     username: str,
     firstname: str = "",
@@ -63,43 +91,26 @@ def create_user(
         now,
         now,
     )
-    return execute_query(query, params, conn)
+    return await execute_query(query, params, conn)
 
 
-def update_user_profile(set_clauses: List, params: List):
+async def update_user_profile(set_clauses: List, params: List, conn=None):
     query = f"""
         UPDATE "user"
         SET {', '.join(set_clauses)}, updated_at = now()
         WHERE id = %s;
     """
-    return execute_query(query, tuple(params))
-
-
-def verify_otp(user_id: int, otp: str) -> bool:
-    OTP_LIFETIME = timedelta(minutes=settings.otp_lifetime)
-
-    select_sql = """
-        SELECT id, created_at
-        FROM user_verification
-        WHERE user_id = %s AND otp = %s
-        LIMIT 1;
-    """
-    rows = perform_query(select_sql, (user_id, otp))
-    is_valid = False
-
-    if rows:
-        created_at = rows[0]["created_at"]
-        expires_at = created_at + OTP_LIFETIME
-        now_utc = datetime.now(timezone.utc)
-        is_valid = expires_at > now_utc
+    result = await execute_query(query, tuple(params), conn)
+    # The user id is always the last parameter
+    invalidate_user(params[-1])
+    return result
 
-    delete_sql = "DELETE FROM user_verification WHERE user_id = %s;"
-    execute_query(delete_sql, (user_id,))
 
-    return is_valid
+async def verify_otp(user_id: int, otp: str, conn=None) -> bool:
+    return await otp_store.verify(user_id, otp, conn)
 
 
-def verify_password(user_id: int, password: str) -> bool:
+async def verify_password(user_id: int, password: str, conn=None) -> bool:
 
     select_sql = """
         SELECT id
@@ -107,21 +118,21 @@ def verify_password(user_id: int, password: str) -> bool:
         WHERE id = %s AND password = %s
         LIMIT 1;
     """
-    rows = perform_query(select_sql, (user_id, password))
+    rows = await perform_query(select_sql, (user_id, password), conn)
     if rows:
         return True
 
     return False
 
 
-def get_user_data_by_id(user_id: int) -> dict | None:
+async def get_user_data_by_id(user_id: int, conn=None) -> dict | None:
     query = """
         SELECT id, email, uuid, photo, bi0, username, first_name, last_name, phone_no, user_role, date_joined
         FROM "user"
         WHERE id = %s AND NOT is_archived
         LIMIT 1;
     """
-    rows = perform_query(query, (user_id,))
+    rows = await perform_query(query, (user_id,), conn)
 
     if rows:
         return rows[0]
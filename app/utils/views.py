@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.database import perform_query
+from app.utils.cache import TTLCache
+from app.utils.db import values_placeholders
+
+logger = logging.getLogger(__name__)
+
+# Stored counts used for live totals are reread after this many seconds, to
+# pick up the views other workers have written meanwhile
+STORED_VIEWS_TTL = 60
+
+
+class ViewCounter:
+    """
+    Write-behind buffer for project view counts.
+
+    Views are summed in memory per project and written every
+    `flush_interval` seconds with one multi-row UPDATE, instead of one
+    row update (and row lock) per page view. Each worker keeps its own
+    buffer; increments are additive so they merge in Postgres.
+
+    With `dedupe_window` set, repeat views of a project by the same visitor
+    within that many seconds are not counted again. Live totals are based
+    on the stored counts of at most `max_projects` recently viewed projects.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 5.0,
+        dedupe_window: float = 0,
+        max_projects: int = 10000,
+    ):
+        self.flush_interval = flush_interval
+        self.dedupe_window = dedupe_window
+        self._pending: Dict[int, int] = {}
+        # Last count read from or written to Postgres, for approximate live totals
+        self._stored = TTLCache(ttl=STORED_VIEWS_TTL, maxsize=max_projects)
+        self._seen: Dict[Tuple[int, str], float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def record(self, project_id: int, visitor: Optional[str] = None):
+        """
+        Count a view and return the approximate live total.
+
+        Returns None if the project does not exist.
+        """
+        stored = self._stored.get(project_id)
+        if stored is None:
+            rows = await perform_query(
+                "SELECT views FROM project WHERE id = %s;", (project_id,)
+            )
+            if not rows:
+                return None
+            stored = rows[0]["views"]
+            self._stored.set(project_id, stored)
+
+        if not self._is_repeat(project_id, visitor):
+            self._pending[project_id] = self._pending.get(project_id, 0) + 1
+        return stored + self._pending.get(project_id, 0)
+
+    def _is_repeat(self, project_id: int, visitor: Optional[str]) -> bool:
+        if not self.dedupe_window or visitor is None:
+            return False
+
+        now = time.monotonic()
+        key = (project_id, visitor)
+        if self._seen.get(key, 0) > now:
+            return True
+
+        self._seen[key] = now + self.dedupe_window
+        return False
+
+    async def flush(self) -> None:
+        """Write the buffered increments to Postgres in a single statement."""
+        now = time.monotonic()
+        self._seen = {key: exp for key, exp in self._seen.items() if exp > now}
+
+        if not self._pending:
+            return
+
+        # Swap the buffer first so views recorded during the write aren't lost
+        pending, self._pending = self._pending, {}
+        query = f"""
+            UPDATE project AS p
+            SET views = p.views + v.increment
+            FROM (VALUES {values_placeholders(len(pending), 2)}) AS v(id, increment)
+            WHERE p.id = v.id
+            RETURNING p.id, p.views;
+        """
+        params = tuple(value for item in pending.items() for value in item)
+
+        try:
+            rows = await perform_query(query, params)
+        except Exception:
+            # Not cancellation: an UPDATE interrupted that way may still have
+            # been committed, and putting it back would count it twice
+            for project_id, count in pending.items():
+                self._pending[project_id] = self._pending.get(project_id, 0) + count
+            raise
+
+        for row in rows:
+            self._stored.set(row["id"], row["views"])
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._stopping.wait(), timeout=self.flush_interval
+                )
+                return
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush project views, will retry")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and drain whatever is still buffered."""
+        if self._task is not None:
+            # Never cancelled: a flush in flight is waited for, so its batch
+            # is either written or back in the buffer before draining
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(
+                "Dropped %d buffered project views", sum(self._pending.values())
+            )
+
+
+view_counter = ViewCounter(
+    flush_interval=settings.view_flush_interval,
+    dedupe_window=settings.view_dedupe_window,
+)
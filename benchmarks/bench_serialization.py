@@ -0,0 +1,124 @@
+"""
+CPU cost of serializing one listing page, per model and rows per page.
+
+Run from the repository root (it imports the app's response models):
+
+    python benchmarks/bench_serialization.py --rows 100
+
+`pydantic` is the old path: a model per row, then what FastAPI does with a
+`response_model` (validate the page, dump it to JSON-able Python, json.dumps).
+`rows` is RowSerializer turning the same dicts straight into JSON bytes.
+Both must produce the same bytes; the script checks that first.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.admin.schemas.website import ContactList, ContactResponse  # noqa: E402
+from app.api.public.schemas.project import (  # noqa: E402
+    CategoryList,
+    CategoryResponse,
+    ProjectList,
+    ProjectResponse,
+)
+from app.utils.serialization import RowSerializer  # noqa: E402
+
+SUBMITTED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def project_row(i: int) -> dict:
+    return {
+        "id": i,
+        "title": f"Project {i} web portal",
+        "slug": f"project-{i}",
+        "abstract": "An archive of student projects. " * 8,
+        "level": "Bachelors",
+        "supervisor": "Dr. Supervisor",
+        "technologies_used": "Python, FastAPI, PostgreSQL",
+        "github_link": f"https://github.com/example/project-{i}",
+        "documentation_link": f"https://docs.example.com/project-{i}",
+        "status": "APPROVED",
+        "submitted_at": (SUBMITTED + timedelta(hours=i)).isoformat(),
+        "submitted_by_full_name": "Student Name",
+        "category": {"id": i % 10, "name": "Web Development"},
+        "department": {"id": i % 8, "name": "Computer Engineering"},
+        "batch_year": {"id": i % 6, "year": 2020 + i % 6},
+        "rating_average": float(Decimal("4.25")),
+        "views": i * 7,
+    }
+
+
+def category_row(i: int) -> dict:
+    return {"id": i, "name": f"Category {i}", "is_active": True, "project_count": i}
+
+
+def contact_row(i: int) -> dict:
+    return {
+        "id": i,
+        "full_name": "Visitor Name",
+        "email": f"visitor{i}@example.com",
+        "phone_no": "9800000000",
+        "subject": "Question about a project",
+        "message": "Could you share the documentation for this project? " * 3,
+        "created_at": (SUBMITTED + timedelta(minutes=i)).isoformat(),
+        "is_read": False,
+    }
+
+
+CASES = [
+    ("projects", ProjectList, ProjectResponse, project_row),
+    ("categories", CategoryList, CategoryResponse, category_row),
+    ("contacts", ContactList, ContactResponse, contact_row),
+]
+
+
+def pydantic_page(adapter: TypeAdapter, item_model, rows: list) -> bytes:
+    page = {"count": len(rows), "results": [item_model(**row) for row in rows]}
+    value = adapter.validate_python(page)
+    content = adapter.dump_python(value, mode="json", by_alias=True)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def run(rows_per_page: int, number: int) -> None:
+    print(f"{rows_per_page} rows per page, best of 5 x {number} pages")
+    for name, page_model, item_model, make_row in CASES:
+        rows = [make_row(i) for i in range(1, rows_per_page + 1)]
+        adapter = TypeAdapter(page_model)
+        serializer = RowSerializer(page_model)
+
+        page = {"count": len(rows), "results": rows}
+        assert serializer.dump(page) == pydantic_page(adapter, item_model, rows)
+
+        timings = {}
+        for label, func in (
+            ("pydantic", lambda: pydantic_page(adapter, item_model, rows)),
+            ("rows", lambda: serializer.dump(page)),
+        ):
+            best = min(timeit.repeat(func, number=number, repeat=5))
+            timings[label] = best / number * 1_000_000
+
+        print(
+            f"{name:<11} pydantic {timings['pydantic']:8.1f} us"
+            f"   rows {timings['rows']:8.1f} us"
+            f"   {timings['pydantic'] / timings['rows']:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    run(args.rows, args.number)
@@ -0,0 +1,95 @@
+"""
+Query plans of the public project listing for every filter combination.
+
+Run from the repository root against a migrated database (DATABASE_URL):
+
+    python benchmarks/explain_project_filters.py --ordering -submitted_at
+
+For each combination of category, department, batch year and level filters
+it prints the indexes the plan scans, and fails (exit status 1) if none of
+the filtered columns' indexes is among them. Sequential scans are disabled
+while planning, so the check asks whether an index *can* serve the filters
+and holds on a small development database too; pass `--allow-seqscan` to
+see the plans the planner would really pick for the data at hand.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import (  # noqa: E402
+    close_pool,
+    execute_query,
+    get_pool,
+    perform_query,
+    transaction,
+)
+from app.utils.db import explain, plan_indexes  # noqa: E402
+from app.utils.project import (  # noqa: E402
+    PROJECT_FILTER_INDEXES,
+    ProjectQuery,
+    project_keyset,
+)
+
+
+async def run(ordering: str, allow_seqscan: bool) -> int:
+    await get_pool().open()
+    failures = 0
+    try:
+        # Filter on values that exist, as the planner's estimates depend on them
+        sample = await perform_query(
+            """
+            SELECT category_id, department_id, batch_year_id, level::text
+            FROM project WHERE is_active AND status = 'APPROVED' LIMIT 1;
+            """
+        )
+        if not sample:
+            print("no approved projects to filter on")
+            return 1
+        values = dict(zip(PROJECT_FILTER_INDEXES, sample[0].values()))
+
+        keyset = project_keyset(ordering)
+        async with transaction() as conn:
+            if not allow_seqscan:
+                await execute_query("SET LOCAL enable_seqscan = off", conn=conn)
+
+            for size in range(len(PROJECT_FILTER_INDEXES) + 1):
+                for columns in itertools.combinations(PROJECT_FILTER_INDEXES, size):
+                    query = ProjectQuery("p.is_active AND p.status = 'APPROVED'")
+                    for column in columns:
+                        query.filter(column, values[column])
+
+                    plan = await explain(*query.page(keyset, 10), conn)
+                    used = plan_indexes(plan)
+                    expected = {PROJECT_FILTER_INDEXES[column] for column in columns}
+                    ok = not columns or bool(used & expected)
+                    failures += not ok
+
+                    # The joined tables are always read by primary key
+                    on_project = sorted(
+                        i
+                        for i in used
+                        if i == "project_pkey" or i.startswith("idx_project_")
+                    )
+                    label = ", ".join(c.removeprefix("p.") for c in columns) or "-"
+                    print(
+                        f"{'ok' if ok else 'FAIL':<5}{label:<50}"
+                        f"{', '.join(on_project) or 'no index'}"
+                    )
+    finally:
+        await close_pool()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ordering", default="-submitted_at")
+    parser.add_argument("--allow-seqscan", action="store_true")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.ordering, args.allow_seqscan)))
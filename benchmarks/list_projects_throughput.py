@@ -0,0 +1,72 @@
+"""
+Concurrent throughput benchmark for `GET /api/public/project-app/projects`.
+
+Start the API (`uvicorn main:app --workers 1`) and run:
+
+    python benchmarks/list_projects_throughput.py --concurrency 50 --requests 2000
+
+Run it once on the commit before the async query layer and once after to
+compare requests/second and latency percentiles for a single worker. Run the
+load generator on a different machine (or at least a different core) than the
+API, and point the API at a database with a realistic round-trip time;
+against a local socket the database never makes the worker wait.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+PATH = "/api/public/project-app/projects"
+
+
+async def worker(client: httpx.AsyncClient, queue: asyncio.Queue, latencies: list):
+    while True:
+        try:
+            params = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        started = time.perf_counter()
+        response = await client.get(PATH, params=params)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url: str, concurrency: int, total: int, limit: int) -> None:
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait({"limit": limit, "offset": (i * limit) % 100})
+
+    latencies: list = []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(client, queue, latencies) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"requests:    {len(latencies)}")
+    print(f"concurrency: {concurrency}")
+    print(f"throughput:  {len(latencies) / elapsed:.1f} req/s")
+    print(f"latency p50: {p50 * 1000:.1f} ms")
+    print(f"latency p99: {p99 * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.concurrency, args.requests, args.limit))
@@ -0,0 +1,89 @@
+"""
+OAuth sign-in latency against mocked Google and GitHub APIs.
+
+Run from the repository root (it imports the app's OAuth validators):
+
+    python benchmarks/oauth_latency.py --latency 80 --requests 50
+
+Every mocked provider call takes `--latency` ms, standing in for the round
+trip to the provider. GitHub sign-in makes three calls; the profile and
+email fetches run concurrently, so it should take about two round trips.
+Connection reuse does not show up here since the mock has no handshakes;
+compare `connect` timings against the real providers for that.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.public.oauth.base import OAuthProvider  # noqa: E402
+from app.api.public.oauth.github import GitHubOAuth  # noqa: E402
+from app.api.public.oauth.google import GoogleOAuth  # noqa: E402
+from app.utils.http import close_http_client, set_http_client  # noqa: E402
+
+CLIENT_ID = "bench-client-id"
+
+RESPONSES = {
+    "/login/oauth/access_token": {"access_token": "bench-token"},
+    "/user": {"name": "Bench User"},
+    "/user/emails": [{"email": "bench@example.com", "primary": True, "verified": True}],
+    "/tokeninfo": {"aud": CLIENT_ID},
+    "/oauth2/v3/userinfo": {
+        "given_name": "Bench",
+        "family_name": "User",
+        "name": "Bench User",
+        "email": "bench@example.com",
+    },
+}
+
+
+def mock_transport(latency: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=RESPONSES[request.url.path])
+
+    return httpx.MockTransport(handler)
+
+
+async def measure(name: str, validate, total: int) -> None:
+    latencies = []
+    for _ in range(total):
+        started = time.perf_counter()
+        user_info = await validate("bench-code")
+        latencies.append(time.perf_counter() - started)
+        assert user_info["type"] == "success", user_info
+
+    print(
+        f"{name:<7} p50 {statistics.median(latencies) * 1000:7.1f} ms"
+        f"   max {max(latencies) * 1000:7.1f} ms"
+    )
+
+
+async def run(latency_ms: float, total: int) -> None:
+    for provider in ("GOOGLE", "GITHUB"):
+        setattr(OAuthProvider, f"{provider}_CLIENT_ID", CLIENT_ID)
+        setattr(OAuthProvider, f"{provider}_CLIENT_SECRET", "bench-secret")
+
+    set_http_client(httpx.AsyncClient(transport=mock_transport(latency_ms / 1000)))
+    try:
+        print(f"mocked provider latency: {latency_ms:.0f} ms per call")
+        await measure("google", GoogleOAuth.validate, total)
+        await measure("github", GitHubOAuth.validate, total)
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=80)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.latency, args.requests))
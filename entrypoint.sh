@@ -4,5 +4,6 @@ set -e
 echo "Starting FastAPI app..."
 
 alembic upgrade head
+python seed.py
 
 exec "$@"
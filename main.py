@@ -2,8 +2,7 @@ import sys
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
-from psycopg2 import pool, OperationalError
-from psycopg2.extras import RealDictCursor
+from psycopg2 import OperationalError
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -13,35 +12,40 @@ from slowapi import _rate_limit_exceeded_handler
 
 from app.config import settings
 from app.api import router as api_router
+from app.database import close_pool, get_pool
 from app.utils.throttling import limiter
+from app.utils.compression import CompressionMiddleware
+from app.utils.http import close_http_client
+from app.utils.lookups import lookups
+from app.utils.mailer import mailer
+from app.utils.redis import close_redis
+from app.utils.views import view_counter
 from seed import seed_lookup_tables
 
-db_pool = None
 MEDIA_ROOT = Path("media")
 MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global db_pool
     try:
-        db_pool = pool.SimpleConnectionPool(
-            minconn=1,
-            maxconn=10,
-            dsn=settings.database_url,
-            cursor_factory=RealDictCursor,
-        )
-        conn = db_pool.getconn()
-        db_pool.putconn(conn)
+        await get_pool().open()
     except OperationalError as e:
         print(f"Database connection error: {e}", file=sys.stderr)
         sys.exit(1)
 
-    seed_lookup_tables()
+    if settings.seed_on_startup:
+        await seed_lookup_tables()
+    await lookups.refresh(force=True)
+    view_counter.start()
+    mailer.start()
     yield
 
-    if db_pool:
-        db_pool.closeall()
+    await mailer.stop()
+    await view_counter.stop()
+    await close_redis()
+    await close_http_client()
+    await close_pool()
 
 
 app = FastAPI(lifespan=lifespan, title=settings.app_name, version=settings.app_version)
@@ -66,6 +70,14 @@ async def home():
 app.include_router(api_router, prefix="/api")
 
 # Middlewares
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    content_types=settings.compression_content_types,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+    cache_size=settings.compression_cache_size,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_cors_origins,
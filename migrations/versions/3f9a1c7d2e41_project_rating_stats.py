@@ -0,0 +1,130 @@
+"""project_rating_stats
+
+Revision ID: 3f9a1c7d2e41
+Revises: eeecf725961c
+Create Date: 2026-10-18 10:12:05.418327
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a1c7d2e41"
+down_revision: Union[str, Sequence[str], None] = "eeecf725961c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per project, kept in step with project_rating by triggers
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS project_rating_stats (
+            project_id BIGINT PRIMARY KEY,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            rating_histogram INTEGER[] NOT NULL DEFAULT '{0,0,0,0,0}',
+            avg_rating NUMERIC(3,2) GENERATED ALWAYS AS (
+                CASE
+                    WHEN rating_count > 0
+                    THEN (rating_sum::numeric / rating_count)::numeric(3,2)
+                    ELSE 5.0
+                END
+            ) STORED,
+            CONSTRAINT fk_project_rating_stats_project FOREIGN KEY(project_id) REFERENCES project(id) ON DELETE CASCADE
+        );
+    """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rating_stats_avg ON project_rating_stats(avg_rating, project_id);"
+    )
+
+    # Every project gets a stats row, so listings can inner join it
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION project_rating_stats_init() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO project_rating_stats (project_id) VALUES (NEW.id)
+            ON CONFLICT (project_id) DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_project_rating_stats_init
+        AFTER INSERT ON project
+        FOR EACH ROW EXECUTE FUNCTION project_rating_stats_init();
+    """
+    )
+
+    # Apply each rating insert/change/delete as a delta in the same transaction
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION project_rating_stats_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+               AND OLD.rating = NEW.rating
+               AND OLD.project_id = NEW.project_id THEN
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE project_rating_stats
+                SET rating_count = rating_count - 1,
+                    rating_sum = rating_sum - OLD.rating,
+                    rating_histogram[OLD.rating] = rating_histogram[OLD.rating] - 1
+                WHERE project_id = OLD.project_id;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE project_rating_stats
+                SET rating_count = rating_count + 1,
+                    rating_sum = rating_sum + NEW.rating,
+                    rating_histogram[NEW.rating] = rating_histogram[NEW.rating] + 1
+                WHERE project_id = NEW.project_id;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_project_rating_stats_apply
+        AFTER INSERT OR DELETE OR UPDATE OF rating, project_id ON project_rating
+        FOR EACH ROW EXECUTE FUNCTION project_rating_stats_apply();
+    """
+    )
+
+    # Backfill from existing ratings
+    op.execute(
+        """
+        INSERT INTO project_rating_stats (project_id, rating_count, rating_sum, rating_histogram)
+        SELECT
+            p.id,
+            COUNT(pr.rating),
+            COALESCE(SUM(pr.rating), 0),
+            ARRAY[
+                COUNT(*) FILTER (WHERE pr.rating = 1),
+                COUNT(*) FILTER (WHERE pr.rating = 2),
+                COUNT(*) FILTER (WHERE pr.rating = 3),
+                COUNT(*) FILTER (WHERE pr.rating = 4),
+                COUNT(*) FILTER (WHERE pr.rating = 5)
+            ]::INTEGER[]
+        FROM project AS p
+        LEFT JOIN project_rating AS pr ON pr.project_id = p.id
+        GROUP BY p.id
+        ON CONFLICT (project_id) DO NOTHING;
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS trg_project_rating_stats_apply ON project_rating;"
+    )
+    op.execute("DROP TRIGGER IF EXISTS trg_project_rating_stats_init ON project;")
+    op.execute("DROP FUNCTION IF EXISTS project_rating_stats_apply();")
+    op.execute("DROP FUNCTION IF EXISTS project_rating_stats_init();")
+    op.execute("DROP INDEX IF EXISTS idx_rating_stats_avg;")
+    op.execute("DROP TABLE IF EXISTS project_rating_stats;")
@@ -0,0 +1,35 @@
+"""seed_state
+
+Revision ID: 5d0b7e3a9c18
+Revises: 8c2d4e6f1a93
+Create Date: 2026-10-18 12:20:44.105392
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d0b7e3a9c18"
+down_revision: Union[str, Sequence[str], None] = "8c2d4e6f1a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Version of each data seed applied to this database, see seed.py
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS seed_state (
+            name VARCHAR(50) PRIMARY KEY,
+            version INTEGER NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS seed_state;")
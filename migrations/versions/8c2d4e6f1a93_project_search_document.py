@@ -0,0 +1,50 @@
+"""project_search_document
+
+Revision ID: 8c2d4e6f1a93
+Revises: 3f9a1c7d2e41
+Create Date: 2026-10-18 11:02:37.640215
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c2d4e6f1a93"
+down_revision: Union[str, Sequence[str], None] = "3f9a1c7d2e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Weighted search document kept up to date by Postgres itself:
+    # title (A) > technologies, supervisor (B) > abstract (C).
+    # Adding a STORED generated column rewrites `project` under an ACCESS
+    # EXCLUSIVE lock, blocking reads and writes for the length of the rewrite
+    op.execute(
+        """
+        ALTER TABLE project
+        ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(technologies_used, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(supervisor, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(abstract, '')), 'C')
+        ) STORED;
+    """
+    )
+    # The index doesn't need to block writes while it builds
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_project_search_document
+            ON project USING GIN (search_document);
+        """
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_project_search_document;")
+    op.execute("ALTER TABLE project DROP COLUMN IF EXISTS search_document;")
@@ -0,0 +1,114 @@
+"""project_group_counts
+
+Revision ID: 9e4f2a6b7c35
+Revises: 5d0b7e3a9c18
+Create Date: 2026-10-18 12:58:12.371904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4f2a6b7c35"
+down_revision: Union[str, Sequence[str], None] = "5d0b7e3a9c18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Active (and active + approved) projects per category and department
+    for table in ("category", "department"):
+        op.execute(
+            f"""
+            ALTER TABLE {table}
+            ADD COLUMN IF NOT EXISTS project_count INTEGER NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS approved_project_count INTEGER NOT NULL DEFAULT 0;
+        """
+        )
+
+    # Move each project's contribution when it is added, removed, deactivated,
+    # reviewed or recategorized, in the same transaction as the change
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION project_group_counts_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+               AND OLD.is_active = NEW.is_active
+               AND OLD.status = NEW.status
+               AND OLD.category_id = NEW.category_id
+               AND OLD.department_id = NEW.department_id THEN
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_active THEN
+                UPDATE category
+                SET project_count = project_count - 1,
+                    approved_project_count = approved_project_count - (OLD.status = 'APPROVED')::int
+                WHERE id = OLD.category_id;
+
+                UPDATE department
+                SET project_count = project_count - 1,
+                    approved_project_count = approved_project_count - (OLD.status = 'APPROVED')::int
+                WHERE id = OLD.department_id;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_active THEN
+                UPDATE category
+                SET project_count = project_count + 1,
+                    approved_project_count = approved_project_count + (NEW.status = 'APPROVED')::int
+                WHERE id = NEW.category_id;
+
+                UPDATE department
+                SET project_count = project_count + 1,
+                    approved_project_count = approved_project_count + (NEW.status = 'APPROVED')::int
+                WHERE id = NEW.department_id;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_project_group_counts_apply
+        AFTER INSERT OR DELETE OR UPDATE OF is_active, status, category_id, department_id
+        ON project
+        FOR EACH ROW EXECUTE FUNCTION project_group_counts_apply();
+    """
+    )
+
+    # Backfill from existing projects
+    for table, column in (("category", "category_id"), ("department", "department_id")):
+        op.execute(
+            f"""
+            UPDATE {table} AS t
+            SET project_count = counts.active,
+                approved_project_count = counts.approved
+            FROM (
+                SELECT
+                    g.id,
+                    COUNT(p.id) FILTER (WHERE p.is_active) AS active,
+                    COUNT(p.id) FILTER (
+                        WHERE p.is_active AND p.status = 'APPROVED'
+                    ) AS approved
+                FROM {table} AS g
+                LEFT JOIN project AS p ON p.{column} = g.id
+                GROUP BY g.id
+            ) AS counts
+            WHERE t.id = counts.id;
+        """
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_project_group_counts_apply ON project;")
+    op.execute("DROP FUNCTION IF EXISTS project_group_counts_apply();")
+    for table in ("category", "department"):
+        op.execute(
+            f"""
+            ALTER TABLE {table}
+            DROP COLUMN IF EXISTS approved_project_count,
+            DROP COLUMN IF EXISTS project_count;
+        """
+        )
@@ -0,0 +1,146 @@
+"""drop_unused_group_counts
+
+Revision ID: b6d3f8a1c2e7
+Revises: 9e4f2a6b7c35
+Create Date: 2026-10-18 14:02:37.519284
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d3f8a1c2e7"
+down_revision: Union[str, Sequence[str], None] = "9e4f2a6b7c35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only category.project_count is read (lookup snapshot, public stats); the
+    # approved and department counts just made every project write heavier
+    op.execute("DROP TRIGGER IF EXISTS trg_project_group_counts_apply ON project;")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION project_group_counts_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+               AND OLD.is_active = NEW.is_active
+               AND OLD.category_id = NEW.category_id THEN
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_active THEN
+                UPDATE category SET project_count = project_count - 1
+                WHERE id = OLD.category_id;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_active THEN
+                UPDATE category SET project_count = project_count + 1
+                WHERE id = NEW.category_id;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_project_group_counts_apply
+        AFTER INSERT OR DELETE OR UPDATE OF is_active, category_id
+        ON project
+        FOR EACH ROW EXECUTE FUNCTION project_group_counts_apply();
+    """
+    )
+    op.execute("ALTER TABLE category DROP COLUMN IF EXISTS approved_project_count;")
+    op.execute(
+        """
+        ALTER TABLE department
+        DROP COLUMN IF EXISTS approved_project_count,
+        DROP COLUMN IF EXISTS project_count;
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE category
+        ADD COLUMN IF NOT EXISTS approved_project_count INTEGER NOT NULL DEFAULT 0;
+
+        ALTER TABLE department
+        ADD COLUMN IF NOT EXISTS project_count INTEGER NOT NULL DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS approved_project_count INTEGER NOT NULL DEFAULT 0;
+    """
+    )
+
+    # The trigger of 9e4f2a6b7c35, keeping all four counts
+    op.execute("DROP TRIGGER IF EXISTS trg_project_group_counts_apply ON project;")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION project_group_counts_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+               AND OLD.is_active = NEW.is_active
+               AND OLD.status = NEW.status
+               AND OLD.category_id = NEW.category_id
+               AND OLD.department_id = NEW.department_id THEN
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_active THEN
+                UPDATE category
+                SET project_count = project_count - 1,
+                    approved_project_count = approved_project_count - (OLD.status = 'APPROVED')::int
+                WHERE id = OLD.category_id;
+
+                UPDATE department
+                SET project_count = project_count - 1,
+                    approved_project_count = approved_project_count - (OLD.status = 'APPROVED')::int
+                WHERE id = OLD.department_id;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_active THEN
+                UPDATE category
+                SET project_count = project_count + 1,
+                    approved_project_count = approved_project_count + (NEW.status = 'APPROVED')::int
+                WHERE id = NEW.category_id;
+
+                UPDATE department
+                SET project_count = project_count + 1,
+                    approved_project_count = approved_project_count + (NEW.status = 'APPROVED')::int
+                WHERE id = NEW.department_id;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_project_group_counts_apply
+        AFTER INSERT OR DELETE OR UPDATE OF is_active, status, category_id, department_id
+        ON project
+        FOR EACH ROW EXECUTE FUNCTION project_group_counts_apply();
+    """
+    )
+
+    # Backfill the restored counts
+    for table, column in (("category", "category_id"), ("department", "department_id")):
+        op.execute(
+            f"""
+            UPDATE {table} AS t
+            SET project_count = counts.active,
+                approved_project_count = counts.approved
+            FROM (
+                SELECT
+                    g.id,
+                    COUNT(p.id) FILTER (WHERE p.is_active) AS active,
+                    COUNT(p.id) FILTER (
+                        WHERE p.is_active AND p.status = 'APPROVED'
+                    ) AS approved
+                FROM {table} AS g
+                LEFT JOIN project AS p ON p.{column} = g.id
+                GROUP BY g.id
+            ) AS counts
+            WHERE t.id = counts.id;
+        """
+        )
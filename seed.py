@@ -1,6 +1,24 @@
+"""
+Lookup data and the admin user every environment needs.
+
+Run it once per deploy, after migrations:
+
+    python seed.py
+
+The API also calls `seed_lookup_tables()` on startup unless SEED_ON_STARTUP
+is off; when the database is already current that costs a single SELECT.
+"""
+
+import argparse
+import asyncio
 import uuid
-from app.database import execute_query
 
+from app.database import close_pool, execute_query, get_pool, perform_query, transaction
+
+
+# Bump whenever the rows below change, so existing databases pick them up
+SEED_VERSION = 1
+SEED_NAME = "lookup_tables"
 
 CATEGORY_ROWS = [
     "C Programming",
@@ -28,36 +46,101 @@ DEPARTMENT_ROWS = [
 BATCH_YEARS = [2076, 2077, 2078, 2079, 2080, 2081, 2082]
 
 
-def seed_lookup_tables():
+async def _seeded_version(conn=None) -> int:
+    rows = await perform_query(
+        "SELECT version FROM seed_state WHERE name = %s;", (SEED_NAME,), conn
+    )
+    return rows[0]["version"] if rows else 0
+
+
+async def _insert_rows(conn) -> None:
     # Create Admin User
-    user_query = f"""
+    user_query = """
     INSERT INTO "user" (
         uuid, username, password, first_name, last_name, phone_no, user_role,
         email, is_active, is_archived, date_joined, updated_at
     )
     VALUES (
-        '{uuid.uuid4()}', 'project_admin', 'tcioeProject@123', 'Project', 'Admin', '9800000000', 'ADMIN',
+        %s, 'project_admin', 'tcioeProject@123', 'Project', 'Admin', '9800000000', 'ADMIN',
         'projects.admin@tcioe.edu.np', TRUE, FALSE, now(), now()
     )
     ON CONFLICT (username) DO NOTHING;
     """
-    execute_query(user_query)
+    await execute_query(user_query, (str(uuid.uuid4()),), conn)
 
-    execute_query(
+    await execute_query(
         "INSERT INTO category (name) VALUES "
         + ",".join("(%s)" for _ in CATEGORY_ROWS)
         + " ON CONFLICT (name) DO NOTHING;",
         tuple(CATEGORY_ROWS),
+        conn,
     )
-    execute_query(
+    await execute_query(
         "INSERT INTO department (name) VALUES "
         + ",".join("(%s)" for _ in DEPARTMENT_ROWS)
         + " ON CONFLICT (name) DO NOTHING;",
         tuple(DEPARTMENT_ROWS),
+        conn,
     )
-    execute_query(
+    await execute_query(
         "INSERT INTO batch_year (year) VALUES "
         + ",".join("(%s)" for _ in BATCH_YEARS)
         + " ON CONFLICT (year) DO NOTHING;",
         tuple(BATCH_YEARS),
+        conn,
     )
+
+
+async def seed_lookup_tables(force: bool = False) -> bool:
+    """
+    Insert the seed rows unless this database already has SEED_VERSION.
+
+    Concurrent callers (workers booting together) serialize on an advisory
+    lock and only the first one writes. Returns True if it seeded.
+    """
+    if not force and await _seeded_version() >= SEED_VERSION:
+        return False
+
+    async with transaction() as conn:
+        await perform_query(
+            "SELECT pg_advisory_xact_lock(hashtext('seed_state'));", conn=conn
+        )
+        # Another process may have finished while we waited for the lock
+        if not force and await _seeded_version(conn) >= SEED_VERSION:
+            return False
+
+        await _insert_rows(conn)
+        await execute_query(
+            """
+            INSERT INTO seed_state (name, version, applied_at)
+            VALUES (%s, %s, now())
+            ON CONFLICT (name) DO UPDATE
+            SET version = EXCLUDED.version, applied_at = EXCLUDED.applied_at;
+            """,
+            (SEED_NAME, SEED_VERSION),
+            conn,
+        )
+    return True
+
+
+async def main(force: bool) -> None:
+    await get_pool().open()
+    try:
+        if await seed_lookup_tables(force):
+            print(f"Seeded {SEED_NAME} (version {SEED_VERSION})")
+        else:
+            print(f"{SEED_NAME} already at version {SEED_VERSION}, nothing to do")
+    finally:
+        await close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Seed lookup tables and the admin user"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="seed even if the version is current"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.force))
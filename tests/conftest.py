@@ -0,0 +1,55 @@
+import os
+
+import psycopg2
+import pytest
+
+from app.config import settings
+from app.database import execute_query, wait
+
+
+@pytest.fixture
+def anyio_backend():
+    # The app's background workers and pool are written against asyncio
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    """
+    A migrated database, TEST_DATABASE_URL or else DATABASE_URL.
+
+    Tests that need one are skipped when it can't be reached.
+    """
+    url = os.environ.get("TEST_DATABASE_URL", settings.database_url)
+    try:
+        psycopg2.connect(url, connect_timeout=3).close()
+    except psycopg2.Error as err:
+        pytest.skip(f"No database to test against: {err}")
+    return url
+
+
+@pytest.fixture
+def db(database_url):
+    """A connection whose changes are rolled back after the test."""
+    conn = psycopg2.connect(database_url)
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@pytest.fixture
+async def aconn(database_url):
+    """
+    An asynchronous connection, like the pool's, inside a transaction that is
+    rolled back after the test.
+    """
+    conn = psycopg2.connect(database_url, async_=True)
+    try:
+        await wait(conn)
+        await execute_query("BEGIN", conn=conn)
+        yield conn
+        await execute_query("ROLLBACK", conn=conn)
+    finally:
+        conn.close()
@@ -0,0 +1,122 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.utils.compression import CompressionMiddleware, choose_encoding
+
+pytestmark = pytest.mark.anyio
+
+PAGE = {"results": ["project"] * 200}
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding",
+    [
+        ("gzip, br", "br"),
+        ("gzip;q=1, br;q=0.5", "gzip"),
+        ("*", "br"),
+        ("br;q=0, *", "gzip"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding(accept_encoding, encoding):
+    assert choose_encoding(accept_encoding, ["br", "gzip"]) == encoding
+
+
+class Page:
+    """An endpoint whose body and ETag the test sets."""
+
+    def __init__(self):
+        self.body = PAGE
+        self.etag = '"v1"'
+
+    async def endpoint(self, request):
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers={"ETag": self.etag})
+        return JSONResponse(self.body, headers={"ETag": self.etag})
+
+
+@pytest.fixture
+def page():
+    return Page()
+
+
+@pytest.fixture
+def middleware(page):
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def image(request):
+        return Response(b"\x89PNG" * 500, media_type="image/png")
+
+    app = Starlette(
+        routes=[
+            Route("/page", page.endpoint),
+            Route("/small", small),
+            Route("/image", image),
+        ]
+    )
+    return CompressionMiddleware(app, minimum_size=1024)
+
+
+@pytest.fixture
+async def client(middleware):
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_compressed_for_the_client(client):
+    response = await client.get("/page", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert response.json() == PAGE
+
+
+@pytest.mark.parametrize(
+    "path, headers",
+    [
+        ("/page", {"Accept-Encoding": "br"}),
+        ("/page", {"Accept-Encoding": "identity"}),
+        ("/small", {"Accept-Encoding": "br"}),
+        ("/page", {"Accept-Encoding": "br", "If-None-Match": '"v1"'}),
+    ],
+)
+async def test_vary_on_every_compressible_response(client, path, headers):
+    response = await client.get(path, headers=headers)
+
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+async def test_other_content_types_pass_through(client):
+    response = await client.get("/image", headers={"Accept-Encoding": "br"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+async def test_compressed_body_follows_the_body_not_the_etag(client, page):
+    headers = {"Accept-Encoding": "gzip"}
+    await client.get("/page", headers=headers)
+
+    # Same ETag, different body: the earlier compressed bytes don't apply
+    page.body = {"results": ["renamed"] * 200}
+    response = await client.get("/page", headers=headers)
+
+    assert response.json() == page.body
+
+
+async def test_compressed_bytes_are_reused(client, middleware):
+    compressions = []
+    encode = middleware.encoders["gzip"]
+    middleware.encoders["gzip"] = lambda body: compressions.append(body) or encode(body)
+
+    for _ in range(3):
+        response = await client.get("/page", headers={"Accept-Encoding": "gzip"})
+
+    assert response.json() == PAGE
+    assert len(compressions) == 1
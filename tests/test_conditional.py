@@ -0,0 +1,62 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.utils.conditional import (
+    etag_matches,
+    if_none_match,
+    make_etag,
+    revalidate,
+    revalidate_etag,
+)
+
+
+def request(if_none_match: str = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_make_etag_is_strong_and_stable():
+    etag = make_etag((1, "a"))
+
+    assert etag == make_etag((1, "a"))
+    assert etag != make_etag((1, "b"))
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+@pytest.mark.parametrize(
+    "header, matches",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"x", "abc"', True),
+        ("*", True),
+        ('"abcd"', False),
+        ("abc", False),
+    ],
+)
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+    # The tags handed to SQL match the same way
+    tags = if_none_match(request(header))
+    assert ("abc" in tags or "*" in tags) is matches
+
+
+def test_if_none_match_lists_unquoted_tags():
+    assert if_none_match(request()) == []
+    assert if_none_match(request('W/"a", "b" ,c, "",*')) == ["a", "b", "", "*"]
+
+
+def test_revalidate_raises_304_for_a_current_etag():
+    headers = revalidate(request('"other"'), 42)
+    assert headers["ETag"] == make_etag(42)
+    assert headers["Cache-Control"] == "no-cache"
+
+    with pytest.raises(HTTPException) as excinfo:
+        revalidate_etag(request('W/"abc"'), '"abc"')
+
+    assert excinfo.value.status_code == 304
+    assert excinfo.value.headers["ETag"] == '"abc"'
@@ -0,0 +1,184 @@
+import asyncio
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.utils.mailer import Mailer, OutboxFull
+
+pytestmark = pytest.mark.anyio
+
+
+class Inbox:
+    """aiosmtpd handler keeping what it accepts; `replies` answer DATA first."""
+
+    def __init__(self):
+        self.messages = []
+        self.replies = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.replies:
+            return self.replies.pop(0)
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def inbox():
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    inbox.port = controller.port
+    yield inbox
+    controller.stop()
+
+
+@pytest.fixture
+async def make_mailer(inbox):
+    mailers = []
+
+    def make_mailer(**kwargs):
+        mailer = Mailer(
+            host="127.0.0.1",
+            port=inbox.port,
+            username="noreply@example.com",
+            password="",
+            use_tls=False,
+            **{"retry_backoff": 0.01, "idle_timeout": 5, **kwargs},
+        )
+        mailers.append(mailer)
+        return mailer
+
+    yield make_mailer
+
+    for mailer in mailers:
+        await mailer.stop()
+
+
+def message(n: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = f"Your login code {n}"
+    msg.set_content(f"Code {n}")
+    return msg
+
+
+async def wait_until(condition, timeout: float = 5) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_outbox_delivers_over_one_session(inbox, make_mailer):
+    mailer = make_mailer()
+    mailer.start()
+
+    for n in range(3):
+        mailer.enqueue("noreply@example.com", f"user{n}@example.com", message(n))
+    await wait_until(lambda: mailer.stats()["sent"] == 3)
+
+    assert [m.rcpt_tos for m in inbox.messages] == [
+        ["user0@example.com"],
+        ["user1@example.com"],
+        ["user2@example.com"],
+    ]
+    assert b"Your login code 1" in inbox.messages[1].content
+    stats = mailer.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["sessions_opened"] == 1
+    assert stats["failed"] == 0
+
+
+async def test_temporary_failure_is_retried(inbox, make_mailer):
+    mailer = make_mailer()
+    inbox.replies = ["451 Try again later"]
+    mailer.start()
+
+    mailer.enqueue("noreply@example.com", "user@example.com", message(1))
+    await wait_until(lambda: mailer.stats()["sent"] == 1)
+
+    assert [m.rcpt_tos for m in inbox.messages] == [["user@example.com"]]
+    stats = mailer.stats()
+    assert stats["retried"] == 1
+    assert stats["retry_pending"] == 0
+    assert stats["failed"] == 0
+    # A rejected message leaves the session usable
+    assert stats["sessions_opened"] == 1
+
+
+async def test_retries_stop_after_max_attempts(inbox, make_mailer):
+    mailer = make_mailer(max_attempts=2)
+    inbox.replies = ["451 Try again later"] * 2
+    mailer.start()
+
+    mailer.enqueue("noreply@example.com", "user@example.com", message(1))
+    await wait_until(lambda: mailer.stats()["failed"] == 1)
+
+    assert inbox.messages == []
+    assert mailer.stats()["retried"] == 1
+
+
+async def test_permanent_failure_is_not_retried(inbox, make_mailer):
+    mailer = make_mailer()
+    inbox.replies = ["550 No such user"]
+    mailer.start()
+
+    mailer.enqueue("noreply@example.com", "nobody@example.com", message(1))
+    mailer.enqueue("noreply@example.com", "user@example.com", message(2))
+    await wait_until(lambda: mailer.stats()["sent"] == 1)
+
+    assert [m.rcpt_tos for m in inbox.messages] == [["user@example.com"]]
+    stats = mailer.stats()
+    assert stats["failed"] == 1
+    assert stats["retried"] == 0
+
+
+async def test_session_reopened_after_server_drops_it(inbox, make_mailer):
+    mailer = make_mailer()
+    mailer.start()
+
+    mailer.enqueue("noreply@example.com", "user0@example.com", message(0))
+    await wait_until(lambda: mailer.stats()["sent"] == 1)
+    # The server hangs up on the idle session
+    mailer._session.sock.shutdown(socket.SHUT_RDWR)
+
+    mailer.enqueue("noreply@example.com", "user1@example.com", message(1))
+    await wait_until(lambda: mailer.stats()["sent"] == 2)
+
+    assert len(inbox.messages) == 2
+    assert mailer.stats()["sessions_opened"] == 2
+
+
+async def test_stop_drains_queued_and_retrying_messages(inbox, make_mailer):
+    mailer = make_mailer(retry_backoff=60)
+    inbox.replies = ["451 Try again later"]
+    mailer.start()
+
+    mailer.enqueue("noreply@example.com", "user0@example.com", message(0))
+    await wait_until(lambda: mailer.stats()["retry_pending"] == 1)
+    mailer.enqueue("noreply@example.com", "user1@example.com", message(1))
+
+    await mailer.stop()
+
+    assert sorted(m.rcpt_tos[0] for m in inbox.messages) == [
+        "user0@example.com",
+        "user1@example.com",
+    ]
+    assert mailer.stats()["sent"] == 2
+    assert mailer.stats()["retry_pending"] == 0
+
+
+async def test_full_outbox_rejects_new_mail(make_mailer):
+    mailer = make_mailer(max_queue=1)
+
+    mailer.enqueue("noreply@example.com", "user0@example.com", message(0))
+    with pytest.raises(OutboxFull):
+        mailer.enqueue("noreply@example.com", "user1@example.com", message(1))
@@ -0,0 +1,431 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from app.api.public.oauth import google, jwks
+from app.api.public.oauth.base import OAuthProvider
+from app.api.public.oauth.github import GitHubOAuth
+from app.api.public.oauth.google import GoogleOAuth
+from app.api.public.oauth.jwks import JWKSCache
+from app.api.public.oauth.messages import ERROR_MESSAGES
+from app.config import settings
+from app.utils import http
+from app.utils.http import close_http_client, get_http_client, set_http_client
+
+pytestmark = pytest.mark.anyio
+
+GITHUB_EMAILS = [
+    {"email": "old@example.com", "primary": False, "verified": True},
+    {"email": "Ada@example.com", "primary": True, "verified": True},
+]
+
+
+@pytest.fixture(autouse=True)
+def provider_settings(monkeypatch):
+    monkeypatch.setattr(OAuthProvider, "GOOGLE_CLIENT_ID", "web-id, android-id")
+    monkeypatch.setattr(OAuthProvider, "GOOGLE_CLIENT_SECRET", "google-secret")
+    monkeypatch.setattr(OAuthProvider, "GITHUB_CLIENT_ID", "github-id")
+    monkeypatch.setattr(OAuthProvider, "GITHUB_CLIENT_SECRET", "github-secret")
+
+
+@pytest.fixture
+async def mock_http():
+    """Route the shared client through `httpx.MockTransport(handler)`."""
+
+    def mock_http(handler):
+        set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    yield mock_http
+    await close_http_client()
+
+
+class GitHub:
+    """Mock GitHub: token exchange, then the profile and email endpoints."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path
+        if path in self.fail:
+            return self.fail[path](request)
+
+        if path == "/login/oauth/access_token":
+            assert b"code=the-code" in request.content
+            return httpx.Response(200, json={"access_token": "gho_token"})
+
+        assert request.headers["Authorization"] == "Bearer gho_token"
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if path == "/user":
+            return httpx.Response(200, json={"name": "Ada King Lovelace"})
+        if path == "/user/emails":
+            return httpx.Response(200, json=GITHUB_EMAILS)
+        return httpx.Response(404)
+
+
+def test_shared_client_is_reused_until_closed():
+    client = get_http_client()
+    try:
+        assert get_http_client() is client
+        assert client.timeout.read == settings.http_timeout
+        assert client.timeout.connect == settings.http_connect_timeout
+    finally:
+        set_http_client(None)
+
+
+async def test_close_http_client():
+    client = get_http_client()
+
+    await close_http_client()
+
+    assert client.is_closed
+    assert http._client is None
+
+
+async def test_github_profile_and_emails_are_fetched_concurrently(mock_http):
+    github = GitHub()
+    mock_http(github)
+
+    user_info = await GitHubOAuth.validate("the-code")
+
+    assert user_info == {
+        "type": "success",
+        "provider": "GITHUB",
+        "email": "Ada@example.com",
+        "first_name": "Ada",
+        "last_name": "King Lovelace",
+        "photo": "",
+    }
+    assert [r.url.path for r in github.requests] == [
+        "/login/oauth/access_token",
+        "/user",
+        "/user/emails",
+    ]
+    assert github.max_in_flight == 2
+
+
+@pytest.mark.parametrize("failing", ["/user", "/user/emails"])
+async def test_github_call_failing(mock_http, failing):
+    github = GitHub()
+    github.fail[failing] = lambda request: httpx.Response(502, request=request)
+    mock_http(github)
+
+    user_info = await GitHubOAuth.validate("the-code")
+
+    assert user_info["type"] == "error"
+    assert user_info["message"].startswith("HTTP error")
+    assert "502" in user_info["message"]
+
+
+async def test_github_timeout(mock_http):
+    def timeout(request):
+        raise httpx.ReadTimeout("Timed out", request=request)
+
+    github = GitHub()
+    github.fail["/user/emails"] = timeout
+    mock_http(github)
+
+    user_info = await GitHubOAuth.validate("the-code")
+
+    assert user_info == {"type": "error", "message": "Unexpected error: Timed out"}
+
+
+async def test_github_without_access_token(mock_http):
+    github = GitHub()
+    github.fail["/login/oauth/access_token"] = lambda request: httpx.Response(
+        200, json={"error": "bad_verification_code"}
+    )
+    mock_http(github)
+
+    user_info = await GitHubOAuth.validate("the-code")
+
+    assert user_info == {"type": "error", "message": "No access token in response"}
+    assert len(github.requests) == 1
+
+
+def google_api(
+    aud: str = "android-id", tokeninfo_status: int = 200, token: str = "ya29.token"
+):
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["access_token"] == token
+        if request.url.path == "/tokeninfo":
+            return httpx.Response(tokeninfo_status, json={"aud": aud})
+        return httpx.Response(
+            200,
+            json={
+                "given_name": "Ada",
+                "family_name": "Lovelace",
+                "name": "Ada Lovelace",
+                "email": " Ada@Example.com ",
+            },
+        )
+
+    return handler
+
+
+async def test_google_access_token(mock_http):
+    mock_http(google_api())
+
+    user_info = await GoogleOAuth.validate("ya29.token")
+
+    assert user_info == {
+        "type": "success",
+        "provider": "GOOGLE",
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        "full_name": "Ada Lovelace",
+        "photo": None,
+        "email": "ada@example.com",
+    }
+
+
+async def test_google_audience_mismatch(mock_http):
+    mock_http(google_api(aud="web-id-staging"))
+
+    with pytest.raises(HTTPException) as excinfo:
+        await GoogleOAuth.validate("ya29.token")
+
+    assert excinfo.value.detail == "Invalid token: Audience does not match client_id."
+
+
+async def test_google_tokeninfo_failing(mock_http):
+    mock_http(google_api(tokeninfo_status=401))
+
+    with pytest.raises(HTTPException) as excinfo:
+        await GoogleOAuth.validate("ya29.token")
+
+    assert excinfo.value.detail == ERROR_MESSAGES["request_failed"]
+
+
+async def test_google_timeout(mock_http):
+    def timeout(request):
+        raise httpx.ConnectTimeout("Timed out", request=request)
+
+    mock_http(timeout)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await GoogleOAuth.validate("ya29.token")
+
+    assert excinfo.value.status_code == 400
+
+
+def signing_key(kid: str):
+    """A locally generated RSA key: (private PEM, public JWK)."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    return private_pem, {**public_jwk, "kid": kid, "use": "sig"}
+
+
+KEYS = {kid: signing_key(kid) for kid in ("key-1", "key-2")}
+
+
+def id_token(kid: str = "key-1", **claims) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": "android-id",
+        "sub": "1234567890",
+        "iat": now,
+        "exp": now + 3600,
+        "email": "Ada@Example.com",
+        "email_verified": True,
+        "given_name": "Ada",
+        "family_name": "Lovelace",
+        "name": "Ada Lovelace",
+        **claims,
+    }
+    return jwt.encode(claims, KEYS[kid][0], algorithm="RS256", headers={"kid": kid})
+
+
+class Certs:
+    """Mock Google certs endpoint serving the public JWKs of `kids`."""
+
+    def __init__(self, kids=("key-1",), headers=None):
+        self.kids = list(kids)
+        self.headers = headers or {"Cache-Control": "public, max-age=3600"}
+        self.fetches = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert str(request.url) == "https://www.googleapis.com/oauth2/v3/certs"
+        self.fetches += 1
+        keys = [KEYS[kid][1] for kid in self.kids]
+        return httpx.Response(200, json={"keys": keys}, headers=self.headers)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable `time.monotonic` for the signing key cache."""
+
+    class Clock:
+        now = 1000.0
+
+    monkeypatch.setattr(jwks.time, "monotonic", lambda: Clock.now)
+    return Clock
+
+
+@pytest.fixture
+def signing_keys(monkeypatch, clock):
+    cache = JWKSCache(google.google_signing_keys.url)
+    monkeypatch.setattr(google, "google_signing_keys", cache)
+    monkeypatch.setattr(settings, "google_verify_id_tokens", True)
+    return cache
+
+
+async def test_id_token_verified_locally(mock_http, signing_keys):
+    certs = Certs()
+    mock_http(certs)
+
+    for _ in range(3):
+        user_info = await GoogleOAuth.validate(id_token())
+
+    assert user_info == {
+        "type": "success",
+        "provider": "GOOGLE",
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        "full_name": "Ada Lovelace",
+        "photo": None,
+        "email": "ada@example.com",
+    }
+    # Only the first sign-in fetched the keys
+    assert certs.fetches == 1
+
+
+async def test_id_token_with_at_hash(mock_http, signing_keys):
+    # Issued alongside an access token, which the client doesn't send us
+    mock_http(Certs())
+
+    user_info = await GoogleOAuth.validate(id_token(at_hash="HK6E_P6Dh8Y93mRNtsDB1Q"))
+
+    assert user_info["email"] == "ada@example.com"
+
+
+async def test_dotted_access_token_uses_the_api(mock_http, signing_keys):
+    # Two dots don't make a JWT; such tokens still go to the token API
+    mock_http(google_api(token="ya29.a0Af.Hk-x"))
+
+    user_info = await GoogleOAuth.validate("ya29.a0Af.Hk-x")
+
+    assert user_info["email"] == "ada@example.com"
+
+
+@pytest.mark.parametrize(
+    "claims, detail",
+    [
+        ({"aud": "android"}, "Invalid token: Audience does not match client_id."),
+        (
+            {"aud": "web-id, android-id"},
+            "Invalid token: Audience does not match client_id.",
+        ),
+        ({"email_verified": False}, "Invalid token: Email is not verified."),
+        ({"exp": int(time.time()) - 60}, ERROR_MESSAGES["signin_failed"]),
+        ({"iss": "https://evil.example.com"}, ERROR_MESSAGES["signin_failed"]),
+    ],
+)
+async def test_id_token_rejected(mock_http, signing_keys, claims, detail):
+    mock_http(Certs())
+
+    with pytest.raises(HTTPException) as excinfo:
+        await GoogleOAuth.validate(id_token(**claims))
+
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail == detail
+
+
+async def test_id_token_with_bad_signature_is_rejected(mock_http, signing_keys):
+    mock_http(Certs(kids=["key-1", "key-2"]))
+    header, payload, _ = id_token("key-1").split(".")
+    signature = id_token("key-2").split(".")[2]
+
+    with pytest.raises(HTTPException) as excinfo:
+        await GoogleOAuth.validate(f"{header}.{payload}.{signature}")
+
+    assert excinfo.value.detail == ERROR_MESSAGES["signin_failed"]
+
+
+async def test_keys_cached_for_max_age_minus_age(mock_http, signing_keys, clock):
+    certs = Certs(headers={"Cache-Control": "public, max-age=100", "Age": "40"})
+    mock_http(certs)
+
+    await GoogleOAuth.validate(id_token())
+    clock.now += 59
+    await GoogleOAuth.validate(id_token())
+    assert certs.fetches == 1
+
+    clock.now += 1
+    await GoogleOAuth.validate(id_token())
+    assert certs.fetches == 2
+
+
+async def test_rotated_key_is_refetched(mock_http, signing_keys, clock):
+    certs = Certs(kids=["key-1"])
+    mock_http(certs)
+    await GoogleOAuth.validate(id_token("key-1"))
+
+    # Google starts signing with a new key before our copy expires
+    certs.kids = ["key-1", "key-2"]
+    clock.now += signing_keys.min_refresh_interval
+    await GoogleOAuth.validate(id_token("key-2"))
+    assert certs.fetches == 2
+
+
+async def test_unknown_key_refetch_is_rate_limited(mock_http, signing_keys, clock):
+    certs = Certs(kids=["key-1"])
+    mock_http(certs)
+    await GoogleOAuth.validate(id_token("key-1"))
+    certs.kids = ["key-1", "key-2"]
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as excinfo:
+            await GoogleOAuth.validate(id_token("key-2"))
+        assert excinfo.value.detail == "Invalid token: Unknown signing key."
+    assert certs.fetches == 1
+
+    clock.now += signing_keys.min_refresh_interval
+    await GoogleOAuth.validate(id_token("key-2"))
+    assert certs.fetches == 2
+
+
+async def test_failed_refresh_keeps_the_cached_keys(mock_http, signing_keys, clock):
+    certs = Certs(headers={"Cache-Control": "max-age=60"})
+    mock_http(certs)
+    await GoogleOAuth.validate(id_token())
+
+    mock_http(lambda request: httpx.Response(503))
+    clock.now += 60
+    assert (await GoogleOAuth.validate(id_token()))["type"] == "success"
+
+
+async def test_keys_unavailable(mock_http, signing_keys):
+    mock_http(lambda request: httpx.Response(503))
+
+    with pytest.raises(HTTPException) as excinfo:
+        await GoogleOAuth.validate(id_token())
+
+    assert excinfo.value.detail == ERROR_MESSAGES["request_failed"]
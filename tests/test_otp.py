@@ -0,0 +1,159 @@
+import asyncio
+from datetime import timedelta
+
+import fakeredis
+import pytest
+from redis.exceptions import RedisError
+
+from app.database import execute_query
+from app.utils import otp
+from app.utils.otp import OTPStore, RedisOTPStore, SQLOTPStore
+from app.utils.user import create_user
+
+pytestmark = pytest.mark.anyio
+
+
+class MemoryOTPStore(OTPStore):
+    def __init__(self):
+        self.otps = {}
+
+    async def issue(self, user_id, otp, conn=None):
+        self.otps[user_id] = otp
+
+    async def verify(self, user_id, otp, conn=None):
+        return self.otps.pop(user_id, None) == otp
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis(server):
+    return fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+
+def test_store_must_implement_issue_and_verify():
+    with pytest.raises(TypeError):
+        OTPStore()
+
+
+async def test_verify_consumes_the_otp(redis):
+    store = RedisOTPStore(redis)
+    await store.issue(1, "123456")
+
+    assert await store.verify(1, "123456")
+    assert not await store.verify(1, "123456")
+    assert await redis.exists("otp:1") == 0
+
+
+async def test_issue_replaces_the_previous_otp(redis):
+    store = RedisOTPStore(redis)
+    await store.issue(1, "111111")
+    await store.issue(1, "222222")
+    await store.issue(2, "333333")
+
+    assert not await store.verify(1, "111111")
+    assert await store.verify(1, "222222")
+    assert await store.verify(2, "333333")
+
+
+async def test_wrong_guesses_burn_the_otp(redis):
+    store = RedisOTPStore(redis, max_attempts=3)
+    await store.issue(1, "123456")
+
+    assert not await store.verify(1, "000000")
+    assert not await store.verify(1, "000001")
+    assert await redis.hget("otp:1", "attempts") == "2"
+    assert not await store.verify(1, "000002")
+
+    assert await redis.exists("otp:1") == 0
+    assert not await store.verify(1, "123456")
+
+
+async def test_otp_expires(redis, monkeypatch):
+    store = RedisOTPStore(redis)
+    await store.issue(1, "123456")
+    assert await redis.ttl("otp:1") == otp.OTP_LIFETIME.total_seconds()
+
+    monkeypatch.setattr(otp, "OTP_LIFETIME", timedelta(seconds=1))
+    await store.issue(1, "123456")
+    await asyncio.sleep(1.1)
+
+    assert not await store.verify(1, "123456")
+
+
+async def test_app_client_is_looked_up_on_every_call(server, monkeypatch):
+    clients = [
+        fakeredis.FakeAsyncRedis(server=server, decode_responses=True) for _ in range(2)
+    ]
+    monkeypatch.setattr(otp, "get_redis", lambda: clients[0])
+    store = RedisOTPStore()
+    await store.issue(1, "123456")
+
+    # close_redis() shut the first client, get_redis() hands out a new one
+    await clients.pop(0).aclose()
+
+    assert await store.verify(1, "123456")
+
+
+async def test_redis_errors_propagate_without_a_fallback(redis, server):
+    store = RedisOTPStore(redis)
+    server.connected = False
+
+    with pytest.raises(RedisError):
+        await store.issue(1, "123456")
+    with pytest.raises(RedisError):
+        await store.verify(1, "123456")
+
+
+async def test_fallback_while_redis_is_down(redis, server):
+    fallback = MemoryOTPStore()
+    store = RedisOTPStore(redis, fallback=fallback)
+
+    server.connected = False
+    await store.issue(1, "111111")
+    await store.issue(2, "222222")
+    assert fallback.otps == {1: "111111", 2: "222222"}
+    assert await store.verify(1, "111111")
+
+    # OTPs issued during the outage still verify once Redis is back
+    server.connected = True
+    assert await store.verify(2, "222222")
+
+    await store.issue(3, "333333")
+    assert 3 not in fallback.otps
+    assert await store.verify(3, "333333")
+
+
+@pytest.fixture
+async def user_id(aconn):
+    user = await create_user("otp@example.com", "otp-test", conn=aconn)
+    return user["id"]
+
+
+async def test_sql_verify_consumes_the_otp(aconn, user_id):
+    store = SQLOTPStore()
+    await store.issue(user_id, "111111", aconn)
+    await store.issue(user_id, "222222", aconn)
+
+    assert not await store.verify(user_id, "111111", aconn)
+    # Every attempt consumes the OTP, right or wrong
+    assert not await store.verify(user_id, "222222", aconn)
+
+    await store.issue(user_id, "333333", aconn)
+    assert await store.verify(user_id, "333333", aconn)
+    assert not await store.verify(user_id, "333333", aconn)
+
+
+async def test_sql_otp_expires(aconn, user_id):
+    store = SQLOTPStore()
+    await store.issue(user_id, "123456", aconn)
+    await execute_query(
+        "UPDATE user_verification SET created_at = now() - %s WHERE user_id = %s;",
+        (otp.OTP_LIFETIME, user_id),
+        aconn,
+    )
+
+    assert not await store.verify(user_id, "123456", aconn)
@@ -0,0 +1,177 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.pagination import Keyset
+
+COLUMNS = {
+    "id": "p.id",
+    "title": "p.title",
+    "submitted_at": "p.submitted_at",
+    "avg_rating": "rs.avg_rating",
+}
+
+START = datetime(2024, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def make_rows():
+    # Sort keys repeat, so pages have to be split on the id tie-breaker
+    return [
+        {
+            "id": i,
+            "title": f"Project {i % 4}",
+            "submitted_at": START + timedelta(days=i % 3),
+            "avg_rating": Decimal("4.50") if i % 2 else Decimal("3.25"),
+        }
+        for i in range(1, 24)
+    ]
+
+
+def walk(ordering, rows, limit):
+    """Follow `next` cursors from the first page; returns the pages' ids."""
+    pages, cursor = [], None
+    while True:
+        keyset = Keyset(ordering, COLUMNS, cursor)
+        page, cursor, _ = keyset.paginate(keyset.select(rows, limit), limit)
+        pages.append([row["id"] for row in page])
+        if cursor is None:
+            return pages
+
+
+def expected_order(ordering, rows):
+    field = ordering.lstrip("-")
+    ordered = sorted(rows, key=lambda row: (row[field], row["id"]))
+    if ordering.startswith("-"):
+        ordered.reverse()
+    return [row["id"] for row in ordered]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        7,
+        2.75,
+        "Machine learning",
+        None,
+        START,
+        datetime(2024, 5, 6, 7, 8, 9),
+        Decimal("4.25"),
+        Decimal("3.3333333333333333"),
+    ],
+)
+def test_cursor_round_trips_sort_key_type(value):
+    keyset = Keyset("-title", {"title": "p.title"})
+    _, next_cursor, _ = keyset.paginate([{"id": 3, "title": value}] * 2, 1)
+
+    after = Keyset("-title", {"title": "p.title"}, next_cursor).after
+
+    assert after == (value, 3)
+    assert type(after[0]) is type(value)
+    if isinstance(value, datetime):
+        assert after[0].tzinfo == value.tzinfo
+
+
+@pytest.mark.parametrize(
+    "ordering",
+    ["id", "-id", "title", "-title", "submitted_at", "-submitted_at", "-avg_rating"],
+)
+def test_next_cursors_visit_every_row_once(ordering):
+    rows = make_rows()
+
+    pages = walk(ordering, rows, limit=5)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert sum(pages, []) == expected_order(ordering, rows)
+
+
+@pytest.mark.parametrize("ordering", ["title", "-submitted_at", "avg_rating"])
+def test_prev_cursors_walk_back_to_the_first_page(ordering):
+    rows = make_rows()
+    forward = walk(ordering, rows, limit=5)
+
+    keyset = Keyset(ordering, COLUMNS)
+    page, cursor, prev_cursor = keyset.paginate(keyset.select(rows, 5), 5)
+    assert prev_cursor is None
+    while cursor is not None:
+        keyset = Keyset(ordering, COLUMNS, cursor)
+        page, cursor, prev_cursor = keyset.paginate(keyset.select(rows, 5), 5)
+
+    backward = [[row["id"] for row in page]]
+    while prev_cursor is not None:
+        keyset = Keyset(ordering, COLUMNS, prev_cursor)
+        page, next_cursor, prev_cursor = keyset.paginate(keyset.select(rows, 5), 5)
+        assert next_cursor is not None
+        backward.insert(0, [row["id"] for row in page])
+
+    assert backward == forward
+
+
+def test_tie_on_sort_key_is_broken_by_id():
+    rows = [{"id": i, "title": "Same"} for i in (4, 1, 3, 2)]
+
+    assert walk("title", rows, limit=1) == [[1], [2], [3], [4]]
+    assert walk("-title", rows, limit=1) == [[4], [3], [2], [1]]
+
+
+def test_sql_for_a_cursor_page():
+    first = Keyset("-submitted_at", COLUMNS)
+    assert first.where == "TRUE"
+    assert first.params == ()
+
+    _, next_cursor, _ = first.paginate(make_rows()[:3], 2)
+    keyset = Keyset("-submitted_at", COLUMNS, next_cursor)
+
+    assert keyset.where == "(p.submitted_at, p.id) < (%s, %s)"
+    assert keyset.order_by == "p.submitted_at DESC, p.id DESC"
+    assert keyset.params == (START + timedelta(days=2), 2)
+
+
+def test_sql_for_a_prev_page_reads_in_reverse():
+    _, _, prev_cursor = Keyset("id", COLUMNS).paginate([{"id": 5}, {"id": 6}], 5, 10)
+    keyset = Keyset("id", COLUMNS, prev_cursor)
+
+    assert keyset.where == "p.id < %s"
+    assert keyset.order_by == "p.id DESC"
+    assert keyset.params == (5,)
+
+
+def token(payload) -> str:
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        token(["title", "next", "a"]),
+        token(["title", "next", {"datetime": "yesterday"}, 1]),
+        token(["title", "next", {"decimal": "1.2.3"}, 1]),
+        token(["title", "next", {"uuid": "x"}, 1]),
+    ],
+)
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        Keyset("title", COLUMNS, cursor)
+
+    assert excinfo.value.status_code == 400
+
+
+def test_cursor_of_another_ordering_is_400():
+    _, next_cursor, _ = Keyset("title", COLUMNS).paginate(make_rows()[:3], 2)
+
+    with pytest.raises(HTTPException) as excinfo:
+        Keyset("-title", COLUMNS, next_cursor)
+
+    assert excinfo.value.detail == "Cursor does not match the requested ordering"
+
+
+def test_unknown_ordering_is_400():
+    with pytest.raises(HTTPException) as excinfo:
+        Keyset("password", COLUMNS)
+
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+from psycopg2 import extensions
+
+from app import database
+from app.database import AsyncConnectionPool, PoolClosed, PoolTimeout
+
+pytestmark = pytest.mark.anyio
+
+
+class StubConnection:
+    """Just enough of a psycopg2 async connection for the pool's bookkeeping."""
+
+    def __init__(self, *args, **kwargs):
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.uses = 0
+        self.pool = None
+        self.closed = False
+        self.status = extensions.STATUS_READY
+        self.executing = False
+        self.info = SimpleNamespace(
+            transaction_status=extensions.TRANSACTION_STATUS_IDLE, backend_pid=1
+        )
+
+    def poll(self):
+        return extensions.POLL_OK
+
+    def isexecuting(self):
+        return self.executing
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    monkeypatch.setattr(database.psycopg2, "connect", StubConnection)
+    pools = []
+
+    def make_pool(**kwargs):
+        kwargs.setdefault("min_size", 0)
+        pool = AsyncConnectionPool("postgresql://stub", **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make_pool
+
+    for pool in pools:
+        if pool._monitor is not None:
+            pool._monitor.cancel()
+
+
+async def test_connections_are_reused(make_pool):
+    pool = make_pool(max_size=2)
+
+    conn = await pool.getconn()
+    await pool.putconn(conn)
+    assert await pool.getconn() is conn
+
+    stats = pool.stats()
+    assert stats["connections_opened"] == 1
+    assert stats["in_use"] == 1
+
+
+async def test_waiters_are_served_in_fifo_order(make_pool):
+    pool = make_pool(max_size=1)
+    held = await pool.getconn()
+    served = []
+
+    async def checkout(name):
+        conn = await pool.getconn()
+        served.append(name)
+        await asyncio.sleep(0)
+        await pool.putconn(conn)
+
+    tasks = []
+    for name in ("first", "second", "third"):
+        tasks.append(asyncio.create_task(checkout(name)))
+        await asyncio.sleep(0)
+    assert pool.stats()["waiting"] == 3
+
+    await pool.putconn(held)
+    await asyncio.gather(*tasks)
+
+    assert served == ["first", "second", "third"]
+    assert pool.stats()["connections_opened"] == 1
+
+
+async def test_idle_connection_is_not_taken_ahead_of_waiters(make_pool):
+    pool = make_pool(max_size=1)
+    held = await pool.getconn()
+    waiter = asyncio.create_task(pool.getconn())
+    await asyncio.sleep(0)
+
+    await pool.putconn(held)
+    # The connection went straight to the waiter, none is left idle
+    assert pool.stats()["idle"] == 0
+    assert await waiter is held
+
+
+async def test_checkout_timeout_is_503(make_pool):
+    pool = make_pool(max_size=1, timeout=0.05)
+    await pool.getconn()
+
+    with pytest.raises(PoolTimeout) as excinfo:
+        await pool.getconn()
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "1"}
+    stats = pool.stats()
+    assert stats["requests_timed_out"] == 1
+    assert stats["waiting"] == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue(make_pool):
+    pool = make_pool(max_size=1)
+    held = await pool.getconn()
+    waiter = asyncio.create_task(pool.getconn())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert pool.stats()["waiting"] == 0
+    await pool.putconn(held)
+    assert pool.stats()["idle"] == 1
+
+
+async def test_connection_recycled_after_max_uses(make_pool):
+    pool = make_pool(max_size=1, max_uses=2)
+
+    first = await pool.getconn()
+    await pool.putconn(first)
+    assert await pool.getconn() is first
+    await pool.putconn(first)
+
+    assert first.closed
+    second = await pool.getconn()
+    assert second is not first
+    stats = pool.stats()
+    assert stats["connections_recycled"] == 1
+    assert stats["connections_opened"] == 2
+    assert stats["size"] == 1
+
+
+async def test_connection_recycled_after_max_lifetime(make_pool):
+    pool = make_pool(max_size=1, max_lifetime=60)
+
+    conn = await pool.getconn()
+    conn.created_at -= 61
+    await pool.putconn(conn)
+
+    assert conn.closed
+    assert pool.stats()["connections_recycled"] == 1
+    assert await pool.getconn() is not conn
+
+
+async def test_recycled_slot_goes_to_waiter(make_pool):
+    pool = make_pool(max_size=1, max_uses=1)
+    held = await pool.getconn()
+    waiter = asyncio.create_task(pool.getconn())
+    await asyncio.sleep(0)
+
+    await pool.putconn(held)
+
+    conn = await waiter
+    assert conn is not held
+    assert pool.stats()["size"] == 1
+
+
+async def test_freed_slot_is_not_taken_ahead_of_waiters(make_pool):
+    pool = make_pool(max_size=1)
+    held = await pool.getconn()
+    served, sizes = [], []
+
+    async def checkout(name):
+        conn = await pool.getconn()
+        served.append(name)
+        sizes.append(pool.stats()["size"])
+        await asyncio.sleep(0.01)
+        await pool.putconn(conn)
+
+    first = asyncio.create_task(checkout("first"))
+    await asyncio.sleep(0)
+
+    # Discarding frees the slot for the queued caller; one arriving before
+    # it resumes has to queue behind it instead of opening a connection
+    held.closed = True
+    await pool.putconn(held)
+    await checkout("second")
+    await first
+
+    assert served == ["first", "second"]
+    assert sizes == [1, 1]
+    assert pool.stats()["connections_opened"] == 2
+
+
+async def test_failed_connect_passes_the_slot_on(make_pool, monkeypatch):
+    pool = make_pool(max_size=1)
+    held = await pool.getconn()
+    waiters = [asyncio.create_task(pool.getconn()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    connect = pool._connect
+
+    async def refused():
+        monkeypatch.setattr(pool, "_connect", connect)
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(pool, "_connect", refused)
+    held.closed = True
+    await pool.putconn(held)
+
+    with pytest.raises(OSError):
+        await waiters[0]
+    conn = await waiters[1]
+    assert not conn.closed
+    assert pool.stats()["size"] == 1
+
+
+async def test_close_fails_waiters(make_pool):
+    pool = make_pool(max_size=1, timeout=60)
+    held = await pool.getconn()
+    waiter = asyncio.create_task(pool.getconn())
+    await asyncio.sleep(0)
+
+    await pool.close()
+
+    with pytest.raises(PoolClosed) as excinfo:
+        await asyncio.wait_for(waiter, timeout=1)
+    assert excinfo.value.status_code == 503
+    with pytest.raises(PoolClosed):
+        await pool.getconn()
+
+    await pool.putconn(held)
+    assert held.closed
+    stats = pool.stats()
+    assert stats["size"] == 0
+    assert stats["waiting"] == 0
+
+
+async def test_broken_idle_connection_is_replaced(make_pool):
+    pool = make_pool(max_size=1)
+    conn = await pool.getconn()
+    await pool.putconn(conn)
+
+    conn.closed = True
+    replacement = await pool.getconn()
+
+    assert replacement is not conn
+    assert pool.stats()["connections_broken"] == 1
+
+
+async def test_leaked_connection_is_reported(make_pool, caplog):
+    pool = make_pool(max_size=1, leak_timeout=10)
+    conn = await pool.getconn()
+    pool._holders[conn].acquired_at -= 11
+
+    with caplog.at_level(logging.WARNING, logger="app.database"):
+        pool.check_leaks()
+        pool.check_leaks()
+
+    # Reported once, with the code that checked it out
+    assert len(caplog.records) == 1
+    assert "test_leaked_connection_is_reported" in caplog.text
+    assert pool.stats()["connections_leaked"] == 1
+    assert pool.holders()[0]["leaked"]
+    assert not conn.closed
+
+
+async def test_leaked_connection_is_reclaimed(make_pool):
+    pool = make_pool(max_size=1, leak_timeout=10, reclaim_leaks=True)
+    conn = await pool.getconn()
+    pool._holders[conn].acquired_at -= 11
+    waiter = asyncio.create_task(pool.getconn())
+    await asyncio.sleep(0)
+
+    pool.check_leaks()
+
+    assert conn.closed
+    replacement = await waiter
+    assert replacement is not conn
+    stats = pool.stats()
+    assert stats["connections_reclaimed"] == 1
+    assert stats["size"] == 1
+
+    # The late putconn of the reclaimed connection doesn't free a second slot
+    await pool.putconn(conn)
+    assert pool.stats()["size"] == 1
+
+
+async def test_busy_leaked_connection_is_not_reclaimed(make_pool):
+    pool = make_pool(max_size=1, leak_timeout=10, reclaim_leaks=True)
+    conn = await pool.getconn()
+    pool._holders[conn].acquired_at -= 11
+    conn.executing = True
+
+    pool.check_leaks()
+
+    assert not conn.closed
+    stats = pool.stats()
+    assert stats["connections_leaked"] == 1
+    assert stats["connections_reclaimed"] == 0
+
+
+async def test_leak_monitor_runs_in_background(make_pool, monkeypatch):
+    pool = make_pool(max_size=1, leak_timeout=0.01)
+    checks = asyncio.Event()
+    monkeypatch.setattr(pool, "check_leaks", checks.set)
+    monkeypatch.setattr(database.asyncio, "sleep", _no_wait)
+
+    await pool.open()
+    await asyncio.wait_for(checks.wait(), timeout=1)
+
+    await pool.close()
+    assert pool._monitor is None
+
+
+_sleep = asyncio.sleep
+
+
+async def _no_wait(delay):
+    await _sleep(0)
@@ -0,0 +1,75 @@
+import hashlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import database
+from app.api.public import project
+from app.database import execute_query
+from app.utils.response_cache import ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+URL = "/project-app/projects?limit=2"
+
+
+@pytest.fixture
+def queries(monkeypatch, aconn):
+    """The listing's queries, run on the test's connection and recorded."""
+    queries = []
+
+    async def perform_query(query, params=(), conn=None):
+        queries.append(query)
+        return await database.perform_query(query, params, conn=aconn)
+
+    monkeypatch.setattr(project, "perform_query", perform_query)
+    return queries
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(ttl=30)
+    monkeypatch.setattr(project, "response_cache", cache)
+    return cache
+
+
+@pytest.fixture
+async def client(queries, cache):
+    app = FastAPI()
+    app.include_router(project.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+def body_etag(response: httpx.Response) -> str:
+    return f'"{hashlib.sha1(response.content).hexdigest()}"'
+
+
+async def test_cached_listing_is_revalidated_without_a_query(client, queries):
+    response = await client.get(URL)
+    assert response.headers["etag"] == body_etag(response)
+
+    queries.clear()
+    cached = await client.get(URL, headers={"If-None-Match": response.headers["etag"]})
+
+    assert cached.status_code == 304
+    assert queries == []
+
+
+async def test_recomputed_listing_is_revalidated_on_its_body(client, cache, aconn):
+    etag = (await client.get(URL)).headers["etag"]
+
+    # Evicted: recomputed under the same tag versions, to the same body
+    cache._local.clear()
+    response = await client.get(URL, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # A body that changed without an invalidation gets a new ETag
+    await execute_query("UPDATE project SET title = title || ' (2)'", conn=aconn)
+    cache._local.clear()
+    response = await client.get(URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == body_etag(response) != etag
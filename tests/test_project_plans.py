@@ -0,0 +1,72 @@
+import itertools
+
+import pytest
+
+from app.database import execute_query
+from app.utils.db import explain, plan_indexes
+from app.utils.project import PROJECT_FILTER_INDEXES, ProjectQuery, project_keyset
+
+pytestmark = pytest.mark.anyio
+
+FILTER_VALUES = {
+    "p.category_id": 1,
+    "p.department_id": 1,
+    "p.batch_year_id": 1,
+    "p.level": "Bachelors",
+}
+
+FILTER_COMBINATIONS = [
+    columns
+    for size in range(1, len(PROJECT_FILTER_INDEXES) + 1)
+    for columns in itertools.combinations(PROJECT_FILTER_INDEXES, size)
+]
+
+
+@pytest.fixture
+async def planner(aconn):
+    # Ask whether an index *can* serve the query, which holds on a test
+    # database too small for the planner to prefer one
+    await execute_query("SET LOCAL enable_seqscan = off", conn=aconn)
+    return aconn
+
+
+async def page_indexes(conn, ordering="-submitted_at", search=None, columns=()):
+    query = ProjectQuery("p.is_active AND p.status = 'APPROVED'", search=search)
+    for column in columns:
+        query.filter(column, FILTER_VALUES[column])
+    keyset = project_keyset(ordering, search=search)
+    return plan_indexes(await explain(*query.page(keyset, 10), conn))
+
+
+@pytest.mark.parametrize(
+    "columns", FILTER_COMBINATIONS, ids=lambda c: "+".join(c).replace("p.", "")
+)
+@pytest.mark.parametrize("ordering", ["-submitted_at", "title"])
+async def test_filters_use_their_indexes(planner, ordering, columns):
+    used = await page_indexes(planner, ordering, columns=columns)
+
+    assert used & {PROJECT_FILTER_INDEXES[column] for column in columns}
+
+
+@pytest.fixture
+async def bitmap_planner(planner):
+    # GIN indexes are only read by bitmap scans; without this a small table's
+    # primary key index scan stands in for the disabled sequential scan
+    await execute_query("SET LOCAL enable_indexscan = off", conn=planner)
+    return planner
+
+
+@pytest.mark.parametrize("search", ["neural network", "mach", '"web portal" -mobile'])
+async def test_search_uses_the_gin_index(bitmap_planner, search):
+    used = await page_indexes(bitmap_planner, "relevance", search=search)
+
+    assert "idx_project_search_document" in used
+
+
+async def test_search_with_a_filter_uses_an_index(bitmap_planner):
+    used = await page_indexes(
+        bitmap_planner, "-submitted_at", search="vision", columns=["p.category_id"]
+    )
+
+    # Which one depends on the data; a small table may do with the filter's
+    assert used & {"idx_project_search_document", "idx_project_category"}
@@ -0,0 +1,73 @@
+import pytest
+
+from app.utils.project import project_search
+
+TITLES = [
+    "Machine learning for crop yields",
+    "The college web portal",
+    "Neural network vision",
+    "Mobile app for the library",
+]
+
+
+@pytest.fixture
+def titles(db):
+    """A temporary `project` table, shadowing the real one, with TITLES."""
+    with db.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TEMP TABLE project (
+                title text,
+                search_document tsvector
+                    GENERATED ALWAYS AS (to_tsvector('english', title)) STORED
+            );
+            """
+        )
+        cur.executemany(
+            "INSERT INTO project (title) VALUES (%s);", [(t,) for t in TITLES]
+        )
+    return db
+
+
+def search_titles(conn, search):
+    join, condition, params = project_search(search)
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT p.title FROM project AS p {join} WHERE {condition};", params
+        )
+        return sorted(row[0] for row in cur.fetchall())
+
+
+@pytest.mark.parametrize(
+    "search, expected",
+    [
+        ("neural", ["Neural network vision"]),
+        ("networks", ["Neural network vision"]),
+        ("mach", ["Machine learning for crop yields"]),
+        ("machine lear", ["Machine learning for crop yields"]),
+        ("Machine   ", ["Machine learning for crop yields"]),
+        ('"network vision"', ["Neural network vision"]),
+        ('"vision network"', []),
+        ("portal -college", []),
+        ("app -portal", ["Mobile app for the library"]),
+        (
+            "crop or vision",
+            ["Machine learning for crop yields", "Neural network vision"],
+        ),
+        ("zzz", []),
+    ],
+)
+def test_search(titles, search, expected):
+    assert search_titles(titles, search) == expected
+
+
+def test_stop_words_fall_back_to_title_substring(titles):
+    assert search_titles(titles, "the") == [
+        "Mobile app for the library",
+        "The college web portal",
+    ]
+    assert search_titles(titles, "for the") == ["Mobile app for the library"]
+
+
+def test_no_search_matches_everything(titles):
+    assert search_titles(titles, None) == sorted(TITLES)
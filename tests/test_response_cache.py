@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import time
+
+import fakeredis
+import pytest
+
+from app.utils.response_cache import ResponseCache, cache_key
+
+pytestmark = pytest.mark.anyio
+
+
+class Renderer:
+    """A `compute` callback counting its calls; `delay` keeps it in flight."""
+
+    def __init__(self, delay: float = 0, fail: int = 0):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, body: str):
+        async def compute():
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                self.fail -= 1
+                raise RuntimeError("database unavailable")
+            return f"{body} #{self.calls}"
+
+        return compute
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def redis_cache(server, **kwargs):
+    redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return ResponseCache(ttl=30, redis=redis, **kwargs)
+
+
+def test_cache_key_is_stable():
+    assert cache_key("projects", {"b": 2, "a": "x y", "c": None}) == (
+        cache_key("projects", {"a": "x y", "b": 2})
+    )
+    assert cache_key("projects", {"b": 2, "a": "x y"}) == "projects?a=x+y&b=2"
+
+
+async def test_entry_is_computed_once():
+    cache = ResponseCache(ttl=30)
+    render = Renderer()
+
+    for _ in range(3):
+        body = await cache.get_or_set("projects?page=1", ["projects"], render("a"))
+
+    assert body == "a #1"
+    assert render.calls == 1
+
+
+async def test_zero_ttl_disables_the_cache():
+    cache = ResponseCache(ttl=0)
+    render = Renderer()
+
+    await cache.get_or_set("projects", ["projects"], render("a"))
+    await cache.get_or_set("projects", ["projects"], render("a"))
+
+    assert render.calls == 2
+
+
+async def test_concurrent_misses_compute_once():
+    cache = ResponseCache(ttl=30)
+    render = Renderer(delay=0.05)
+
+    bodies = await asyncio.gather(
+        *(cache.get_or_set("projects", ["projects"], render("a")) for _ in range(10))
+    )
+
+    assert bodies == ["a #1"] * 10
+    assert render.calls == 1
+    assert cache._flights == {}
+
+
+async def test_waiters_recompute_after_a_failed_computation():
+    cache = ResponseCache(ttl=30)
+    render = Renderer(delay=0.05, fail=1)
+
+    results = await asyncio.gather(
+        *(cache.get_or_set("projects", ["projects"], render("a")) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == ["a #2", "a #2"]
+    assert render.calls == 2
+
+
+async def test_different_entries_compute_concurrently():
+    cache = ResponseCache(ttl=30)
+    render = Renderer(delay=0.05)
+
+    bodies = await asyncio.gather(
+        cache.get_or_set("projects?page=1", ["projects"], render("a")),
+        cache.get_or_set("projects?page=2", ["projects"], render("b")),
+    )
+
+    # Both had started before either finished
+    assert bodies == ["a #2", "b #2"]
+
+
+async def test_invalidate_only_drops_entries_with_that_tag():
+    cache = ResponseCache(ttl=30)
+    render = Renderer()
+    all_projects = ("projects", ["projects"])
+    category = ("projects?category_id=1", ["projects", "category:1"])
+
+    await cache.get_or_set(*all_projects, render("all"))
+    await cache.get_or_set(*category, render("category"))
+    await cache.invalidate("category:1")
+
+    assert await cache.get_or_set(*all_projects, render("all")) == "all #1"
+    assert await cache.get_or_set(*category, render("category")) == "category #3"
+
+    await cache.invalidate("projects")
+    assert await cache.get_or_set(*all_projects, render("all")) == "all #4"
+    assert await cache.get_or_set(*category, render("category")) == "category #5"
+
+
+async def test_invalidation_during_computation_is_not_lost():
+    cache = ResponseCache(ttl=30)
+    render = Renderer(delay=0.05)
+
+    computing = asyncio.create_task(
+        cache.get_or_set("projects", ["projects"], render("old"))
+    )
+    await asyncio.sleep(0.01)
+    await cache.invalidate("projects")
+
+    # The request that started before the invalidation still gets its body,
+    # but it isn't served afterwards
+    assert await computing == "old #1"
+    assert await cache.get_or_set("projects", ["projects"], render("new")) == "new #2"
+
+
+async def test_entries_and_invalidations_shared_through_redis(server):
+    workers = [redis_cache(server), redis_cache(server)]
+    render = Renderer()
+
+    await workers[0].get_or_set("projects", ["projects"], render("a"))
+    assert await workers[1].get_or_set("projects", ["projects"], render("a")) == (
+        "a #1"
+    )
+
+    await workers[1].invalidate("projects")
+    assert await workers[0].get_or_set("projects", ["projects"], render("a")) == (
+        "a #2"
+    )
+    assert render.calls == 2
+
+
+async def test_redis_unavailable_bypasses_the_cache(server):
+    cache = redis_cache(server)
+    render = Renderer()
+    server.connected = False
+
+    await cache.get_or_set("projects", ["projects"], render("a"))
+    await cache.invalidate("projects")
+    assert await cache.get_or_set("projects", ["projects"], render("a")) == "a #2"
+
+
+async def test_entry_expires_with_its_ttl_window(monkeypatch):
+    now = 3000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache = ResponseCache(ttl=30)
+    render = Renderer()
+
+    await cache.get_or_set("projects", ["projects"], render("a"))
+    now += 29
+    assert await cache.get_or_set("projects", ["projects"], render("a")) == "a #1"
+    now += 1
+    assert await cache.get_or_set("projects", ["projects"], render("a")) == "a #2"
+
+
+async def test_entry_digest_is_the_body_hash(server):
+    render = Renderer()
+
+    for cache in (ResponseCache(ttl=30), redis_cache(server), ResponseCache(ttl=0)):
+        digest, body = await cache.get_or_set_entry("projects", [], render("a"))
+        assert digest == hashlib.sha1(body.encode()).hexdigest()
+
+
+async def test_recomputed_entry_gets_a_new_digest():
+    cache = ResponseCache(ttl=30, maxsize=1)
+    render = Renderer()
+
+    first = await cache.get_or_set_entry("projects?page=1", ["projects"], render("a"))
+    await cache.get_or_set("projects?page=2", ["projects"], render("b"))
+    # Evicted, so recomputed under the same tag versions and TTL window
+    second = await cache.get_or_set_entry("projects?page=1", ["projects"], render("a"))
+
+    assert first == (hashlib.sha1(b"a #1").hexdigest(), "a #1")
+    assert second == (hashlib.sha1(b"a #3").hexdigest(), "a #3")
+
+
+async def test_entry_digest_shared_through_redis(server):
+    workers = [redis_cache(server), redis_cache(server)]
+    render = Renderer()
+
+    entries = [
+        await worker.get_or_set_entry("projects", ["projects"], render("a"))
+        for worker in workers
+    ]
+
+    assert entries[0] == entries[1]
+    assert render.calls == 1
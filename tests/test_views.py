@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from app.utils import views
+from app.utils.views import ViewCounter
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeProjects:
+    """Stands in for perform_query on the project table's view counts."""
+
+    def __init__(self, views):
+        self.views = dict(views)
+        self.selects = 0
+        self.updates = []
+        # Set to hold the reply to an UPDATE, already applied, until released
+        self.hold: asyncio.Event = None
+        self.updating = asyncio.Event()
+        self.fail = False
+
+    async def __call__(self, query, params=()):
+        if query.lstrip().startswith("SELECT"):
+            self.selects += 1
+            project_id = params[0]
+            if project_id not in self.views:
+                return []
+            return [{"views": self.views[project_id]}]
+
+        if self.fail:
+            raise RuntimeError("database unavailable")
+
+        increments = dict(zip(params[::2], params[1::2]))
+        self.updates.append(increments)
+        rows = []
+        for project_id, increment in increments.items():
+            if project_id in self.views:
+                self.views[project_id] += increment
+                rows.append({"id": project_id, "views": self.views[project_id]})
+
+        self.updating.set()
+        if self.hold is not None:
+            await self.hold.wait()
+        return rows
+
+
+@pytest.fixture
+def projects(monkeypatch):
+    projects = FakeProjects({1: 10, 2: 20})
+    monkeypatch.setattr(views, "perform_query", projects)
+    return projects
+
+
+async def test_views_are_buffered_until_flushed(projects):
+    counter = ViewCounter()
+
+    assert await counter.record(1) == 11
+    assert await counter.record(1) == 12
+    assert await counter.record(2) == 21
+
+    # One read per project for the live total, nothing written yet
+    assert projects.selects == 2
+    assert projects.updates == []
+
+    await counter.flush()
+
+    assert projects.updates == [{1: 2, 2: 1}]
+    assert projects.views == {1: 12, 2: 21}
+    assert await counter.record(1) == 13
+    assert projects.selects == 2
+
+
+async def test_unknown_project_is_not_counted(projects):
+    counter = ViewCounter()
+
+    assert await counter.record(99) is None
+    await counter.flush()
+
+    assert projects.updates == []
+
+
+async def test_repeat_views_within_dedupe_window(projects, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(views.time, "monotonic", lambda: now)
+    counter = ViewCounter(dedupe_window=60)
+
+    assert await counter.record(1, visitor="10.0.0.1") == 11
+    assert await counter.record(1, visitor="10.0.0.1") == 11
+    assert await counter.record(1, visitor="10.0.0.2") == 12
+    assert await counter.record(2, visitor="10.0.0.1") == 21
+
+    now += 61
+    assert await counter.record(1, visitor="10.0.0.1") == 13
+
+    await counter.flush()
+    assert projects.updates == [{1: 3, 2: 1}]
+
+
+async def test_failed_flush_keeps_the_batch(projects):
+    counter = ViewCounter()
+    await counter.record(1)
+    projects.fail = True
+
+    with pytest.raises(RuntimeError):
+        await counter.flush()
+    await counter.record(1)
+
+    projects.fail = False
+    await counter.flush()
+    assert projects.updates == [{1: 2}]
+
+
+async def test_stop_drains_the_buffer(projects):
+    counter = ViewCounter(flush_interval=60)
+    counter.start()
+    await counter.record(1)
+    await counter.record(2)
+
+    await counter.stop()
+
+    assert projects.updates == [{1: 1, 2: 1}]
+    assert projects.views == {1: 11, 2: 21}
+
+
+async def test_stop_waits_for_an_in_flight_flush(projects):
+    counter = ViewCounter(flush_interval=0.01)
+    counter.start()
+    await counter.record(1)
+    await counter.record(1)
+
+    projects.hold = asyncio.Event()
+    await asyncio.wait_for(projects.updating.wait(), timeout=1)
+    stopping = asyncio.create_task(counter.stop())
+    await asyncio.sleep(0.05)
+    assert not stopping.done()
+
+    await counter.record(1)
+    projects.hold.set()
+    await stopping
+
+    # The in-flight batch is written once, the view recorded meanwhile drained
+    assert projects.updates == [{1: 2}, {1: 1}]
+    assert projects.views[1] == 13
+
+
+async def test_stored_counts_are_bounded(projects):
+    projects.views.update({i: 0 for i in range(3, 10)})
+    counter = ViewCounter(max_projects=3)
+
+    for project_id in range(1, 10):
+        await counter.record(project_id)
+    await counter.flush()
+
+    assert len(counter._stored) == 3
+    # Evicted projects are read again on their next view
+    assert await counter.record(1) == 12
+    assert projects.selects == 10